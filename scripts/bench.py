@@ -0,0 +1,564 @@
+"""Benchmarks of the music_tools hot paths.
+
+    python scripts/bench.py run [--out results.json] [--filter REGEX] [--quick]
+    python scripts/bench.py compare baseline.json results.json [--threshold 0.1]
+    python scripts/bench.py memory [--out memory.json] [--quick]
+    python scripts/bench.py import-time [--runs 5]
+
+`run` times every benchmark at each of its input sizes and writes the results
+as JSON. `compare` exits with status 1 if any benchmark present in both files
+got slower than the baseline by more than the threshold (a fraction).
+`memory` measures the memory held by large collections of scales, as lists of
+`Scale` and as a `ScaleTable`. `import-time` exits with status 1 if
+importing every music_tools module takes longer than its budget."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pkgutil
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from music_tools.algorithms import IntArraySubsequenceSearcher, SubsequenceSearcher
+from music_tools.chord import Chord, ChordDescription, Tension, chords_in_scale
+from music_tools.chord_scale_matrix import CHORD_SHAPES, ChordScaleMatrix
+from music_tools.diagram import render_fretboard_html, render_fretboard_svg
+from music_tools.guitar import (
+    EADGBE,
+    MEGA_FRETBOARD,
+    Fretboard,
+    FretboardAnnotation,
+    FretboardLocation,
+    compile_annotation,
+    render_fretboard_ascii,
+)
+from music_tools.mode import scale_modes
+from music_tools.note import n, p
+from music_tools.pitch import Interval, OctavePitch
+from music_tools.roman import analyze
+from music_tools.scale import (
+    PitchClassMask,
+    gen_conventional_scales,
+    mask_to_scale,
+    name_to_scale,
+)
+from music_tools.scale_table import ScaleTable, ScaleTableBuilder
+from music_tools.terminal import IncrementalFretboardRenderer
+from music_tools.tuning_system import TuningSystem, edo
+
+Params = dict[str, Any]
+Setup = Callable[..., Callable[[], object]]
+"""Given params, prepares the inputs and returns the function to time"""
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Setup
+    params: list[Params]
+
+    def cases(self) -> Iterable[tuple[str, Params]]:
+        for params in self.params:
+            suffix = ",".join(f"{k}={v}" for k, v in params.items())
+            yield (f"{self.name}[{suffix}]" if suffix else self.name), params
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(name: str, *params: Params) -> Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS.append(Benchmark(name, setup, list(params) or [{}]))
+        return setup
+
+    return register
+
+
+_NOTE_NAMES = "C C# Db D Eb E F F# Gb G Ab A Bb B".split()
+
+
+@benchmark("note.n", {"count": 100}, {"count": 1000})
+def _bench_n(count: int) -> Callable[[], object]:
+    rng = random.Random(0)
+    texts = [rng.choice(_NOTE_NAMES) for _ in range(count)]
+    return lambda: [n(text) for text in texts]
+
+
+@benchmark("note.p", {"count": 100}, {"count": 1000})
+def _bench_p(count: int) -> Callable[[], object]:
+    rng = random.Random(0)
+    texts = [f"{rng.choice(_NOTE_NAMES)}{rng.randrange(8)}" for _ in range(count)]
+    return lambda: [p(text) for text in texts]
+
+
+@benchmark("guitar.from_tuning", {"strings": 6}, {"strings": 12})
+def _bench_from_tuning(strings: int) -> Callable[[], object]:
+    tuning = " ".join(["E2"] * strings)
+    return lambda: Fretboard.from_tuning(tuning)
+
+
+@benchmark("scale.gen_conventional_scales")
+def _bench_gen_conventional_scales() -> Callable[[], object]:
+    return lambda: list(gen_conventional_scales())
+
+
+@benchmark("mode.scale_modes")
+def _bench_scale_modes() -> Callable[[], object]:
+    scales = list(gen_conventional_scales())
+    return lambda: [list(scale_modes(scale)) for scale in scales]
+
+
+@benchmark(
+    "tuning_system.masks",
+    {"divisions": 12},
+    {"divisions": 19},
+    {"divisions": 31},
+)
+def _bench_tuning_system_masks(divisions: int) -> Callable[[], object]:
+    system = edo(divisions)
+    scales = list(system.named_scales.values())
+    return lambda: [
+        system.transpose_mask(system.scale_to_mask(scale), root)
+        for scale in scales
+        for root in range(divisions)
+    ]
+
+
+@benchmark(
+    "tuning_system.tables",
+    {"divisions": 12},
+    {"divisions": 19},
+    {"divisions": 31},
+)
+def _bench_tuning_system_tables(divisions: int) -> Callable[[], object]:
+    # A new system each time, so nothing is cached
+    return lambda: TuningSystem(divisions).scale_catalogue
+
+
+def _random_steps(length: int) -> list[int]:
+    rng = random.Random(length)
+    return [rng.randrange(1, 4) for _ in range(length)]
+
+
+@benchmark("algorithms.SubsequenceSearcher", {"length": 12}, {"length": 48})
+def _bench_searcher_construction(length: int) -> Callable[[], object]:
+    sequence = _random_steps(length)
+    return lambda: SubsequenceSearcher(sequence)
+
+
+@benchmark(
+    "algorithms.find_subsequence_indices",
+    {"length": 12, "queries": 100},
+    {"length": 48, "queries": 100},
+)
+def _bench_searcher_queries(length: int, queries: int) -> Callable[[], object]:
+    sequence = _random_steps(length)
+    searcher = SubsequenceSearcher(sequence)
+    rng = random.Random(0)
+    patterns = [_random_steps(rng.randrange(2, 6)) for _ in range(queries)]
+    return lambda: [list(searcher.find_subsequence_indices(q)) for q in patterns]
+
+
+@benchmark("chord.chords_in_scale")
+def _bench_chords_in_scale() -> Callable[[], object]:
+    scales = list(name_to_scale.values()) + list(gen_conventional_scales())
+    return lambda: [list(chords_in_scale(scale)) for scale in scales]
+
+
+@benchmark("scale_table.filters", {"count": 10_000}, {"count": 100_000})
+def _bench_scale_table_filters(count: int) -> Callable[[], object]:
+    rng = random.Random(count)
+    table = ScaleTable.from_scales(
+        mask_to_scale(PitchClassMask(rng.randrange(1 << 11) << 1 | 1))
+        for _ in range(count)
+    )
+    third = [Interval(4)]
+    return lambda: table.with_note_count(7).containing(third).with_interval(Interval(6))
+
+
+@benchmark("chord_scale_matrix.rows_over")
+def _bench_chord_scale_rows_over() -> Callable[[], object]:
+    matrix = ChordScaleMatrix.build()
+    roots = [n(name) for name in _NOTE_NAMES]
+    chords = [ChordDescription(*shape) for shape in CHORD_SHAPES]
+    nine = [Tension.Nine]
+    return lambda: [
+        matrix.rows_over(root, chord, with_tensions=nine)
+        for root in roots
+        for chord in chords
+    ]
+
+
+@benchmark("roman.analyze")
+def _bench_roman_analyze() -> Callable[[], object]:
+    # ii-V-I through every key, with the key detected as it goes
+    diatonic = list(chords_in_scale(name_to_scale["Major"], include_seven=True))
+    chords: list[Chord] = []
+    for root in range(0, 12 * 7, 7):
+        for degree in (1, 4, 0):
+            chords.append(
+                Chord(tuple(OctavePitch(root + i.half_steps) for i in diatonic[degree]))
+            )
+    return lambda: list(analyze(chords * 10))
+
+
+@benchmark(
+    "algorithms.IntArraySubsequenceSearcher",
+    {"length": 48, "queries": 100},
+    {"length": 100_000, "queries": 100},
+)
+def _bench_int_array_searcher(length: int, queries: int) -> Callable[[], object]:
+    import numpy as np
+
+    sequence = np.array(_random_steps(length))
+    rng = random.Random(0)
+    patterns = [_random_steps(rng.randrange(2, 6)) for _ in range(queries)]
+    return lambda: IntArraySubsequenceSearcher(sequence).find_all_subsequence_indices(
+        patterns
+    )
+
+
+def _layer(seed: int) -> FretboardAnnotation[str]:
+    marked = {pc for pc in range(12) if (pc * 7 + seed) % 12 < 7}
+
+    def annotation(loc: FretboardLocation) -> str | None:
+        _, _, pitch = loc
+        return "o" if pitch.half_steps % 12 in marked else None
+
+    return annotation
+
+
+def _render_params() -> list[Params]:
+    return [
+        {"board": board, "frets": frets, "layers": layers}
+        for board in ("EADGBE", "MEGA")
+        for frets in (12, 24, 36)
+        for layers in (1, 2, 4, 8)
+    ]
+
+
+@benchmark("guitar.render_fretboard_ascii", *_render_params())
+def _bench_render(board: str, frets: int, layers: int) -> Callable[[], object]:
+    fretboard = EADGBE if board == "EADGBE" else MEGA_FRETBOARD
+    annotation_layers = [_layer(i) for i in range(layers)]
+    return lambda: render_fretboard_ascii(fretboard, frets, annotation_layers)
+
+
+@benchmark("guitar.render_fretboard_ascii.compiled", *_render_params())
+def _bench_render_compiled(board: str, frets: int, layers: int) -> Callable[[], object]:
+    fretboard = EADGBE if board == "EADGBE" else MEGA_FRETBOARD
+    annotation_layers: list[FretboardAnnotation[str]] = [
+        compile_annotation(fretboard, frets, _layer(i)) for i in range(layers)
+    ]
+    return lambda: render_fretboard_ascii(fretboard, frets, annotation_layers)
+
+
+@benchmark("diagram.render_fretboard_svg", *_render_params())
+def _bench_render_svg(board: str, frets: int, layers: int) -> Callable[[], object]:
+    fretboard = EADGBE if board == "EADGBE" else MEGA_FRETBOARD
+    annotation_layers = [_layer(i) for i in range(layers)]
+    return lambda: render_fretboard_svg(fretboard, frets, annotation_layers)
+
+
+@benchmark("diagram.render_fretboard_html", *_render_params())
+def _bench_render_html(board: str, frets: int, layers: int) -> Callable[[], object]:
+    fretboard = EADGBE if board == "EADGBE" else MEGA_FRETBOARD
+    annotation_layers = [_layer(i) for i in range(layers)]
+    return lambda: render_fretboard_html(fretboard, frets, annotation_layers)
+
+
+Renderer = Callable[[Fretboard, int, list[FretboardAnnotation[str]]], str]
+
+_RENDERERS: dict[str, Renderer] = {
+    "ascii": render_fretboard_ascii,
+    "svg": render_fretboard_svg,
+    "html": render_fretboard_html,
+}
+
+
+@benchmark(
+    "diagram.book",
+    *({"renderer": renderer, "diagrams": 1000} for renderer in _RENDERERS),
+)
+def _bench_book(renderer: str, diagrams: int) -> Callable[[], object]:
+    # Many diagrams of the same neck, with a different annotation each
+    render = _RENDERERS[renderer]
+    layers = [[_layer(seed)] for seed in range(diagrams)]
+    return lambda: [
+        render(EADGBE, 15, annotation_layers) for annotation_layers in layers
+    ]
+
+
+@benchmark(
+    "terminal.IncrementalFretboardRenderer",
+    {"board": "EADGBE", "frets": 24},
+    {"board": "MEGA", "frets": 24},
+)
+def _bench_incremental_render(board: str, frets: int) -> Callable[[], object]:
+    fretboard = EADGBE if board == "EADGBE" else MEGA_FRETBOARD
+    renderer = IncrementalFretboardRenderer(fretboard, frets)
+    # Walk around the circle of fifths, one frame per key
+    frames = [[_layer(7 * i)] for i in range(12)]
+    return lambda: [renderer.render(layers) for layers in frames]
+
+
+def _time(fn: Callable[[], object], *, repeat: int, min_time: float) -> dict[str, Any]:
+    timer = timeit.Timer(fn)
+    # Pick a loop count so one measurement takes at least min_time
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "loops": number,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    pattern = re.compile(args.filter) if args.filter else None
+    repeat, min_time = (3, 0.02) if args.quick else (7, 0.2)
+
+    results: dict[str, dict[str, Any]] = {}
+    for bench in BENCHMARKS:
+        for case_name, params in bench.cases():
+            if pattern and not pattern.search(case_name):
+                continue
+            try:
+                fn = bench.setup(**params)
+            except ImportError as e:
+                # Benchmarks of optional dependencies
+                print(f"{case_name:<72} skipped, {e}", flush=True)
+                continue
+            result = _time(fn, repeat=repeat, min_time=min_time)
+            results[case_name] = {"params": params, **result}
+            print(f"{case_name:<72} {result['min_s'] * 1e6:>12.1f} us", flush=True)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return 0
+
+
+def _allocated_bytes(build: Callable[[], object]) -> int:
+    """Memory still held by what `build` returns"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return allocated
+
+
+def _scale_list(masks: list[int], roots: list[int]) -> object:
+    return [
+        (mask_to_scale(PitchClassMask(mask)), OctavePitch(root))
+        for mask, root in zip(masks, roots)
+    ]
+
+
+def _scale_table(masks: list[int], roots: list[int]) -> object:
+    builder = ScaleTableBuilder()
+    for mask, root in zip(masks, roots):
+        builder.append_mask(mask, OctavePitch(root))
+    return builder.build()
+
+
+def memory(args: argparse.Namespace) -> int:
+    counts = [10_000] if args.quick else [10_000, 100_000, 300_000]
+    results: dict[str, dict[str, Any]] = {}
+    for count in counts:
+        rng = random.Random(count)
+        # Random scales containing their root, with a root each
+        masks = [rng.randrange(1 << 11) << 1 | 1 for _ in range(count)]
+        roots = [rng.randrange(12) for _ in range(count)]
+        for kind, build in (
+            ("list[Scale]", _scale_list),
+            ("ScaleTable", _scale_table),
+        ):
+            allocated = _allocated_bytes(partial(build, masks, roots))
+            case_name = f"{kind}[count={count}]"
+            results[case_name] = {
+                "bytes": allocated,
+                "bytes_per_scale": allocated / count,
+            }
+            print(
+                f"{case_name:<40} {allocated / 2**20:>10.2f} MiB "
+                f"{allocated / count:>10.1f} B/scale",
+                flush=True,
+            )
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(
+                {"python": platform.python_version(), "results": results}, f, indent=2
+            )
+            f.write("\n")
+    return 0
+
+
+IMPORT_TIME_BUDGET_US = 50_000
+"""Total time spent in the bodies of music_tools modules on import, excluding
+the standard library and dependencies"""
+
+MODULE_IMPORT_BUDGET_US = 20_000
+"""Time spent in the body of any one music_tools module on import"""
+
+
+def _import_self_times(runs: int) -> dict[str, int]:
+    """Import time of the body of every music_tools module in microseconds,
+    the best of `runs` runs to leave out scheduling noise"""
+    import music_tools
+
+    modules = [
+        f"music_tools.{module.name}"
+        for module in pkgutil.iter_modules(music_tools.__path__)
+    ]
+    self_times: dict[str, int] = {}
+    with tempfile.TemporaryDirectory() as cache:
+        # Time the module bodies, not compiling them: a first run caches the
+        # bytecode, as in an installed package, outside the source tree
+        env = {**os.environ, "PYTHONPYCACHEPREFIX": cache}
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        for run in range(runs + 1):
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "-X",
+                    "importtime",
+                    "-c",
+                    f"import {', '.join(modules)}",
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+                env=env,
+            )
+            if run == 0:
+                continue
+            for line in result.stderr.splitlines():
+                # import time: self [us] | cumulative | imported package
+                self_us, _, module = line.removeprefix("import time:").split("|")
+                module = module.strip()
+                if module.startswith("music_tools"):
+                    self_times[module] = min(
+                        int(self_us), self_times.get(module, int(self_us))
+                    )
+    return self_times
+
+
+def import_time(args: argparse.Namespace) -> int:
+    self_times = _import_self_times(args.runs)
+    for module, self_us in sorted(self_times.items(), key=lambda item: -item[1]):
+        status = "OVER BUDGET" if self_us > MODULE_IMPORT_BUDGET_US else ""
+        print(f"{module:<40} {self_us:>8} us {status}")
+    total = sum(self_times.values())
+    print(f"{'total':<40} {total:>8} us")
+
+    over_budget = total > IMPORT_TIME_BUDGET_US or any(
+        self_us > MODULE_IMPORT_BUDGET_US for self_us in self_times.values()
+    )
+    if over_budget:
+        print(
+            f"Over the import time budget of {IMPORT_TIME_BUDGET_US} us in total, "
+            f"or {MODULE_IMPORT_BUDGET_US} us per module"
+        )
+        return 1
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    regressions = 0
+    for case_name in sorted(baseline.keys() & current.keys()):
+        before = baseline[case_name]["min_s"]
+        after = current[case_name]["min_s"]
+        ratio = after / before
+        regressed = ratio > 1 + args.threshold
+        regressions += regressed
+        status = "REGRESSED" if regressed else ""
+        print(f"{case_name:<72} {ratio:>6.2f}x {status}")
+
+    missing = baseline.keys() - current.keys()
+    if missing:
+        print(f"{len(missing)} baseline benchmark(s) not in current results")
+
+    if regressions:
+        print(f"{regressions} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--out", help="write results to this JSON file")
+    run_parser.add_argument("--filter", help="only run cases matching this regex")
+    run_parser.add_argument(
+        "--quick", action="store_true", help="fewer, shorter repetitions"
+    )
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed slowdown as a fraction of the baseline (default 0.1)",
+    )
+    compare_parser.set_defaults(func=compare)
+
+    memory_parser = commands.add_parser(
+        "memory", help="measure memory held by scale collections"
+    )
+    memory_parser.add_argument("--out", help="write results to this JSON file")
+    memory_parser.add_argument(
+        "--quick", action="store_true", help="only the smallest collection"
+    )
+    memory_parser.set_defaults(func=memory)
+
+    import_time_parser = commands.add_parser(
+        "import-time", help="check the import time of every module"
+    )
+    import_time_parser.add_argument(
+        "--runs", type=int, default=5, help="keep the best of this many runs"
+    )
+    import_time_parser.set_defaults(func=import_time)
+
+    args = parser.parse_args()
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Benchmark nearest-scale queries against an exhaustive scan of the
+catalogue."""
+
+import random
+import time
+from collections.abc import Callable
+
+from music_tools.scale import PitchClassMask
+from music_tools.similarity import (
+    Metric,
+    ScaleIndex,
+    hamming_distance,
+    voice_leading_distance,
+)
+
+NUM_QUERIES = 100_000
+NUM_EXHAUSTIVE = 200
+K = 5
+
+
+def exhaustive_nearest(
+    index: ScaleIndex, query: PitchClassMask, metric: Metric
+) -> list[tuple[int, int]]:
+    distance = hamming_distance if metric == Metric.Hamming else voice_leading_distance
+    return sorted(
+        (distance(query, mask), entry.order)
+        for mask, entries in index.entries_by_mask.items()
+        for entry in entries
+    )[:K]
+
+
+def timed(label: str, count: int, run: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    print(f"{label:<36} {count / seconds:>12,.0f} queries/s")
+
+
+def main() -> None:
+    rng = random.Random(0)
+    queries = [PitchClassMask(rng.randrange(4096)) for _ in range(NUM_QUERIES)]
+
+    for metric in Metric:
+        print(f"{metric.value}:")
+        index = ScaleIndex.build()
+
+        timed(
+            "exhaustive scan",
+            NUM_EXHAUSTIVE,
+            lambda: [
+                exhaustive_nearest(index, q, metric) for q in queries[:NUM_EXHAUSTIVE]
+            ],
+        )
+        timed(
+            "index, every distinct query",
+            4096,
+            lambda: [index.nearest(PitchClassMask(q), K, metric) for q in range(4096)],
+        )
+        timed(
+            f"index, {NUM_QUERIES:,} random queries",
+            NUM_QUERIES,
+            lambda: [index.nearest(q, K, metric) for q in queries],
+        )
+        print()
+
+
+if __name__ == "__main__":
+    main()
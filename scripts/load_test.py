@@ -0,0 +1,116 @@
+"""Load test a running `music_tools.server`.
+
+    python -m music_tools.server --port 8000 &
+    python scripts/load_test.py [--port 8000] [-c 32] [-n 5000] [--distinct 64]
+
+Opens `-c` keep-alive connections, sends `-n` fretboard requests spread over
+`--distinct` different queries (so both cache misses and hits are exercised),
+and reports requests per second and latency percentiles."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+_ROOTS = "C C# D Eb E F F# G Ab A Bb B".split()
+_SCALES = ["Major", "Minor", "Dorian", "Phrygian", "Lydian", "Mixolydian"]
+
+
+def _targets(distinct: int) -> list[str]:
+    queries = itertools.islice(
+        itertools.cycle(
+            {"root": root, "scale": scale, "frets": frets}
+            for frets in (12, 24)
+            for scale in _SCALES
+            for root in _ROOTS
+        ),
+        distinct,
+    )
+    return [f"/api/fretboard?{urlencode(query)}" for query in queries]
+
+
+async def _request(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, target: str
+) -> int:
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(
+    host: str,
+    port: int,
+    targets: list[str],
+    latencies: list[float],
+    statuses: Counter[int],
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for target in targets:
+            start = time.perf_counter()
+            statuses[await _request(reader, writer, host, target)] += 1
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def load_test(args: argparse.Namespace) -> None:
+    targets = _targets(args.distinct)
+    requests = [targets[i % len(targets)] for i in range(args.requests)]
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _client(
+                args.host,
+                args.port,
+                requests[i :: args.concurrency],
+                latencies,
+                statuses,
+            )
+            for i in range(args.concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{len(latencies)} requests in {elapsed:.2f}s: {len(latencies) / elapsed:.0f} req/s"
+    )
+    print(
+        f"latency ms: p50 {percentiles[49] * 1e3:.2f}, p90 {percentiles[89] * 1e3:.2f}, "
+        f"p99 {percentiles[98] * 1e3:.2f}, max {max(latencies) * 1e3:.2f}"
+    )
+    print("status:", dict(sorted(statuses.items())))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    parser.add_argument("-n", "--requests", type=int, default=5000)
+    parser.add_argument(
+        "--distinct", type=int, default=64, help="number of different queries"
+    )
+    asyncio.run(load_test(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
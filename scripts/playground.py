@@ -1,9 +1,14 @@
+import sys
+import time
+
 from music_tools.guitar import (
     EADGBE,
     MEGA_FRETBOARD,
     T,
     FretboardAnnotation,
     FretboardLocation,
+    compile_annotation,
+    compile_scale_degrees,
     render_fretboard_ascii,
 )
 from music_tools.pitch import (
@@ -17,36 +22,19 @@ from music_tools.note import (
     n,
     note_parser,
 )
-from music_tools.scale import ConcreteScale, name_to_scale, scale_with_root
+from music_tools.scale import (
+    ConcreteScale,
+    gen_conventional_scales,
+    name_to_scale,
+    scale_with_root,
+)
+from music_tools.scale_family import group_scale_families
 from music_tools.mode import major_scale_modes_by_name
-
-# TODO: categorize each generated scale as mode of some parent scale
-
-
-class TermColor:
-    HEADER = "\033[95m"
-    RED = "\033[91m"
-    GREEN = "\033[92m"
-    YELLOW = "\033[93m"
-    ORANGE = "\033[38:5:214m"
-    BLUE = "\033[94m"
-    MAGENTA = "\033[95m"
-    CYAN = "\033[96m"
-    ENDC = "\033[0m"
-    BOLD = "\033[1m"
-    UNDERLINE = "\033[4m"
-
-
-COLOR_GRADIENT = [
-    TermColor.BOLD,
-    TermColor.GREEN,
-    TermColor.CYAN,
-    TermColor.BLUE,
-    TermColor.MAGENTA,
-    TermColor.RED,
-    TermColor.ORANGE,
-    TermColor.YELLOW,
-]
+from music_tools.terminal import (
+    COLOR_GRADIENT,
+    IncrementalFretboardRenderer,
+    TermColor,
+)
 
 
 # TODO: add more options, make them optional
@@ -104,8 +92,32 @@ def n_note_per_string(
     return annotation
 
 
+def walkthrough(fps: float = 60) -> None:
+    """Step through every mode in every key, redrawing only what changed"""
+    renderer = IncrementalFretboardRenderer(MEGA_FRETBOARD, 24, top=2)
+    sys.stdout.write("\033[2J")
+    for root in "C G D A E B F# Db Ab Eb Bb F".split():
+        for mode_name, mode in major_scale_modes_by_name.items():
+            layer = compile_scale_degrees(
+                MEGA_FRETBOARD,
+                24,
+                scale_with_root(n(root), mode),
+                COLOR_GRADIENT,
+                TermColor.ENDC,
+            )
+            sys.stdout.write(
+                f"\033[1;1H{root} {mode_name}\033[K" + renderer.render([layer])
+            )
+            sys.stdout.flush()
+            time.sleep(1 / fps)
+
+
 def main() -> None:
-    c_maj_7 = major_7_annotation(note_parser.parse("C"))
+    if sys.argv[1:] == ["walkthrough"]:
+        walkthrough()
+        return
+
+    c_maj_7 = compile_annotation(EADGBE, 24, major_7_annotation(note_parser.parse("C")))
 
     print(render_fretboard_ascii(EADGBE, 24, [c_maj_7]))
 
@@ -119,6 +131,11 @@ def main() -> None:
 
     print(major_scale_modes_by_name)
 
+    print()
+
+    for family, members in group_scale_families(gen_conventional_scales()).items():
+        print(f"{family.parent_name}: {', '.join(m.name for m in members)}")
+
 
 if __name__ == "__main__":
     main()
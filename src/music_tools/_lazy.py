@@ -0,0 +1,27 @@
+"""Lazily computed module attributes (PEP 562).
+
+Tables like `name_to_scale` or `EADGBE` are cheap individually, but every
+short-lived process importing `music_tools` would pay for all of them. Instead
+each is computed on first access and then stored in the module's globals, so
+later lookups are ordinary attribute accesses."""
+
+from collections.abc import Callable, Mapping
+from typing import Any
+
+
+def lazy_attributes(
+    module_globals: dict[str, Any], factories: Mapping[str, Callable[[], Any]]
+) -> Callable[[str], Any]:
+    """Make a module `__getattr__` that computes attributes from `factories`
+    on first access, and caches them in `module_globals`"""
+    module_name = module_globals["__name__"]
+
+    def __getattr__(name: str) -> Any:
+        factory = factories.get(name)
+        if factory is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = factory()
+        module_globals[name] = value
+        return value
+
+    return __getattr__
@@ -1,6 +1,14 @@
-from typing import Generic, Iterable, Protocol, TypeVar
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Generic, Iterable, Protocol, TypeVar
 from typing_extensions import Self
 
+from .instrument import instrumented
+
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import ArrayLike, NDArray
+
 T = TypeVar("T")
 
 
@@ -57,6 +65,7 @@ class SubsequenceSearcher(Generic[S]):
 
         self.search_matrix = search_matrix
 
+    @instrumented("algorithms.find_subsequence_indices")
     def find_subsequence_indices(self, subsequence: Iterable[S]) -> Iterable[int]:
         subseq_list = tuple(subsequence)
         for starting_index, row in enumerate(self.search_matrix):
@@ -75,3 +84,83 @@ class SubsequenceSearcher(Generic[S]):
                 yield starting_index
             except ValueError:
                 continue
+
+
+_TABLE_LOOKUP_MAX_SPAN = 16
+"""Positions are looked up in a table indexed by position, instead of by
+binary search, if the total of the sequence is at most this many times its
+length"""
+
+
+class IntArraySubsequenceSearcher:
+    """`SubsequenceSearcher` specialized for integer sequences as NumPy
+    arrays, e.g. the intervals of a long melody. Requires numpy.
+
+    Instead of the quadratic search matrix, only the position of every
+    element along the circular sequence (cumulative sums) is kept, and a
+    pattern is followed from every starting index at once: each jump must
+    land on the position of another element. Finds the same indices as
+    `SubsequenceSearcher`, in the same order, as an array."""
+
+    def __init__(self, parent_sequence: ArrayLike) -> None:
+        import numpy as np
+
+        sequence = np.asarray(parent_sequence)
+        if sequence.ndim != 1 or not (
+            sequence.size == 0 or np.issubdtype(sequence.dtype, np.integer)
+        ):
+            raise ValueError("Expected a 1-D sequence of integers")
+        sequence = sequence.astype(np.int64)
+        if not (sequence > 0).all():
+            raise ValueError("Jumps along the sequence must increase")
+
+        self.length = len(sequence)
+        self.total = int(sequence.sum())
+        # positions[i] is the distance from element 0 to element i
+        self.positions: NDArray[np.int64] = np.cumsum(sequence) - sequence
+
+        # Jumps land less than a full loop past an element, so lookups cover
+        # two laps of the sequence, element i being at both positions[i]
+        # and positions[i] + total
+        self._two_laps = np.concatenate((self.positions, self.positions + self.total))
+        self._index_at: NDArray[np.int64] | None = None
+        if self.total <= _TABLE_LOOKUP_MAX_SPAN * max(self.length, 1):
+            self._index_at = np.full(2 * self.total, -1, dtype=np.int64)
+            self._index_at[self._two_laps] = np.tile(np.arange(self.length), 2)
+
+    def _lookup(
+        self, targets: NDArray[np.int64]
+    ) -> tuple[NDArray[np.int64], NDArray[np.bool_]]:
+        """Index of the element at each position, and whether there is one"""
+        import numpy as np
+
+        if self._index_at is not None:
+            indices = self._index_at[targets]
+            return indices, indices >= 0
+        indices = np.searchsorted(self._two_laps, targets)
+        landed = self._two_laps[np.minimum(indices, 2 * self.length - 1)] == targets
+        return indices % self.length, landed
+
+    @instrumented("algorithms.find_subsequence_indices")
+    def find_subsequence_indices(self, subsequence: ArrayLike) -> NDArray[np.intp]:
+        import numpy as np
+
+        jumps = np.asarray(subsequence, dtype=np.int64).reshape(-1).tolist()
+        starts: NDArray[np.intp] = np.arange(self.length if self.length > 1 else 0)
+        if not all(0 < jump < self.total for jump in jumps):
+            # A jump can be any number of elements, short of a full loop
+            return starts[:0]
+
+        # Follow the pattern from the starting indices it has matched so
+        # far, most of which are dropped after the first few jumps
+        current: NDArray[np.int64] = starts
+        for jump in jumps:
+            current, landed = self._lookup(self.positions[current] + jump)
+            starts, current = starts[landed], current[landed]
+        return starts
+
+    def find_all_subsequence_indices(
+        self, subsequences: Iterable[ArrayLike]
+    ) -> list[NDArray[np.intp]]:
+        """Starting indices of each of a batch of patterns"""
+        return [self.find_subsequence_indices(s) for s in subsequences]
@@ -0,0 +1,367 @@
+"""Build the catalogue of every scale, its chords and their voicings, for a
+set of tunings, over a process pool.
+
+The work is split into shards, one per (tuning, scale family, root). Each
+shard is one JSON line listing the family's modes on that root, with their
+notes, fretboard diagram and diatonic chords, and the voicings of those
+chords on the tuning. Shards are checkpointed to a directory as they
+complete, so an interrupted build resumes with the missing shards only, and
+the output is the shards' lines in a fixed order, byte-identical whatever
+the number of workers. Chord voicings, which most of the shards share, are
+computed once across all workers and kept in a `MemoStore` next to the
+checkpoints."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .guitar import Voicing
+    from .memo import MemoStore
+    from .scale_family import ClassifiedScale, ScaleFamily
+
+MANIFEST = "manifest.json"
+VOICINGS = "voicings.sqlite3"
+
+
+@dataclass(frozen=True)
+class CatalogueSpec:
+    tunings: tuple[str, ...] = ("EADGBE", "DROP_A")
+    """Named tunings or tuning strings, as accepted by the CLI"""
+    frets: int = 12
+    max_span: int = 4
+    """Frets spanned by the fretted notes of a voicing"""
+    families: tuple[str, ...] | None = None
+    """Parent scale names of the families to include, or None for all"""
+
+
+@dataclass(frozen=True, order=True)
+class Shard:
+    tuning: int
+    family: int
+    """Index into the families of the default scale catalogue"""
+    root: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.tuning:02d}-{self.family:02d}-{self.root:02d}"
+
+
+@cache
+def _families() -> list[tuple[ScaleFamily, list[ClassifiedScale]]]:
+    """Families of the distinct scales in the default catalogue, each with
+    its modes in mode order"""
+    from .scale_family import group_scale_families
+    from .similarity import default_catalogue
+
+    groups = group_scale_families(dict.fromkeys(s for _, s in default_catalogue()))
+    return [
+        (family, sorted(modes, key=lambda mode: mode.mode))
+        for family, modes in groups.items()
+    ]
+
+
+def shards(spec: CatalogueSpec) -> list[Shard]:
+    """Every shard of a build, in output order"""
+    families = [
+        i
+        for i, (family, _) in enumerate(_families())
+        if spec.families is None or family.parent_name in spec.families
+    ]
+    return [
+        Shard(tuning, family, root)
+        for tuning in range(len(spec.tunings))
+        for family in families
+        for root in range(12)
+    ]
+
+
+_memo: MemoStore | None = None
+"""Voicings shared by the processes of a build"""
+
+
+def _use_memo(memo: MemoStore | None) -> None:
+    global _memo
+    _memo = memo
+
+
+@cache
+def _voicings(
+    tuning: str, chord: tuple[int, ...], frets: int, max_span: int
+) -> list[Voicing]:
+    """Voicings with the chord root in the bass"""
+    from .query import fretboard_by_name
+    from .guitar import find_voicings
+    from .pitch import OctavePitch
+
+    def compute() -> list[Voicing]:
+        return list(
+            find_voicings(
+                fretboard_by_name(tuning),
+                [OctavePitch(pitch_class) for pitch_class in chord],
+                frets,
+                max_span=max_span,
+                root_in_bass=True,
+            )
+        )
+
+    if _memo is None:
+        return compute()
+    inputs = (tuning, chord, frets, max_span)
+    return _memo.get_or_compute("catalogue.voicings", inputs, compute)
+
+
+def build_shard(spec: CatalogueSpec, shard: Shard) -> str:
+    """The shard's JSON line, without a trailing newline"""
+    from .chord import chords_in_scale
+    from .query import fretboard_by_name
+    from .guitar import compile_pitch_classes, render_fretboard_ascii
+    from .note import closest_sharp
+    from .pitch import OctavePitch
+
+    tuning = spec.tunings[shard.tuning]
+    fretboard = fretboard_by_name(tuning)
+    family, modes = _families()[shard.family]
+    root = OctavePitch(shard.root)
+
+    def name(pitch_class: int) -> str:
+        return str(closest_sharp(OctavePitch(pitch_class)))
+
+    scales = []
+    voicings: dict[str, list[Voicing]] = {}
+    for mode in modes:
+        pitch_classes = [(root + interval).half_steps for interval in mode.scale]
+        degrees = compile_pitch_classes(
+            fretboard,
+            spec.frets,
+            {
+                OctavePitch(pc): str(degree + 1)
+                for degree, pc in enumerate(pitch_classes)
+            },
+        )
+
+        chords = []
+        # Chords stacked in thirds are only defined for seven note scales
+        if len(mode.scale) == 7:
+            for sevenths in (False, True):
+                for degree_root, chord in zip(
+                    pitch_classes, chords_in_scale(mode.scale, include_seven=sevenths)
+                ):
+                    tones = tuple(
+                        (degree_root + interval.half_steps) % 12 for interval in chord
+                    )
+                    notes = " ".join(map(name, tones))
+                    chords.append(notes)
+                    if notes not in voicings:
+                        voicings[notes] = _voicings(
+                            tuning, tones, spec.frets, spec.max_span
+                        )
+        scales.append(
+            {
+                "name": mode.name,
+                "mode": mode.mode,
+                "notes": [name(pc) for pc in pitch_classes],
+                "board": render_fretboard_ascii(fretboard, spec.frets, [degrees]),
+                "chords": chords,
+            }
+        )
+
+    record = {
+        "tuning": tuning,
+        "family": family.parent_name,
+        "root": name(shard.root),
+        "scales": scales,
+        "voicings": voicings,
+    }
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def _build_shard(spec: CatalogueSpec, shard: Shard) -> tuple[Shard, str]:
+    return shard, build_shard(spec, shard)
+
+
+def _write_atomically(path: Path, text: str) -> None:
+    """Write a file that is either complete or absent, even if interrupted"""
+    partial = path.with_name(f"{path.name}.partial")
+    partial.write_text(text, encoding="utf-8")
+    os.replace(partial, path)
+
+
+def _manifest(spec: CatalogueSpec) -> str:
+    from .memo import library_version
+
+    return json.dumps(
+        {"spec": asdict(spec), "version": library_version()}, sort_keys=True
+    )
+
+
+def _open_checkpoints(spec: CatalogueSpec, checkpoint_dir: Path) -> None:
+    """Create the checkpoint directory, or check that it holds checkpoints
+    of the same build"""
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    manifest = checkpoint_dir / MANIFEST
+    if manifest.exists():
+        if manifest.read_text(encoding="utf-8") != _manifest(spec):
+            raise ValueError(
+                f"{checkpoint_dir} holds checkpoints of a different build,"
+                " use another directory or delete it"
+            )
+    else:
+        _write_atomically(manifest, _manifest(spec))
+
+
+def build_catalogue(
+    spec: CatalogueSpec,
+    checkpoint_dir: str | os.PathLike[str],
+    output: str | os.PathLike[str],
+    *,
+    workers: int = 0,
+    progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """Build the shards missing from `checkpoint_dir` over `workers`
+    processes (inline if 0), then write the catalogue to `output`, one line
+    per shard. `progress` is called with the number of shards done and the
+    total as they complete. Returns the number of shards built by this call."""
+    checkpoints = Path(checkpoint_dir)
+    _open_checkpoints(spec, checkpoints)
+    all_shards = shards(spec)
+    pending = [
+        shard
+        for shard in all_shards
+        if not (checkpoints / f"{shard.name}.json").exists()
+    ]
+
+    done = len(all_shards) - len(pending)
+
+    def checkpoint(shard: Shard, line: str) -> None:
+        nonlocal done
+        _write_atomically(checkpoints / f"{shard.name}.json", f"{line}\n")
+        done += 1
+        if progress is not None:
+            progress(done, len(all_shards))
+
+    from .memo import MemoStore
+
+    memo = MemoStore(checkpoints / VOICINGS, max_entries=1_000_000)
+    try:
+        if workers == 0:
+            _use_memo(memo)
+            try:
+                for shard in pending:
+                    checkpoint(shard, build_shard(spec, shard))
+            finally:
+                _use_memo(None)
+        elif pending:
+            _build_in_pool(spec, pending, workers, memo, checkpoint)
+    finally:
+        memo.close()
+
+    _write_atomically(
+        Path(output),
+        "".join(
+            (checkpoints / f"{shard.name}.json").read_text(encoding="utf-8")
+            for shard in all_shards
+        ),
+    )
+    return len(pending)
+
+
+def _build_in_pool(
+    spec: CatalogueSpec,
+    pending: Sequence[Shard],
+    workers: int,
+    memo: MemoStore,
+    checkpoint: Callable[[Shard, str], None],
+) -> None:
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    pool = ProcessPoolExecutor(
+        max_workers=workers, initializer=_use_memo, initargs=(memo,)
+    )
+    try:
+        futures = [pool.submit(_build_shard, spec, shard) for shard in pending]
+        for future in as_completed(futures):
+            checkpoint(*future.result())
+    except BaseException:
+        # Keep the checkpoints written so far, and stop promptly
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="music-tools-catalogue",
+        description="Build the scale, chord and voicing catalogue",
+    )
+    parser.add_argument("output", help="catalogue file, one JSON line per shard")
+    parser.add_argument(
+        "--checkpoints",
+        help="directory of completed shards, to resume from (default OUTPUT.shards)",
+    )
+    parser.add_argument(
+        "--tuning",
+        action="append",
+        dest="tunings",
+        help="tuning to include, may be repeated (default EADGBE and DROP_A)",
+    )
+    parser.add_argument(
+        "--family",
+        action="append",
+        dest="families",
+        help="scale family to include, may be repeated (default all)",
+    )
+    parser.add_argument("--frets", type=int, default=12)
+    parser.add_argument("--max-span", type=int, default=4)
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes, 0 to build inline (default: number of CPUs)",
+    )
+    args = parser.parse_args(argv)
+
+    from .query import RequestError, fretboard_by_name
+
+    defaults = CatalogueSpec()
+    spec = CatalogueSpec(
+        tunings=tuple(args.tunings or defaults.tunings),
+        frets=args.frets,
+        max_span=args.max_span,
+        families=tuple(args.families) if args.families else None,
+    )
+    try:
+        for tuning in spec.tunings:
+            fretboard_by_name(tuning)
+    except RequestError as e:
+        parser.error(str(e))
+    known = {family.parent_name for family, _ in _families()}
+    for family_name in spec.families or ():
+        if family_name not in known:
+            parser.error(f"unknown scale family: {family_name!r}")
+
+    def report(done: int, total: int) -> None:
+        print(f"\r{done}/{total} shards", end="", file=sys.stderr, flush=True)
+
+    built = build_catalogue(
+        spec,
+        args.checkpoints or f"{args.output}.shards",
+        args.output,
+        workers=args.workers,
+        progress=report,
+    )
+    print(f"\nbuilt {built} shards, wrote {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
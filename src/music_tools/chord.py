@@ -5,14 +5,14 @@
 # ♭ ♯ ♮
 
 from collections.abc import Iterable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import NewType
 
 from .mode import scale_modes
 from .note import Note
 from .scale import Scale
-from .pitch import OctavePitch
+from .pitch import Interval, OctavePitch
 
 
 class ToneQuality(Enum):
@@ -48,8 +48,17 @@ class Tension(Enum):
 class ChordDescription:
     triad: ToneQuality
     # TODO: suspensions
-    extension: Extension
-    tensions: list[Tension]
+    extension: Extension | None = None
+    tensions: list[Tension] = field(default_factory=list)
+
+
+_TRIAD_INTERVALS: dict[ToneQuality, tuple[int, int]] = {
+    ToneQuality.Diminished: (3, 6),
+    ToneQuality.Minor: (3, 7),
+    ToneQuality.Major: (4, 7),
+    ToneQuality.Augmented: (4, 8),
+}
+"""Third and fifth above the root of each triad"""
 
 
 ChordScale = Scale
@@ -60,6 +69,15 @@ Chord = NewType("Chord", tuple[OctavePitch, ...])
 # TODO: go from chord intervals to a description, e.g. m7b5
 
 
+def description_to_chord_scale(description: ChordDescription) -> ChordScale:
+    """Intervals of a described chord, in ascending order within an octave"""
+    half_steps = {0, *_TRIAD_INTERVALS[description.triad]}
+    if description.extension is not None:
+        half_steps.add(description.extension.value)
+    half_steps.update(tension.value for tension in description.tensions)
+    return ChordScale(tuple(Interval(i) for i in sorted(half_steps)))
+
+
 def instantiate_chord(chord_scale: ChordScale, root: Note) -> Chord:
     root_pitch = root.to_octave_pitch()
     return Chord(tuple((root_pitch + interval for interval in chord_scale)))
@@ -73,7 +91,7 @@ def chords_in_scale(
     scale: Scale, *, include_seven: bool = False
 ) -> Iterable[ChordScale]:
     for i, mode in enumerate(scale_modes(scale)):
-        chord = (mode[0], mode[2], mode[4])
+        chord: tuple[Interval, ...] = (mode[0], mode[2], mode[4])
         if include_seven:
-            chord + (mode[6],)
+            chord = chord + (mode[6],)
         yield ChordScale(chord)
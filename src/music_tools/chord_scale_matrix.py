@@ -0,0 +1,190 @@
+"""Which scales fit over which chords, precomputed across a scale catalogue.
+
+Every catalogue scale in all 12 transpositions is one row, and sets of rows
+are packed into int bitsets:
+
+- for every chord shape (triad and extension) and chord root, the rows
+  containing every chord tone
+- for every pitch class, the rows containing it
+
+so e.g. "scales over Cm7♭5 that contain ♮9" is two bitset ANDs followed by
+reading off the set bits."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import cache
+from itertools import product
+
+from .chord import (
+    ChordDescription,
+    Extension,
+    Tension,
+    ToneQuality,
+    description_to_chord_scale,
+)
+from .note import Note, closest_sharp
+from .pitch import OctavePitch
+from .scale import PitchClassMask, Scale, as_mask, transpose_mask
+
+ChordShape = tuple[ToneQuality, Extension | None]
+"""A chord quality regardless of its tensions and root, e.g. m7♭5 is
+(Diminished, MinorSeven)"""
+
+CHORD_SHAPES: tuple[ChordShape, ...] = tuple(product(ToneQuality, (None, *Extension)))
+"""Every triad, alone and with each extension. `Extension.DiminishedSeven`
+has the same value as `Extension.Six`, so it is an alias and not listed
+separately"""
+
+
+_TENSIONS: tuple[tuple[Tension, int], ...] = tuple(
+    (tension, tension.value) for tension in Tension
+)
+
+
+def _shape_mask(shape: ChordShape) -> PitchClassMask:
+    return as_mask(description_to_chord_scale(ChordDescription(*shape)))
+
+
+def avoid_tensions(chord: ChordDescription) -> tuple[Tension, ...]:
+    """Tensions a half-step above a chord tone, which clash with the chord"""
+    chord_mask = as_mask(description_to_chord_scale(chord))
+    return tuple(
+        tension
+        for tension in Tension
+        if chord_mask >> ((tension.value - 1) % 12) & 1
+        and not chord_mask >> tension.value & 1
+    )
+
+
+@dataclass(frozen=True)
+class ChordScaleMatch:
+    name: str
+    root: Note
+    scale: Scale
+    available_tensions: tuple[Tension, ...]
+    """Tensions over the chord root that are in the scale but not the chord"""
+    avoid_tensions: tuple[Tension, ...]
+    """The available tensions that clash with the chord"""
+
+
+@dataclass(frozen=True)
+class _Row:
+    name: str
+    root: Note
+    scale: Scale
+    mask: PitchClassMask
+    """Pitch classes of the transposed scale, relative to C"""
+
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class ChordScaleMatrix:
+    def __init__(self, catalogue: Iterable[tuple[str, Scale]]) -> None:
+        # Only the first name of each distinct scale is kept
+        scales: dict[PitchClassMask, tuple[str, Scale]] = {}
+        for name, scale in catalogue:
+            scales.setdefault(as_mask(scale), (name, scale))
+
+        self.rows: list[_Row] = [
+            _Row(
+                name,
+                closest_sharp(OctavePitch(root)),
+                scale,
+                transpose_mask(mask, root),
+            )
+            for mask, (name, scale) in scales.items()
+            for root in range(12)
+        ]
+        self.rows_with_pitch_class: list[int] = [
+            sum(1 << i for i, row in enumerate(self.rows) if row.mask >> pc & 1)
+            for pc in range(12)
+        ]
+        self.rows_with_chord: dict[tuple[ChordShape, int], int] = {
+            (shape, root): self._rows_containing(
+                transpose_mask(_shape_mask(shape), root)
+            )
+            for shape in CHORD_SHAPES
+            for root in range(12)
+        }
+
+    @staticmethod
+    def build(catalogue: Iterable[tuple[str, Scale]] | None = None) -> ChordScaleMatrix:
+        if catalogue is None:
+            return _default_matrix()
+        return ChordScaleMatrix(catalogue)
+
+    def _rows_containing(self, mask: PitchClassMask) -> int:
+        bits = (1 << len(self.rows)) - 1
+        for pc in range(12):
+            if mask >> pc & 1:
+                bits &= self.rows_with_pitch_class[pc]
+        return bits
+
+    def rows_over(
+        self,
+        root: Note,
+        chord: ChordDescription,
+        *,
+        with_tensions: Iterable[Tension] = (),
+        without_tensions: Iterable[Tension] = (),
+    ) -> int:
+        """Bitset of rows containing the chord (including its own tensions),
+        the given extra tensions, and none of the excluded ones"""
+        root_pc = root.to_octave_pitch().half_steps
+        bits = self.rows_with_chord[((chord.triad, chord.extension), root_pc)]
+        for tension in (*chord.tensions, *with_tensions):
+            bits &= self.rows_with_pitch_class[(root_pc + tension.value) % 12]
+        for tension in without_tensions:
+            bits &= ~self.rows_with_pitch_class[(root_pc + tension.value) % 12]
+        return bits
+
+    def scales_over(
+        self,
+        root: Note,
+        chord: ChordDescription,
+        *,
+        with_tensions: Iterable[Tension] = (),
+        without_tensions: Iterable[Tension] = (),
+    ) -> list[ChordScaleMatch]:
+        """Catalogue scales, in every transposition, that fit over a chord"""
+        bits = self.rows_over(
+            root,
+            chord,
+            with_tensions=with_tensions,
+            without_tensions=without_tensions,
+        )
+        root_pc = root.to_octave_pitch().half_steps
+        chord_mask = as_mask(description_to_chord_scale(chord))
+        avoid = avoid_tensions(chord)
+        # Tensions that are not already chord tones
+        tensions = [(t, value) for t, value in _TENSIONS if not chord_mask >> value & 1]
+        matches = []
+        for i in _iter_bits(bits):
+            row = self.rows[i]
+            # Scale pitch classes relative to the chord root
+            relative = transpose_mask(row.mask, -root_pc)
+            available = tuple(t for t, value in tensions if relative >> value & 1)
+            matches.append(
+                ChordScaleMatch(
+                    row.name,
+                    row.root,
+                    row.scale,
+                    available,
+                    tuple(t for t in available if t in avoid),
+                )
+            )
+        return matches
+
+
+@cache
+def _default_matrix() -> ChordScaleMatrix:
+    from .similarity import default_catalogue
+
+    return ChordScaleMatrix(default_catalogue())
@@ -0,0 +1,296 @@
+"""`music-tools`: process a stream of JSON Lines requests over a worker pool.
+
+Each input line is a JSON object with an "op" and its parameters, e.g.
+
+    {"id": 1, "op": "render", "tuning": "EADGBE", "frets": 12, "root": "A", "scale": "Dorian"}
+    {"id": 2, "op": "identify", "notes": ["C", "E", "G", "B"], "k": 3}
+    {"id": 3, "op": "harmonize", "root": "Bb", "scale": "Major", "sevenths": true}
+    {"id": 4, "op": "voicings", "tuning": "EADGBE", "notes": ["C", "E", "G"], "frets": 12}
+
+and produces one output line, in input order, holding the request "id" and
+either a "result" or an "error". Lines are sent to worker processes in chunks,
+with a bounded number of chunks in flight, so memory stays flat however long
+the input is."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import ExitStack
+from functools import cache
+from itertools import islice
+from typing import IO, TYPE_CHECKING, Any
+
+from .query import RequestError, fretboard_by_name, parse_note, parse_scale
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from .guitar import FretboardAnnotation, FretboardLocation
+    from .memo import MemoStore
+    from .pitch import OctavePitch
+    from .similarity import ScaleIndex
+
+Request = dict[str, Any]
+Handler = Callable[[Request], dict[str, Any]]
+
+MAX_VOICINGS = 1000
+"""Most voicings returned by one request, and the default "limit": there are
+millions on a fretboard with many strings"""
+
+
+def _require(request: Request, key: str) -> Any:
+    try:
+        return request[key]
+    except KeyError:
+        raise RequestError(f"missing {key!r}") from None
+
+
+def _parse_notes(request: Request) -> list[OctavePitch]:
+    notes = _require(request, "notes")
+    if (
+        not isinstance(notes, list)
+        or not notes
+        or not all(isinstance(text, str) for text in notes)
+    ):
+        raise RequestError("'notes' must be a non-empty list of note names")
+    return [parse_note(text).to_octave_pitch() for text in notes]
+
+
+def _render(request: Request) -> dict[str, Any]:
+    from .guitar import render_fretboard_ascii
+
+    fretboard = fretboard_by_name(request.get("tuning", "EADGBE"))
+    frets = int(request.get("frets", 12))
+    layers: list[FretboardAnnotation[str]] = []
+    if "scale" in request:
+        root = parse_note(_require(request, "root")).to_octave_pitch()
+        degrees = {
+            (root + interval).half_steps: str(degree + 1)
+            for degree, interval in enumerate(parse_scale(request["scale"]))
+        }
+
+        def annotation(loc: FretboardLocation) -> str | None:
+            return degrees.get(loc[2].half_steps % 12)
+
+        layers.append(annotation)
+
+    return {"board": render_fretboard_ascii(fretboard, frets, layers)}
+
+
+@cache
+def _scale_index() -> ScaleIndex:
+    from .similarity import ScaleIndex
+
+    return ScaleIndex.build()
+
+
+def _identify(request: Request) -> dict[str, Any]:
+    from .set_class import forte_name
+    from .similarity import Metric
+
+    notes = _parse_notes(request)
+    metric = Metric(request.get("metric", Metric.Hamming.value))
+    matches = _scale_index().nearest(notes, int(request.get("k", 5)), metric)
+    return {
+        "set_class": forte_name(notes),
+        "matches": [
+            {"name": m.name, "root": str(m.root), "distance": m.distance}
+            for m in matches
+        ],
+    }
+
+
+def _harmonize(request: Request) -> dict[str, Any]:
+    from .chord import chords_in_scale, instantiate_chord
+    from .note import closest_sharp
+
+    root = parse_note(_require(request, "root"))
+    scale = parse_scale(_require(request, "scale"))
+    chords = chords_in_scale(scale, include_seven=bool(request.get("sevenths")))
+    degree_roots = (
+        closest_sharp(root.to_octave_pitch() + interval) for interval in scale
+    )
+    return {
+        "chords": [
+            [str(closest_sharp(pitch)) for pitch in instantiate_chord(chord, degree)]
+            for chord, degree in zip(chords, degree_roots)
+        ]
+    }
+
+
+def _voicings(request: Request) -> dict[str, Any]:
+    from .guitar import find_voicings
+
+    fretboard = fretboard_by_name(request.get("tuning", "EADGBE"))
+    notes = _parse_notes(request)
+    voicings = find_voicings(
+        fretboard,
+        notes,
+        int(request.get("frets", 12)),
+        max_span=int(request.get("max_span", 4)),
+        root_in_bass=bool(request.get("root_in_bass", False)),
+    )
+    limit = int(request.get("limit", MAX_VOICINGS))
+    if not 0 < limit <= MAX_VOICINGS:
+        raise RequestError(f"'limit' must be from 1 to {MAX_VOICINGS}")
+    return {"voicings": list(islice(voicings, limit))}
+
+
+HANDLERS: dict[str, Handler] = {
+    "render": _render,
+    "identify": _identify,
+    "harmonize": _harmonize,
+    "voicings": _voicings,
+}
+
+
+_memo: MemoStore | None = None
+"""Store of results of previous requests, if enabled with --memo"""
+
+
+def _use_memo(memo: MemoStore | None) -> None:
+    global _memo
+    _memo = memo
+
+
+def _handle(op: str, handler: Handler, request: Request) -> dict[str, Any]:
+    if _memo is None:
+        return handler(request)
+    inputs = {key: value for key, value in request.items() if key != "id"}
+    return _memo.get_or_compute(f"cli.{op}", inputs, lambda: handler(request))
+
+
+def process_line(line: str) -> str:
+    """Handle one JSON request line, returning one JSON response line"""
+    request_id = None
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise RequestError("request must be a JSON object")
+        request_id = request.get("id")
+        op = _require(request, "op")
+        handler = HANDLERS.get(op)
+        if handler is None:
+            raise RequestError(f"unknown op: {op!r}")
+        response = {"id": request_id, "result": _handle(op, handler, request)}
+    except (RequestError, ValueError, TypeError) as e:
+        # Malformed requests, and values that do not parse
+        response = {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+    return json.dumps(response, ensure_ascii=False)
+
+
+def process_chunk(lines: list[str]) -> list[str]:
+    return [process_line(line) for line in lines]
+
+
+def _chunks(lines: Iterable[str], size: int) -> Iterator[list[str]]:
+    iterator = (line for line in lines if line.strip())
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def process_stream(
+    lines: Iterable[str],
+    out: IO[str],
+    *,
+    workers: int,
+    chunk_size: int = 64,
+    max_in_flight: int | None = None,
+    memo: MemoStore | None = None,
+) -> None:
+    """Process request lines over `workers` processes (inline if 0), writing
+    responses in input order as soon as every earlier response is written.
+    With a `memo` store, results are shared with other runs and workers."""
+    chunks = _chunks(lines, chunk_size)
+    if workers == 0:
+        _use_memo(memo)
+        try:
+            for chunk in chunks:
+                out.writelines(f"{response}\n" for response in process_chunk(chunk))
+        finally:
+            _use_memo(None)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    limit = max_in_flight or 4 * workers
+    in_flight: deque[Future[list[str]]] = deque()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_use_memo, initargs=(memo,)
+    ) as pool:
+        for chunk in chunks:
+            if len(in_flight) >= limit:
+                out.writelines(f"{r}\n" for r in in_flight.popleft().result())
+            in_flight.append(pool.submit(process_chunk, chunk))
+            while in_flight and in_flight[0].done():
+                out.writelines(f"{r}\n" for r in in_flight.popleft().result())
+        while in_flight:
+            out.writelines(f"{r}\n" for r in in_flight.popleft().result())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="music-tools", description="Process JSON Lines music_tools requests"
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="request file, or - for stdin"
+    )
+    parser.add_argument("-o", "--output", help="response file (default stdout)")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes, 0 to process inline (default: number of CPUs)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        help="chunks submitted but not yet written (default: 4 per worker)",
+    )
+    parser.add_argument(
+        "--memo", help="SQLite file storing results across runs and workers"
+    )
+    parser.add_argument(
+        "--memo-size",
+        type=int,
+        default=10_000,
+        help="results kept in the memo file (default 10000)",
+    )
+    args = parser.parse_args(argv)
+
+    memo = None
+    if args.memo is not None:
+        from .memo import MemoStore
+
+        memo = MemoStore(args.memo, max_entries=args.memo_size)
+
+    with ExitStack() as files:
+        source = sys.stdin
+        if args.input != "-":
+            source = files.enter_context(open(args.input, encoding="utf-8"))
+        sink = sys.stdout
+        if args.output is not None:
+            sink = files.enter_context(open(args.output, "w", encoding="utf-8"))
+        process_stream(
+            source,
+            sink,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            max_in_flight=args.max_in_flight,
+            memo=memo,
+        )
+    if memo is not None:
+        print(memo.report(), file=sys.stderr)
+        memo.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""SVG and static HTML fretboard diagrams, e.g. for a printed book or a
+website.
+
+Like `render_fretboard_ascii`, a diagram is a fretboard, a number of frets
+and annotation layers. Everything but the annotations only depends on the
+tuning, the number of frets and the number of layers, so it is rendered
+once into a template of static fragments with a slot per (location, layer).
+Rendering a diagram then only calls the annotations and fills the slots,
+which keeps thousands of diagrams of the same board fast.
+
+The HTML uses the same elements as index.html (`fret-board`, `string`,
+`nut`, `fret` and `annot`), so `FRETBOARD_CSS` or the page's own style
+applies to it."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from html import escape
+
+from . import instrument
+from .guitar import (
+    MARKED_FRETS,
+    Fretboard,
+    FretboardAnnotation,
+    FretboardLocation,
+    FretIndex,
+    StringIndex,
+)
+from .note import closest_sharp
+from .pitch import Pitch
+
+FRET_WIDTH = 40
+STRING_SPACING = 24
+ANNOTATION_RADIUS = 9
+
+_LABEL_WIDTH = 24
+_MARGIN = 12
+
+FRETBOARD_CSS = """\
+fret-board { display: flex; flex-direction: column; }
+string { display: flex; flex-direction: row; }
+string label { display: flex; width: 2rem; align-items: center; }
+nut, fret {
+    position: relative; width: 5rem; height: 2rem;
+    display: flex; justify-content: center; align-items: center;
+}
+nut::after, fret::after {
+    content: ""; position: absolute; right: 0; height: 100%;
+    border-right: 4px solid darkgray;
+}
+fret::before {
+    content: ""; position: absolute; top: 50%; width: 100%;
+    height: 1px; background-color: black;
+}
+annot {
+    font-size: 0.7rem; text-align: center; background-color: lightblue;
+    z-index: 1; border-radius: 50%; padding: 0.5rem;
+    width: 0.6rem; height: 0.6rem;
+}
+"""
+"""Style for the HTML diagrams, a static version of index.html's"""
+
+
+@dataclass(frozen=True)
+class _Template:
+    fragments: tuple[str, ...]
+    """Static markup. fragments[i] precedes the annotations at locations[i],
+    and the last fragment follows all of them"""
+    locations: tuple[FretboardLocation, ...]
+    markup: tuple[tuple[tuple[str, str], ...], ...]
+    """Markup before and after the text of each layer at each location"""
+
+    def fill(self, annotation_layers: Sequence[FretboardAnnotation[str]]) -> str:
+        if instrument.enabled():
+            annotation_layers = [
+                instrument.wrap("guitar.annotation", annotation)
+                for annotation in annotation_layers
+            ]
+        parts = []
+        for fragment, location, markup in zip(
+            self.fragments, self.locations, self.markup
+        ):
+            parts.append(fragment)
+            for annotation, (before, after) in zip(annotation_layers, markup):
+                text = annotation(location)
+                if text is not None:
+                    parts.append(f"{before}{escape(text)}{after}")
+        parts.append(self.fragments[-1])
+        return "".join(parts)
+
+
+_Tuning = tuple[int, ...]
+"""Open string pitches, first (thinnest) string first, to key templates by"""
+
+
+def _tuning(fretboard: Fretboard) -> _Tuning:
+    return tuple(string.open_pitch.half_steps for string in fretboard.strings)
+
+
+def _locations(tuning: _Tuning, frets: int) -> list[FretboardLocation]:
+    """Every location, string by string from the first, open string first"""
+    return [
+        (StringIndex(string_index), FretIndex(fret), Pitch(open_pitch + fret))
+        for string_index, open_pitch in enumerate(tuning, 1)
+        for fret in range(frets + 1)
+    ]
+
+
+def _note_name(pitch: int) -> str:
+    return str(closest_sharp(Pitch(pitch).to_octave()[1]))
+
+
+@lru_cache(maxsize=64)
+def _svg_template(tuning: _Tuning, frets: int, num_layers: int) -> _Template:
+    nut_x = _MARGIN + _LABEL_WIDTH + FRET_WIDTH
+    top = _MARGIN + ANNOTATION_RADIUS
+    bottom = top + (len(tuning) - 1) * STRING_SPACING
+    right = nut_x + frets * FRET_WIDTH
+    width = right + _MARGIN
+    height = bottom + ANNOTATION_RADIUS + 2 * _MARGIN
+
+    lines = [
+        (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}"'
+            f' viewBox="0 0 {width} {height}" font-family="sans-serif"'
+            ' font-size="10" text-anchor="middle" dominant-baseline="central">'
+        ),
+        (
+            f'<line x1="{nut_x}" y1="{top}" x2="{nut_x}" y2="{bottom}"'
+            ' stroke="black" stroke-width="4"/>'
+        ),
+    ]
+    for fret in range(1, frets + 1):
+        x = nut_x + fret * FRET_WIDTH
+        lines.append(
+            f'<line x1="{x}" y1="{top}" x2="{x}" y2="{bottom}" stroke="darkgray"'
+            ' stroke-width="2"/>'
+        )
+        if fret in MARKED_FRETS:
+            x -= FRET_WIDTH // 2
+            lines.append(f'<text x="{x}" y="{bottom + 2 * _MARGIN}">{fret}</text>')
+    for i, open_pitch in enumerate(tuning):
+        y = top + i * STRING_SPACING
+        lines.append(
+            f'<line x1="{nut_x}" y1="{y}" x2="{right}" y2="{y}" stroke="black"/>'
+        )
+        lines.append(
+            f'<text x="{_MARGIN + _LABEL_WIDTH // 2}" y="{y}">'
+            f"{_note_name(open_pitch)}</text>"
+        )
+
+    # Layers side by side, centered in the fret, and shrunk to fit in it
+    # with a gap of half a radius on either side
+    radius = min(ANNOTATION_RADIUS, FRET_WIDTH / (2 * num_layers + 1))
+    font_size = f' font-size="{10 * radius / ANNOTATION_RADIUS:g}"'
+    if radius == ANNOTATION_RADIUS:
+        font_size = ""
+
+    locations = _locations(tuning, frets)
+    markup = []
+    for string_index, fret, _ in locations:
+        y = top + (string_index - 1) * STRING_SPACING
+        x = nut_x + fret * FRET_WIDTH - FRET_WIDTH // 2
+        cell = []
+        for layer in range(num_layers):
+            cx = f"{x + (2 * layer - num_layers + 1) * radius:g}"
+            before = (
+                f'<g class="layer-{layer}"><circle cx="{cx}" cy="{y}"'
+                f' r="{radius:g}" fill="lightblue"/>'
+                f'<text x="{cx}" y="{y}"{font_size}>'
+            )
+            cell.append((before, "</text></g>"))
+        markup.append(tuple(cell))
+
+    return _Template(
+        ("\n".join(lines) + "\n", *[""] * (len(locations) - 1), "</svg>\n"),
+        tuple(locations),
+        tuple(markup),
+    )
+
+
+@lru_cache(maxsize=64)
+def _html_template(tuning: _Tuning, frets: int, num_layers: int) -> _Template:
+    locations = _locations(tuning, frets)
+    fragments = []
+    previous = "<fret-board>"
+    for string_index, fret, _ in locations:
+        if fret == 0:
+            # Strings are numbered from 0 for the lowest, as in index.html
+            open_pitch = tuning[string_index - 1]
+            previous += (
+                f'<string data-string-index="{len(tuning) - string_index}">'
+                f"<label>{_note_name(open_pitch)}</label>"
+                '<nut data-fret-index="0">'
+            )
+        else:
+            previous += f'<fret data-fret-index="{fret}">'
+        fragments.append(previous)
+        previous = "</nut>" if fret == 0 else "</fret>"
+        if fret == frets:
+            previous += "</string>"
+    fragments.append(f"{previous}</fret-board>\n")
+
+    markup = tuple(
+        (f'<annot data-annot-layer="{layer}">', "</annot>")
+        for layer in range(num_layers)
+    )
+    return _Template(tuple(fragments), tuple(locations), (markup,) * len(locations))
+
+
+def render_fretboard_svg(
+    fretboard: Fretboard,
+    frets: int,
+    annotation_layers: Sequence[FretboardAnnotation[str]] = (),
+) -> str:
+    """Standalone SVG image of the fretboard, first (thinnest) string on top"""
+    template = _svg_template(_tuning(fretboard), frets, len(annotation_layers))
+    return template.fill(annotation_layers)
+
+
+def render_fretboard_html(
+    fretboard: Fretboard,
+    frets: int,
+    annotation_layers: Sequence[FretboardAnnotation[str]] = (),
+) -> str:
+    """`<fret-board>` element of the fretboard, first (thinnest) string on
+    top, to be styled with `FRETBOARD_CSS`"""
+    template = _html_template(_tuning(fretboard), frets, len(annotation_layers))
+    return template.fill(annotation_layers)
+
+
+def render_html_page(diagrams: Iterable[str], *, title: str = "Fretboards") -> str:
+    """Static page of HTML or SVG diagrams, one after the other"""
+    head = (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+        f"<title>{escape(title)}</title>\n<style>\n{FRETBOARD_CSS}</style>\n"
+        "</head>\n<body>\n"
+    )
+    return "".join((head, *diagrams, "</body>\n</html>\n"))
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import cache
 from itertools import chain
-from typing import Callable, Iterable, NewType, TypeVar
-import parsy  # type: ignore
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    NewType,
+    Sequence,
+    TypeGuard,
+    TypeVar,
+)
 
+from music_tools import instrument
+from music_tools._lazy import lazy_attributes
 from music_tools.note import (
     closest_sharp,
-    musical_pitch_parser,
     p,
 )
-from music_tools.pitch import FOURTH, HALF_STEP, Interval, Pitch
+from music_tools.pitch import FOURTH, HALF_STEP, Interval, OctavePitch, Pitch
+
+if TYPE_CHECKING:
+    from music_tools.scale import ConcreteScale
 
 
 T = TypeVar("T")
@@ -34,6 +48,8 @@ FretVisitor = Callable[[String, Pitch, FretIndex], T]
 
 def visit_frets(string: String, frets: int, visitor: FretVisitor[T]) -> Iterable[T]:
     """Visit every fret on a string, starting on open string, inclusive of last fret"""
+    if instrument.enabled():
+        visitor = instrument.wrap("guitar.fret_visitor", visitor)
     current_pitch = string.open_pitch
     for fret in range(0, frets + 1):
         yield visitor(string, current_pitch, FretIndex(fret))
@@ -55,9 +71,14 @@ class Fretboard:
         return Fretboard(list(reversed(list(map(String, pitches)))))
 
     @staticmethod
+    @instrument.instrumented("guitar.Fretboard.from_tuning")
     def from_tuning(tuning: str) -> Fretboard:
         """Given a string like 'E3 A4 D4 G5 B6 E6' creates a fretboard with that
         tuning. Note lowest string first"""
+        import parsy  # type: ignore
+
+        from music_tools.note import musical_pitch_parser
+
         return Fretboard.from_pitches(
             p.to_pitch()
             for p in musical_pitch_parser.sep_by(parsy.string(" ")).parse(tuning)
@@ -70,6 +91,8 @@ StringVisitor = Callable[[Fretboard, String, StringIndex], T]
 
 def visit_strings(fretboard: Fretboard, visitor: StringVisitor) -> Iterable[T]:
     """Visit every string on a guitar, starting on first string, and going to the thicker strings"""
+    if instrument.enabled():
+        visitor = instrument.wrap("guitar.string_visitor", visitor)
 
     for i, s in enumerate(fretboard.strings, 1):
         yield visitor(fretboard, s, StringIndex(i))
@@ -83,15 +106,137 @@ def _null_annotation(loc: tuple[StringIndex, FretIndex, Pitch]) -> None:
     return None
 
 
-EADGBE = Fretboard.from_tuning("E4 A4 D5 G5 B5 E6")
-DROP_A = Fretboard.from_tuning("A3 E4 A4 D5 G5 B5 E6")
-MEGA_FRETBOARD = Fretboard.from_pitches(
-    p("B2").to_pitch() + (FOURTH * i) for i in range(0, 12)
+@dataclass(frozen=True)
+class CompiledAnnotation:
+    """An annotation layer evaluated once at every location of a fretboard, so
+    rendering only looks labels up. `render_fretboard_ascii` reads them
+    directly, and other renderers call it like any annotation. Reusable across
+    renders, and picklable to send to worker processes."""
+
+    tuning: tuple[int, ...]
+    """Open string pitches, first (thinnest) string first"""
+    frets: int
+    labels: tuple[str | None, ...]
+    """Label at every location, string by string, open string first"""
+
+    def __call__(self, loc: FretboardLocation) -> str | None:
+        """The label at a location, or None beyond the compiled frets"""
+        string_index, fret, pitch = loc
+        if not (
+            0 < string_index <= len(self.tuning)
+            and self.tuning[string_index - 1] + fret == pitch.half_steps
+        ):
+            raise ValueError(f"{loc} is not on the fretboard the annotation is for")
+        if fret > self.frets:
+            return None
+        return self.labels[(string_index - 1) * (self.frets + 1) + fret]
+
+    def string_labels(
+        self, string_index: StringIndex, frets: int
+    ) -> Sequence[str | None]:
+        """Labels of a string from the open string up to `frets`, None beyond
+        the compiled frets"""
+        start = (string_index - 1) * (self.frets + 1)
+        labels = self.labels[start : start + min(frets, self.frets) + 1]
+        if frets > self.frets:
+            return labels + (None,) * (frets - self.frets)
+        return labels
+
+
+def _open_pitches(fretboard: Fretboard) -> tuple[int, ...]:
+    return tuple(string.open_pitch.half_steps for string in fretboard.strings)
+
+
+def compile_annotation(
+    fretboard: Fretboard, frets: int, annotation: FretboardAnnotation[str]
+) -> CompiledAnnotation:
+    """Evaluate any annotation at every location, once"""
+    tuning = _open_pitches(fretboard)
+    return CompiledAnnotation(
+        tuning,
+        frets,
+        tuple(
+            annotation(
+                (StringIndex(string_index), FretIndex(fret), Pitch(open_pitch + fret))
+            )
+            for string_index, open_pitch in enumerate(tuning, 1)
+            for fret in range(frets + 1)
+        ),
+    )
+
+
+def compile_pitch_classes(
+    fretboard: Fretboard, frets: int, labels: Mapping[OctavePitch, str]
+) -> CompiledAnnotation:
+    """Label every occurrence of some pitch classes"""
+    by_pitch_class = [labels.get(OctavePitch(pc)) for pc in range(12)]
+    tuning = _open_pitches(fretboard)
+    return CompiledAnnotation(
+        tuning,
+        frets,
+        tuple(
+            by_pitch_class[(open_pitch + fret) % 12]
+            for open_pitch in tuning
+            for fret in range(frets + 1)
+        ),
+    )
+
+
+def compile_scale_degrees(
+    fretboard: Fretboard,
+    frets: int,
+    scale: ConcreteScale,
+    colors: Sequence[str] = (),
+    reset: str = "",
+) -> CompiledAnnotation:
+    """Label the notes of a scale with their 1-based degree, preceded by the
+    degree's color, if any, and followed by `reset`"""
+    labels: dict[OctavePitch, str] = {}
+    for degree, note in enumerate(scale):
+        color = colors[degree % len(colors)] if colors else ""
+        labels.setdefault(note.to_octave_pitch(), f"{color}{degree + 1}{reset}")
+    return compile_pitch_classes(fretboard, frets, labels)
+
+
+def compile_predicate(
+    fretboard: Fretboard,
+    frets: int,
+    predicate: Callable[[FretboardLocation], bool],
+    label: str,
+) -> CompiledAnnotation:
+    """Label the locations matching a predicate"""
+    return compile_annotation(
+        fretboard, frets, lambda loc: label if predicate(loc) else None
+    )
+
+
+def _eadgbe() -> Fretboard:
+    return Fretboard.from_tuning("E4 A4 D5 G5 B5 E6")
+
+
+def _drop_a() -> Fretboard:
+    return Fretboard.from_tuning("A3 E4 A4 D5 G5 B5 E6")
+
+
+def _mega_fretboard() -> Fretboard:
+    return Fretboard.from_pitches(
+        p("B2").to_pitch() + (FOURTH * i) for i in range(0, 12)
+    )
+
+
+if TYPE_CHECKING:
+    EADGBE: Fretboard
+    DROP_A: Fretboard
+    MEGA_FRETBOARD: Fretboard
+    """Hypothetical fourths tuning fretboard starting with B as lowest string,
+    and going through all the pitches (12 strings total). Useful to see regular
+    patterns without the pesky major 3rd interval between the G and B strings on
+    a typical guitar"""
+
+__getattr__ = lazy_attributes(
+    globals(),
+    {"EADGBE": _eadgbe, "DROP_A": _drop_a, "MEGA_FRETBOARD": _mega_fretboard},
 )
-"""Hypothetical fourths tuning fretboard starting with B as lowest string, and
-going through all the pitches (12 strings total). Useful to see regular patterns
-without the pesky major 3rd interval between the G and B strings on a typical
-guitar"""
 
 
 MARKED_FRETS = [1, 3, 5, 7, 9, 12, 15, 17, 19, 21, 24]
@@ -100,7 +245,9 @@ MARKED_FRETS = [1, 3, 5, 7, 9, 12, 15, 17, 19, 21, 24]
 # TODO: change width of fret depending how far it is
 
 
-def _make_fret_footer(frets: int, num_layers: int) -> str:
+def make_fret_footer(frets: int, num_layers: int) -> str:
+    """The line of marked fret numbers under an ASCII fretboard, with cells
+    wide enough for `num_layers` annotation layers"""
     fret_set = set(filter(lambda f: f <= frets, MARKED_FRETS))
 
     width = max(num_layers, 3)
@@ -114,12 +261,31 @@ def _make_fret_footer(frets: int, num_layers: int) -> str:
     return f"   {' ' * width} {' '.join(fret_markers)}"
 
 
+@cache
+def _sharp_note_name(pitch: Pitch) -> str:
+    _, octave_pitch = pitch.to_octave()
+    return str(closest_sharp(octave_pitch))
+
+
 def render_fretboard_ascii(
     fretboard: Fretboard,
     frets: int,
     annotation_layers: list[FretboardAnnotation[str]] = [],
+    *,
+    note_name: Callable[[Pitch], str] = _sharp_note_name,
 ) -> str:
+    """Render strings as lines of frets, each open string labelled with
+    `note_name` of its pitch"""
     num_layers = len(annotation_layers)
+    if not instrument.enabled() and _all_compiled_for(
+        annotation_layers, fretboard, frets
+    ):
+        return _render_compiled_ascii(fretboard, frets, annotation_layers, note_name)
+    if instrument.enabled():
+        annotation_layers = [
+            instrument.wrap("guitar.annotation", annotation)
+            for annotation in annotation_layers
+        ]
 
     def string_visitor(
         _fretboard: Fretboard, string: String, string_index: StringIndex
@@ -131,8 +297,7 @@ def render_fretboard_ascii(
 
             # Prepend open string note annotation
             if fret_index == 0:
-                _, octave_pitch = pitch.to_octave()
-                all_annotations += f"{str(closest_sharp(octave_pitch)).ljust(2)} "
+                all_annotations += f"{note_name(pitch).ljust(2)} "
 
             # Add any left padding
             if num_layers < 3:
@@ -154,6 +319,146 @@ def render_fretboard_ascii(
 
     all_strings: Iterable[str] = visit_strings(fretboard, string_visitor)
 
-    footer = _make_fret_footer(frets, num_layers)
+    footer = make_fret_footer(frets, num_layers)
 
     return "\n".join(chain((*all_strings, footer)))
+
+
+def _all_compiled_for(
+    annotation_layers: list[FretboardAnnotation[str]], fretboard: Fretboard, frets: int
+) -> TypeGuard[list[CompiledAnnotation]]:
+    if not annotation_layers:
+        return False
+    tuning = _open_pitches(fretboard)
+    return all(
+        isinstance(layer, CompiledAnnotation) and layer.tuning == tuning
+        for layer in annotation_layers
+    )
+
+
+def _render_compiled_ascii(
+    fretboard: Fretboard,
+    frets: int,
+    annotation_layers: list[CompiledAnnotation],
+    note_name: Callable[[Pitch], str],
+) -> str:
+    """`render_fretboard_ascii` of compiled layers, without calling them"""
+    num_layers = len(annotation_layers)
+    left = num_layers < 3
+    right = num_layers < 2
+    lines = []
+    for string_index, string in enumerate(fretboard.strings, 1):
+        cells = [f"{note_name(string.open_pitch).ljust(2)} "]
+        layer_labels = [
+            layer.string_labels(StringIndex(string_index), frets)
+            for layer in annotation_layers
+        ]
+        for fret, labels in enumerate(zip(*layer_labels)):
+            padding = " " if fret == 0 else "-"
+            if left:
+                cells.append(padding)
+            cells.extend(label or padding for label in labels)
+            if right:
+                cells.append(padding)
+            cells.append("|")
+        lines.append("".join(cells))
+    lines.append(make_fret_footer(frets, num_layers))
+    return "\n".join(lines)
+
+
+Voicing = tuple[FretIndex | None, ...]
+"""Fret played on each string, first (thinnest) string first. None if the
+string is muted"""
+
+
+def find_voicings(
+    fretboard: Fretboard,
+    chord: Iterable[OctavePitch],
+    frets: int,
+    *,
+    max_span: int = 4,
+    root_in_bass: bool = False,
+) -> Iterable[Voicing]:
+    """Every way to play all notes of a chord, where the fretted notes fit in a
+    window of `max_span` frets. Open strings may be used anywhere. If
+    `root_in_bass`, the lowest played note is the chord's first note."""
+    pitch_classes = list(chord)
+    if not pitch_classes:
+        raise ValueError("A chord needs at least one note")
+    wanted = set(pitch_classes)
+    root = pitch_classes[0]
+
+    def options(
+        string: String, window_start: int
+    ) -> list[tuple[FretIndex | None, OctavePitch | None]]:
+        candidate_frets = chain(
+            [0], range(window_start, min(window_start + max_span, frets + 1))
+        )
+        played = (
+            (FretIndex(fret), string[fret].to_octave()[1])
+            for fret in dict.fromkeys(candidate_frets)
+        )
+        return [(None, None)] + [option for option in played if option[1] in wanted]
+
+    # Each voicing is found in the window starting at its lowest fretted note,
+    # or the first window if it only uses open strings. Windows near the last
+    # fret are cut short by `options`
+    for window_start in range(1, max(frets, 1) + 1):
+        string_options = [options(s, window_start) for s in fretboard.strings]
+        for voicing in _search_voicings(string_options, window_start, len(wanted)):
+            played = [
+                string[fret]
+                for string, fret in zip(fretboard.strings, voicing)
+                if fret is not None
+            ]
+            # The lowest pitch, which is not always on the lowest string
+            if root_in_bass and (
+                min(played, key=lambda pitch: pitch.half_steps).to_octave()[1] != root
+            ):
+                continue
+            yield voicing
+
+
+def _search_voicings(
+    string_options: list[list[tuple[FretIndex | None, OctavePitch | None]]],
+    window_start: int,
+    num_wanted: int,
+) -> Iterator[Voicing]:
+    """Combinations of an option (fret and pitch class) per string, in the
+    order of `itertools.product`, playing `num_wanted` pitch classes with the
+    lowest fretted note at `window_start`, or none if it is 1. Branches are
+    pruned as soon as they cannot, e.g. when too few strings are left to play
+    the missing pitch classes."""
+    num_strings = len(string_options)
+    # Whether any string from the i-th on can be fretted at the window start
+    can_start = [False] * (num_strings + 1)
+    for i in reversed(range(num_strings)):
+        can_start[i] = can_start[i + 1] or any(
+            fret == window_start for fret, _ in string_options[i]
+        )
+    voicing: list[FretIndex | None] = []
+
+    def search(
+        index: int, covered: frozenset[OctavePitch], started: bool, fretted: bool
+    ) -> Iterator[Voicing]:
+        if num_wanted - len(covered) > num_strings - index:
+            return
+        if not (started or can_start[index] or (window_start == 1 and not fretted)):
+            return
+        if index == num_strings:
+            yield tuple(voicing)
+            return
+        for fret, pitch_class in string_options[index]:
+            voicing.append(fret)
+            if fret is None or pitch_class is None:
+                yield from search(index + 1, covered, started, fretted)
+            else:
+                yield from search(
+                    index + 1,
+                    covered | {pitch_class},
+                    started or fret == window_start,
+                    fretted or fret > 0,
+                )
+            voicing.pop()
+
+    return search(0, frozenset(), False, False)
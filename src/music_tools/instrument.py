@@ -0,0 +1,229 @@
+"""Opt-in instrumentation of music_tools hot paths.
+
+Counts and times calls to parsers, fretboard visitors, annotation callbacks,
+mode iteration and subsequence searches, and optionally the memory they
+allocate. Enable it for a whole process with the environment variable
+
+    MUSIC_TOOLS_INSTRUMENT=1             # summary table on stderr at exit
+    MUSIC_TOOLS_INSTRUMENT=json,alloc    # JSON summary, with allocations
+
+(`MUSIC_TOOLS_INSTRUMENT_OUT=path` writes the summary to a file instead), or
+for a block of code with `with instrumenting() as stats: ...`.
+
+When disabled, instrumented functions cost one flag check per call, and
+callbacks are not wrapped at all."""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import os
+import sys
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+ENV_VAR = "MUSIC_TOOLS_INSTRUMENT"
+OUT_ENV_VAR = "MUSIC_TOOLS_INSTRUMENT_OUT"
+
+
+@dataclass
+class PathStats:
+    calls: int = 0
+    seconds: float = 0.0
+    """Inclusive of any instrumented paths called from this one"""
+    items: int = 0
+    """Values yielded, for generators"""
+    allocated_bytes: int = 0
+    """Net memory allocated, if allocations are tracked"""
+
+
+Stats = dict[str, PathStats]
+
+
+@dataclass
+class _State:
+    active: bool = False
+    track_allocations: bool = False
+    stats: Stats = field(default_factory=dict)
+
+
+_state = _State()
+
+
+def enabled() -> bool:
+    return _state.active
+
+
+def _traced_memory() -> int:
+    if not _state.track_allocations:
+        return 0
+    import tracemalloc
+
+    return tracemalloc.get_traced_memory()[0]
+
+
+def _record(path: str, seconds: float, allocated_bytes: int, items: int = 0) -> None:
+    stats = _state.stats.get(path)
+    if stats is None:
+        stats = _state.stats[path] = PathStats()
+    stats.calls += 1
+    stats.seconds += seconds
+    stats.items += items
+    stats.allocated_bytes += allocated_bytes
+
+
+def _timed_call(path: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    memory = _traced_memory()
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _record(path, time.perf_counter() - start, _traced_memory() - memory)
+
+
+def wrap(path: str, fn: F) -> F:
+    """Wrap a callback so its calls are recorded under `path`. Only call this
+    when instrumentation is enabled, so callbacks run unwrapped otherwise."""
+    return functools.wraps(fn)(functools.partial(_timed_call, path, fn))  # type: ignore
+
+
+def _wrap_generator(path: str, fn: F) -> F:
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _state.active:
+            return fn(*args, **kwargs)
+        return _timed_iteration(path, fn(*args, **kwargs))
+
+    return wrapper  # type: ignore
+
+
+def _timed_iteration(path: str, iterator: Iterator[Any]) -> Iterator[Any]:
+    """Time only the work done inside the generator, not by its consumer"""
+    items = 0
+    elapsed = 0.0
+    memory = 0
+    try:
+        while True:
+            before_memory = _traced_memory()
+            start = time.perf_counter()
+            try:
+                value = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += time.perf_counter() - start
+                memory += _traced_memory() - before_memory
+            items += 1
+            yield value
+    finally:
+        # Recorded as one call, however many items were consumed
+        _record(path, elapsed, memory, items)
+
+
+_CO_GENERATOR = 0x20
+"""`inspect.CO_GENERATOR`, without importing inspect on the import path"""
+
+
+def _is_generator_function(fn: Callable[..., Any]) -> bool:
+    code = getattr(fn, "__code__", None)
+    return code is not None and bool(code.co_flags & _CO_GENERATOR)
+
+
+def instrumented(path: str) -> Callable[[F], F]:
+    """Record calls to the decorated function under `path` while
+    instrumentation is enabled. Generators are timed over their whole
+    iteration, and the number of items they yield is recorded."""
+
+    def decorate(fn: F) -> F:
+        if _is_generator_function(fn):
+            return _wrap_generator(path, fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _state.active:
+                return fn(*args, **kwargs)
+            return _timed_call(path, fn, *args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorate
+
+
+def _start(track_allocations: bool) -> None:
+    _state.active = True
+    _state.track_allocations = track_allocations
+    if track_allocations:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+@contextmanager
+def instrumenting(*, track_allocations: bool = False) -> Iterator[Stats]:
+    """Enable instrumentation inside the block, collecting into a fresh set of
+    stats. The previous state is restored afterwards."""
+    previous = (_state.active, _state.track_allocations, _state.stats)
+    _state.stats = {}
+    _start(track_allocations)
+    try:
+        yield _state.stats
+    finally:
+        if track_allocations and not previous[1]:
+            import tracemalloc
+
+            tracemalloc.stop()
+        _state.active, _state.track_allocations, _state.stats = previous
+
+
+def summary_table(stats: Stats) -> str:
+    """Paths sorted by total time, most expensive first"""
+    header = (
+        f"{'path':<40} {'calls':>10} {'items':>10} {'total ms':>10} {'us/call':>10}"
+    )
+    if any(s.allocated_bytes for s in stats.values()):
+        header += f" {'alloc KiB':>10}"
+
+    lines = [header]
+    for path, s in sorted(stats.items(), key=lambda kv: -kv[1].seconds):
+        line = (
+            f"{path:<40} {s.calls:>10} {s.items:>10} {s.seconds * 1e3:>10.2f} "
+            f"{s.seconds / s.calls * 1e6:>10.2f}"
+        )
+        if "alloc" in header:
+            line += f" {s.allocated_bytes / 1024:>10.1f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def summary_json(stats: Stats) -> str:
+    import json
+
+    return json.dumps({path: asdict(s) for path, s in sorted(stats.items())}, indent=2)
+
+
+def _dump_at_exit(as_json: bool) -> None:
+    summary = summary_json(_state.stats) if as_json else summary_table(_state.stats)
+    out = os.environ.get(OUT_ENV_VAR)
+    if out:
+        with open(out, "w") as f:
+            f.write(summary + "\n")
+    else:
+        print(summary, file=sys.stderr)
+
+
+def _configure_from_environment() -> None:
+    options = {o.strip() for o in os.environ.get(ENV_VAR, "").lower().split(",")}
+    options.discard("")
+    if not options or options <= {"0", "off"}:
+        return
+    _start(track_allocations="alloc" in options)
+    atexit.register(_dump_at_exit, "json" in options)
+
+
+_configure_from_environment()
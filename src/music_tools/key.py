@@ -0,0 +1,157 @@
+"""Key and scale detection by correlating pitch class histograms against
+scale profiles.
+
+Every (root, scale) candidate is one row of a profile matrix, so scoring a
+histogram against all candidates is a single matrix-vector product."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import cache, lru_cache
+from math import sqrt
+from operator import mul
+
+from .note import Note, closest_sharp
+from .pitch import OctavePitch, Pitch
+from .scale import Scale
+
+PitchClassHistogram = list[float]
+"""Weight of each of the 12 pitch classes, indexed by half-steps above C"""
+
+TONIC_WEIGHT = 2.0
+"""Profile weight of the root relative to other scale members. Without it
+relative keys (e.g. C major and A minor) would have identical profiles"""
+
+
+@dataclass(frozen=True)
+class KeyEstimate:
+    root: Note
+    scale_name: str
+    scale: Scale
+    score: float
+    """Pearson correlation between the histogram and the scale profile"""
+
+
+@dataclass(frozen=True)
+class _ProfileMatrix:
+    candidates: tuple[tuple[OctavePitch, str, Scale], ...]
+    rows: tuple[tuple[float, ...], ...]
+    """Each row is zero-mean and unit-norm, so a dot product with a centered
+    histogram is proportional to the correlation"""
+
+
+def _profile_row(root: OctavePitch, scale: Scale) -> tuple[float, ...]:
+    profile = [0.0] * 12
+    for interval in scale:
+        profile[(root + interval).half_steps] = 1.0
+    profile[root.half_steps] = TONIC_WEIGHT
+
+    mean = sum(profile) / 12
+    centered = [x - mean for x in profile]
+    norm = sqrt(sum(x * x for x in centered))
+    return tuple(x / norm for x in centered)
+
+
+def default_catalogue() -> dict[str, Scale]:
+    """Named scales and the modes of the major scale"""
+    from .mode import major_scale_modes_by_name
+    from .scale import name_to_scale
+
+    return {**name_to_scale, **major_scale_modes_by_name}
+
+
+@cache
+def _default_profiles() -> _ProfileMatrix:
+    return _build_profiles(tuple(default_catalogue().items()))
+
+
+@lru_cache(maxsize=8)
+def _build_profiles(catalogue: Sequence[tuple[str, Scale]]) -> _ProfileMatrix:
+    candidates = tuple(
+        (OctavePitch(root), name, scale)
+        for name, scale in catalogue
+        for root in range(12)
+    )
+    rows = tuple(_profile_row(root, scale) for root, _, scale in candidates)
+    return _ProfileMatrix(candidates, rows)
+
+
+def pitch_class_histogram(pitches: Iterable[Pitch]) -> PitchClassHistogram:
+    histogram = [0.0] * 12
+    for pitch in pitches:
+        histogram[pitch.half_steps % 12] += 1
+    return histogram
+
+
+def _best_candidate(
+    profiles: _ProfileMatrix, histogram: PitchClassHistogram
+) -> KeyEstimate | None:
+    mean = sum(histogram) / 12
+    centered = [x - mean for x in histogram]
+    norm = sqrt(sum(x * x for x in centered))
+    if norm == 0:
+        # No notes, or all pitch classes equally present
+        return None
+
+    scores = [sum(map(mul, row, centered)) for row in profiles.rows]
+    best = max(range(len(scores)), key=scores.__getitem__)
+    root, name, scale = profiles.candidates[best]
+    return KeyEstimate(closest_sharp(root), name, scale, scores[best] / norm)
+
+
+def _profiles_for(catalogue: dict[str, Scale] | None) -> _ProfileMatrix:
+    if catalogue is None:
+        return _default_profiles()
+    return _build_profiles(tuple(catalogue.items()))
+
+
+def detect_key(
+    pitches: Iterable[Pitch], *, catalogue: dict[str, Scale] | None = None
+) -> KeyEstimate | None:
+    """Most likely (root, scale) for a collection of pitches, or None if the
+    pitches do not favour any key"""
+    return _best_candidate(_profiles_for(catalogue), pitch_class_histogram(pitches))
+
+
+def detect_keys(
+    histograms: Iterable[PitchClassHistogram],
+    *,
+    catalogue: dict[str, Scale] | None = None,
+) -> Iterator[KeyEstimate | None]:
+    """Score a batch of histograms against the same profile matrix"""
+    profiles = _profiles_for(catalogue)
+    for histogram in histograms:
+        yield _best_candidate(profiles, histogram)
+
+
+def track_keys(
+    pitches: Iterable[Pitch],
+    window: int,
+    *,
+    hop: int = 1,
+    catalogue: dict[str, Scale] | None = None,
+) -> Iterator[tuple[int, KeyEstimate | None]]:
+    """Slide a window of `window` notes over a pitch stream, yielding
+    (index of the first note in the window, estimate) every `hop` notes.
+
+    The histogram is updated incrementally as notes enter and leave the
+    window, so the whole stream is processed in linear time."""
+    if window < 1 or hop < 1:
+        raise ValueError(f"window and hop must be at least 1, not {window}, {hop}")
+
+    profiles = _profiles_for(catalogue)
+    histogram = [0.0] * 12
+    in_window: deque[int] = deque()
+
+    for index, pitch in enumerate(pitches):
+        pitch_class = pitch.half_steps % 12
+        in_window.append(pitch_class)
+        histogram[pitch_class] += 1
+        if len(in_window) > window:
+            histogram[in_window.popleft()] -= 1
+
+        start = index - window + 1
+        if start >= 0 and start % hop == 0:
+            yield start, _best_candidate(profiles, histogram)
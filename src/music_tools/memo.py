@@ -0,0 +1,277 @@
+"""Persistent memoization of deterministic music_tools computations in SQLite.
+
+    store = MemoStore("memo.sqlite3", max_entries=10_000)
+    voicings = store.get_or_compute(
+        "voicings", (tuning, chord, frets), lambda: list(find_voicings(...))
+    )
+
+Keys are stable hashes of a namespace, the inputs and the library version, so
+a new release never reads results computed by an old one. The least recently
+used entries are evicted beyond `max_entries`.
+
+One file can be shared by any number of worker processes: the database runs
+in WAL mode, and a process about to compute a missing value first inserts a
+claim row for its key. Other processes wanting the same key wait for the
+value instead of computing it again, unless the claim is older than
+`claim_timeout` (its owner presumably died), in which case they take it over."""
+
+from __future__ import annotations
+
+import dataclasses
+import enum
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    value BLOB,
+    claimed_by TEXT,
+    claimed_at REAL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS memo_last_used ON memo (last_used);
+CREATE TABLE IF NOT EXISTS memo_stats (
+    namespace TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+@functools.cache
+def library_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("music_tools")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _qualified_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _canonical(value: object) -> object:
+    """A representation of `value` whose repr is the same in every process,
+    and differs for values that are not equal. Containers are tagged with
+    their kind, so that e.g. a list and a tuple of the same items differ."""
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, enum.Enum):
+        return ("enum", _qualified_name(type(value)), value.name)
+    if isinstance(value, list):
+        return ("list", tuple(_canonical(item) for item in value))
+    if isinstance(value, tuple):
+        return ("tuple", tuple(_canonical(item) for item in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", tuple(sorted(repr(_canonical(item)) for item in value)))
+    if isinstance(value, dict):
+        return (
+            "dict",
+            tuple(
+                sorted((repr(_canonical(k)), _canonical(v)) for k, v in value.items())
+            ),
+        )
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return (
+            "dataclass",
+            _qualified_name(type(value)),
+            tuple(
+                (field.name, _canonical(getattr(value, field.name)))
+                for field in dataclasses.fields(value)
+            ),
+        )
+    raise TypeError(f"Cannot make a stable memo key from {type(value).__name__}")
+
+
+def stable_key(namespace: str, inputs: object) -> str:
+    """Hash of a namespace, its inputs and the library version"""
+    text = repr((library_version(), namespace, _canonical(inputs)))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class MemoStats:
+    hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.1%} hit rate)"
+
+
+class MemoStore:
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        max_entries: int = 10_000,
+        claim_timeout: float = 60.0,
+        poll_interval: float = 0.01,
+    ) -> None:
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        self._connection: sqlite3.Connection | None = None
+        self._pid = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # A connection must not be used across a fork, so each process opens
+        # its own
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Pickled into worker processes without the connection
+        return {**self.__dict__, "_connection": None, "_pid": 0}
+
+    def _count(self, namespace: str, column: str) -> None:
+        self.connection.execute(
+            f"INSERT INTO memo_stats (namespace, {column}) VALUES (?, 1) "
+            f"ON CONFLICT (namespace) DO UPDATE SET {column} = {column} + 1",
+            (namespace,),
+        )
+
+    def _lookup(self, key: str, namespace: str) -> tuple[bool, Any]:
+        """(True, value) on a hit, otherwise claim the key and return
+        (False, None), or wait while another process holds the claim"""
+        owner = f"{os.getpid()}"
+        while True:
+            db = self.connection
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT value, claimed_at FROM memo WHERE key = ?", (key,)
+                ).fetchone()
+                now = time.time()
+                if row is not None and row[0] is not None:
+                    db.execute(
+                        "UPDATE memo SET last_used = ? WHERE key = ?", (now, key)
+                    )
+                    self._count(namespace, "hits")
+                    db.execute("COMMIT")
+                    return True, pickle.loads(row[0])
+                if row is None or now - row[1] > self.claim_timeout:
+                    db.execute(
+                        "INSERT OR REPLACE INTO memo "
+                        "(key, namespace, claimed_by, claimed_at, last_used) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, namespace, owner, now, now),
+                    )
+                    self._count(namespace, "misses")
+                    db.execute("COMMIT")
+                    return False, None
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            time.sleep(self.poll_interval)
+
+    def _store(self, key: str, value: object) -> None:
+        db = self.connection
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "UPDATE memo SET value = ?, claimed_by = NULL, claimed_at = NULL "
+                "WHERE key = ?",
+                (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key),
+            )
+            db.execute(
+                "DELETE FROM memo WHERE key IN ("
+                "  SELECT key FROM memo WHERE value IS NOT NULL"
+                "  ORDER BY last_used DESC LIMIT -1 OFFSET ?"
+                ")",
+                (self.max_entries,),
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _release(self, key: str) -> None:
+        self.connection.execute(
+            "DELETE FROM memo WHERE key = ? AND value IS NULL", (key,)
+        )
+
+    def get_or_compute(
+        self, namespace: str, inputs: object, compute: Callable[[], T]
+    ) -> T:
+        """The stored result for (namespace, inputs), computing and storing it
+        if there is none. `compute` must be a deterministic function of
+        `inputs`, and its result must be picklable."""
+        key = stable_key(namespace, inputs)
+        hit, value = self._lookup(key, namespace)
+        if hit:
+            return value  # type: ignore
+
+        try:
+            value = compute()
+        except BaseException:
+            # Let a waiting process compute it instead
+            self._release(key)
+            raise
+        self._store(key, value)
+        return value
+
+    def memoize(self, namespace: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """Decorate a function whose arguments are the memo inputs"""
+
+        def decorate(fn: Callable[..., T]) -> Callable[..., T]:
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> T:
+                return self.get_or_compute(
+                    namespace, (args, kwargs), lambda: fn(*args, **kwargs)
+                )
+
+            return wrapper
+
+        return decorate
+
+    def __len__(self) -> int:
+        (count,) = self.connection.execute(
+            "SELECT COUNT(*) FROM memo WHERE value IS NOT NULL"
+        ).fetchone()
+        return int(count)
+
+    def stats(self) -> dict[str, MemoStats]:
+        """Hits and misses per namespace, over every process using the store"""
+        return {
+            namespace: MemoStats(hits, misses)
+            for namespace, hits, misses in self.connection.execute(
+                "SELECT namespace, hits, misses FROM memo_stats ORDER BY namespace"
+            )
+        }
+
+    def report(self) -> str:
+        return "\n".join(
+            f"{namespace}: {stats}" for namespace, stats in self.stats().items()
+        )
@@ -0,0 +1,271 @@
+"""Streaming reader for Standard MIDI Files (SMF).
+
+Files are memory-mapped and decoded lazily: every track is a generator over
+the raw bytes, and tracks are merged by time with `heapq.merge`, so only the
+current event of each track is ever held as a Python object."""
+
+from __future__ import annotations
+
+import heapq
+import mmap
+import os
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import NewType
+
+from .pitch import Pitch
+
+Tick = NewType("Tick", int)
+"""Absolute time of an event in MIDI ticks, from the start of the track"""
+
+MIDI_C0 = 12
+"""MIDI note number of C0, i.e. `Pitch(0)`"""
+
+
+class MidiFormatError(ValueError):
+    """The file is not a well-formed Standard MIDI File"""
+
+
+@dataclass(frozen=True)
+class MidiHeader:
+    format: int
+    num_tracks: int
+    division: int
+
+
+@dataclass(frozen=True, order=True)
+class NoteEvent:
+    """A note-on or note-off event. A note-on with zero velocity is reported
+    as a note-off, as it is by every sequencer."""
+
+    time: Tick
+    track: int
+    channel: int
+    pitch: Pitch
+    velocity: int
+    on: bool
+
+
+def pitch_from_midi(note_number: int) -> Pitch:
+    return Pitch(note_number - MIDI_C0)
+
+
+def midi_from_pitch(pitch: Pitch) -> int:
+    return pitch.half_steps + MIDI_C0
+
+
+def _read_u16(data: mmap.mmap | bytes, offset: int) -> int:
+    return (data[offset] << 8) | data[offset + 1]
+
+
+def _read_u32(data: mmap.mmap | bytes, offset: int) -> int:
+    return (
+        (data[offset] << 24)
+        | (data[offset + 1] << 16)
+        | (data[offset + 2] << 8)
+        | data[offset + 3]
+    )
+
+
+def _read_varlen(data: mmap.mmap | bytes, offset: int, end: int) -> tuple[int, int]:
+    """Decode a variable-length quantity ending before `end`, returning
+    (value, next offset)"""
+    value = 0
+    for _ in range(4):
+        if offset >= end:
+            raise MidiFormatError(f"Truncated variable-length quantity at {offset}")
+        byte = data[offset]
+        offset += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, offset
+    raise MidiFormatError(f"Variable-length quantity too long at byte {offset}")
+
+
+# Number of data bytes following each channel message status (high nibble)
+_CHANNEL_MESSAGE_LENGTHS = {
+    0x8: 2,
+    0x9: 2,
+    0xA: 2,
+    0xB: 2,
+    0xC: 1,
+    0xD: 1,
+    0xE: 2,
+}
+
+
+def read_header(data: mmap.mmap | bytes) -> MidiHeader:
+    if len(data) < 14 or data[0:4] != b"MThd":
+        raise MidiFormatError("Missing MThd header chunk")
+    length = _read_u32(data, 4)
+    if length < 6:
+        raise MidiFormatError(f"Header chunk too short: {length}")
+    return MidiHeader(
+        format=_read_u16(data, 8),
+        num_tracks=_read_u16(data, 10),
+        division=_read_u16(data, 12),
+    )
+
+
+def _track_chunks(data: mmap.mmap | bytes) -> Iterator[tuple[int, int]]:
+    """Yield (start, end) byte ranges of every MTrk chunk body"""
+    offset = 8 + _read_u32(data, 4)
+    size = len(data)
+    while offset + 8 <= size:
+        chunk_type = data[offset : offset + 4]
+        length = _read_u32(data, offset + 4)
+        start = offset + 8
+        end = start + length
+        if end > size:
+            raise MidiFormatError(f"Chunk at byte {offset} runs past end of file")
+        # Unknown chunk types must be skipped, per the spec
+        if chunk_type == b"MTrk":
+            yield start, end
+        offset = end
+
+
+def _track_note_events(
+    data: mmap.mmap | bytes, track: int, start: int, end: int
+) -> Iterator[NoteEvent]:
+    offset = start
+    ticks = 0
+    running_status = 0
+    while offset < end:
+        delta, offset = _read_varlen(data, offset, end)
+        ticks += delta
+
+        if offset >= end:
+            raise MidiFormatError(f"Track ends after a delta time at byte {offset}")
+        status = data[offset]
+        if status & 0x80:
+            offset += 1
+        elif running_status:
+            # Running status: the byte we just saw is already the first data byte
+            status = running_status
+        else:
+            raise MidiFormatError(f"Data byte without status at byte {offset}")
+
+        # Meta and SysEx events cancel running status
+        if status == 0xFF:
+            running_status = 0
+            offset += 1  # meta type
+            length, offset = _read_varlen(data, offset, end)
+            offset += length
+            if offset > end:
+                raise MidiFormatError(f"Meta event runs past end of track {track}")
+            continue
+        if status in (0xF0, 0xF7):
+            running_status = 0
+            length, offset = _read_varlen(data, offset, end)
+            offset += length
+            if offset > end:
+                raise MidiFormatError(f"SysEx event runs past end of track {track}")
+            continue
+
+        kind = status >> 4
+        num_data = _CHANNEL_MESSAGE_LENGTHS.get(kind)
+        if num_data is None:
+            raise MidiFormatError(f"Unexpected status {status:#x} at byte {offset}")
+        if offset + num_data > end:
+            raise MidiFormatError(f"Channel message runs past end of track {track}")
+        running_status = status
+
+        if kind == 0x9 or kind == 0x8:
+            note = data[offset]
+            velocity = data[offset + 1]
+            yield NoteEvent(
+                Tick(ticks),
+                track,
+                status & 0x0F,
+                pitch_from_midi(note),
+                velocity,
+                kind == 0x9 and velocity > 0,
+            )
+        offset += num_data
+
+
+def iter_note_events(data: mmap.mmap | bytes) -> Iterator[NoteEvent]:
+    """Yield note events of all tracks, merged in time order"""
+    read_header(data)
+    tracks = (
+        _track_note_events(data, track, start, end)
+        for track, (start, end) in enumerate(_track_chunks(data))
+    )
+    return heapq.merge(*tracks, key=lambda e: (e.time, e.track))
+
+
+def read_note_events(path: str | os.PathLike[str]) -> Iterator[NoteEvent]:
+    """Memory-map a MIDI file and stream its note events in time order"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise MidiFormatError(f"{path} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from iter_note_events(data)
+
+
+def read_pitches(path: str | os.PathLike[str]) -> Iterator[Pitch]:
+    """Stream the pitch of every sounding note (note-on) in a MIDI file"""
+    return (event.pitch for event in read_note_events(path) if event.on)
+
+
+@dataclass(frozen=True)
+class CorpusReport:
+    files: int
+    events: int
+    failed: list[str]
+    seconds: float
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files} files ({len(self.failed)} failed), {self.events} events "
+            f"in {self.seconds:.2f}s: {self.files_per_second:.1f} files/s, "
+            f"{self.events_per_second:.0f} events/s"
+        )
+
+
+def _count_file_events(path: str) -> int | None:
+    try:
+        return sum(1 for _ in read_note_events(path))
+    except (MidiFormatError, IndexError, OSError):
+        return None
+
+
+def scan_corpus(
+    paths: Iterable[str | os.PathLike[str]],
+    *,
+    max_workers: int | None = None,
+    chunksize: int = 16,
+) -> CorpusReport:
+    """Parse every file in a corpus over a process pool, and report
+    throughput. Malformed files are counted as failed rather than aborting the
+    scan."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    path_list = [os.fspath(path) for path in paths]
+    files = 0
+    events = 0
+    failed: list[str] = []
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for path, count in zip(
+            path_list,
+            pool.map(_count_file_events, path_list, chunksize=chunksize),
+        ):
+            if count is None:
+                failed.append(path)
+            else:
+                files += 1
+                events += count
+    seconds = time.perf_counter() - start
+
+    return CorpusReport(files, events, failed, seconds)
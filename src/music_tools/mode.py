@@ -1,8 +1,10 @@
 from collections import OrderedDict
 from collections.abc import Iterable
-from typing import TypeVar
+from typing import TYPE_CHECKING, TypeVar
+from ._lazy import lazy_attributes
+from .instrument import instrumented
 from .pitch import OCTAVE
-from .scale import Scale, name_to_scale
+from .scale import Scale
 
 
 def next_mode(scale: Scale) -> Scale:
@@ -22,6 +24,7 @@ def _add_new_to_set(s: set[T], val: T) -> bool:
     return didnt_exist
 
 
+@instrumented("mode.scale_modes")
 def scale_modes(scale: Scale) -> Iterable[Scale]:
     """Yield all unique modes of a scale"""
 
@@ -34,9 +37,28 @@ def scale_modes(scale: Scale) -> Iterable[Scale]:
         scale = next_mode(scale)
 
 
-major_scale_modes_by_name: OrderedDict[str, Scale] = OrderedDict(
-    zip(
-        ("Ionian", "Dorian", "Phrygian", "Lydian", "Mixolydian", "Aeolian", "Locrian"),
-        scale_modes(name_to_scale["Major"]),
+def _major_scale_modes_by_name() -> OrderedDict[str, Scale]:
+    from .scale import name_to_scale
+
+    return OrderedDict(
+        zip(
+            (
+                "Ionian",
+                "Dorian",
+                "Phrygian",
+                "Lydian",
+                "Mixolydian",
+                "Aeolian",
+                "Locrian",
+            ),
+            scale_modes(name_to_scale["Major"]),
+        )
     )
+
+
+if TYPE_CHECKING:
+    major_scale_modes_by_name: OrderedDict[str, Scale]
+
+__getattr__ = lazy_attributes(
+    globals(), {"major_scale_modes_by_name": _major_scale_modes_by_name}
 )
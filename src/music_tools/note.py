@@ -1,10 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Callable
+from functools import cache, partial
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
 from typing_extensions import Self
 from enum import Enum
-from parsy import char_from, regex, seq  # type: ignore
 
+from ._lazy import lazy_attributes
+from .instrument import instrumented
 from .pitch import Pitch, OctavePitch, Octave
 
 
@@ -78,8 +80,12 @@ def closest_flat(octave_pitch: OctavePitch) -> Note:
         return Note(NoteName(octave_pitch.half_steps + 1), Accidental.Flat)
 
 
-sharp_notes = tuple(map(closest_sharp, map(OctavePitch, range(0, 12))))
-flat_notes = tuple(map(closest_flat, map(OctavePitch, range(0, 12))))
+def _sharp_notes() -> tuple[Note, ...]:
+    return tuple(map(closest_sharp, map(OctavePitch, range(0, 12))))
+
+
+def _flat_notes() -> tuple[Note, ...]:
+    return tuple(map(closest_flat, map(OctavePitch, range(0, 12))))
 
 
 @dataclass
@@ -105,11 +111,6 @@ class MusicalPitch:
         return f"{self.note}{self.octave}"
 
 
-note_name_parser = char_from("".join(__note_name_keys__)).map(
-    lambda name: NoteName[name]
-)
-
-
 def _chars_to_accidental(chars: list[str]) -> Accidental:
     value = 0
     for char in chars:
@@ -120,20 +121,71 @@ def _chars_to_accidental(chars: list[str]) -> Accidental:
     return Accidental(value)
 
 
-accidental_parser = char_from("b#").at_most(2).map(_chars_to_accidental)
+class _Parsers(NamedTuple):
+    note_name_parser: Any
+    accidental_parser: Any
+    note_parser: Any
+    octave_parser: Any
+    musical_pitch_parser: Any
+
+
+@cache
+def _parsers() -> _Parsers:
+    """Build the parsers on first use, so importing this module does not
+    import parsy"""
+    from parsy import char_from, regex, seq  # type: ignore
 
-note_parser = seq(note_name_parser, accidental_parser).combine(Note)
+    note_name_parser = char_from("".join(__note_name_keys__)).map(
+        lambda name: NoteName[name]
+    )
 
-octave_parser = regex(r"[0-9]+").map(lambda i: Octave(int(i)))
+    accidental_parser = char_from("b#").at_most(2).map(_chars_to_accidental)
 
-musical_pitch_parser = seq(note_parser, octave_parser).combine(MusicalPitch)
+    note_parser = seq(note_name_parser, accidental_parser).combine(Note)
 
+    octave_parser = regex(r"[0-9]+").map(lambda i: Octave(int(i)))
 
+    musical_pitch_parser = seq(note_parser, octave_parser).combine(MusicalPitch)
+
+    return _Parsers(
+        note_name_parser,
+        accidental_parser,
+        note_parser,
+        octave_parser,
+        musical_pitch_parser,
+    )
+
+
+def _parser(name: str) -> Any:
+    return getattr(_parsers(), name)
+
+
+@instrumented("note.n")
 def n(text: str) -> Note:
     """Shorthand to parse a note like "Bb"."""
-    return note_parser.parse(text)  # type: ignore
+    return _parsers().note_parser.parse(text)  # type: ignore
 
 
+@instrumented("note.p")
 def p(text: str) -> MusicalPitch:
     """Shorthand to parse a musical pitch like "Bb4"."""
-    return musical_pitch_parser.parse(text)  # type: ignore
+    return _parsers().musical_pitch_parser.parse(text)  # type: ignore
+
+
+if TYPE_CHECKING:
+    sharp_notes: tuple[Note, ...]
+    flat_notes: tuple[Note, ...]
+    note_name_parser: Any
+    accidental_parser: Any
+    note_parser: Any
+    octave_parser: Any
+    musical_pitch_parser: Any
+
+__getattr__ = lazy_attributes(
+    globals(),
+    {
+        "sharp_notes": _sharp_notes,
+        "flat_notes": _flat_notes,
+        **{name: partial(_parser, name) for name in _Parsers._fields},
+    },
+)
@@ -0,0 +1,57 @@
+"""Parsing of the tunings, notes and scales named in requests, shared by the
+command line, the server and the catalogue build."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .guitar import Fretboard
+    from .note import Note
+    from .scale import Scale
+
+
+class RequestError(ValueError):
+    """The request is malformed or refers to something unknown"""
+
+
+@lru_cache(maxsize=64)
+def fretboard_by_name(tuning: str) -> Fretboard:
+    """One of the named tunings (EADGBE, DROP_A, MEGA) or a tuning string such
+    as 'E4 A4 D5 G5 B5 E6'. Only recently used tunings are kept, as tuning
+    strings come from requests"""
+    from parsy import ParseError  # type: ignore
+
+    from . import guitar
+
+    named = {"EADGBE": "EADGBE", "DROP_A": "DROP_A", "MEGA": "MEGA_FRETBOARD"}
+    if tuning in named:
+        return getattr(guitar, named[tuning])  # type: ignore
+    try:
+        return guitar.Fretboard.from_tuning(tuning)
+    except ParseError:
+        raise RequestError(f"not a tuning: {tuning!r}") from None
+
+
+def parse_note(text: str) -> Note:
+    """Parse a note name, raising RequestError if it is not one"""
+    from parsy import ParseError
+
+    from .note import n
+
+    try:
+        return n(text)
+    except ParseError:
+        raise RequestError(f"not a note: {text!r}") from None
+
+
+def parse_scale(name: str) -> Scale:
+    """A named scale or a mode of the major scale"""
+    from .mode import major_scale_modes_by_name
+    from .scale import name_to_scale
+
+    scale = name_to_scale.get(name) or major_scale_modes_by_name.get(name)
+    if scale is None:
+        raise RequestError(f"unknown scale: {name!r}")
+    return scale
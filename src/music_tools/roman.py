@@ -0,0 +1,277 @@
+"""Roman numeral analysis of chord streams.
+
+Chords are labelled relative to a given key, or to a key detected from a
+window of surrounding chords. Chords that are not diatonic are flagged as
+secondary dominants (e.g. V7/ii) or as borrowed from the parallel key (e.g.
+♭VI in a major key).
+
+`analyze` is a generator holding at most `2 * lookahead + 1` chords, so
+arbitrarily long streams are analyzed in constant memory."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import cache
+from itertools import groupby
+
+from .chord import (
+    Chord,
+    ChordDescription,
+    Extension,
+    ToneQuality,
+    chords_in_scale,
+    description_to_chord_scale,
+)
+from .chord_scale_matrix import CHORD_SHAPES, ChordShape
+from .key import detect_keys
+from .midi import NoteEvent
+from .note import Accidental, Note, closest_flat, closest_sharp
+from .pitch import OctavePitch
+from .scale import PitchClassMask, Scale, scale_to_mask, transpose_mask
+
+_NUMERALS = ("I", "II", "III", "IV", "V", "VI", "VII")
+
+
+@dataclass(frozen=True)
+class Key:
+    tonic: Note
+    minor: bool = False
+
+    def __str__(self) -> str:
+        return f"{self.tonic} {'minor' if self.minor else 'major'}"
+
+
+@dataclass(frozen=True)
+class RomanNumeral:
+    chord: Chord
+    key: Key
+    numeral: str | None
+    """e.g. "ii7", "V7/V" or "♭VI", or None if the chord was not recognized"""
+    root: Note | None
+    shape: ChordShape | None
+    diatonic: bool = False
+    secondary_of: str | None = None
+    """Numeral of the chord a secondary dominant leads to, e.g. "ii" """
+    borrowed: bool = False
+    """Diatonic in the parallel key, but not in this one"""
+
+    def __str__(self) -> str:
+        return self.numeral or "?"
+
+
+@cache
+def _chord_shapes_by_mask() -> dict[PitchClassMask, ChordShape]:
+    shapes: dict[PitchClassMask, ChordShape] = {}
+    for shape in CHORD_SHAPES:
+        mask = scale_to_mask(description_to_chord_scale(ChordDescription(*shape)))
+        shapes.setdefault(mask, shape)
+    return shapes
+
+
+def identify_chord(
+    chord: Sequence[OctavePitch],
+) -> tuple[OctavePitch, ChordShape] | None:
+    """Root and shape of a chord, trying its first (bass) note as the root
+    before the others, or None if it is not a triad or seventh chord"""
+    mask = scale_to_mask(chord)
+    shapes = _chord_shapes_by_mask()
+    for root in dict.fromkeys(chord):
+        shape = shapes.get(transpose_mask(mask, -root.half_steps))
+        if shape is not None:
+            return root, shape
+    return None
+
+
+def _key_scales(minor: bool) -> list[Scale]:
+    from .scale import name_to_scale
+
+    if minor:
+        # The raised seventh gives minor keys their V and vii°
+        return [name_to_scale["Minor"], name_to_scale["Harmonic Minor"]]
+    return [name_to_scale["Major"]]
+
+
+@cache
+def _diatonic_chords(minor: bool) -> dict[tuple[int, ChordShape], int]:
+    """Scale degree (0-based) of every diatonic triad and seventh chord, by
+    root (half-steps above the tonic) and shape"""
+    shapes = _chord_shapes_by_mask()
+    chords: dict[tuple[int, ChordShape], int] = {}
+    for scale in _key_scales(minor):
+        for include_seven in (False, True):
+            for degree, (interval, chord) in enumerate(
+                zip(scale, chords_in_scale(scale, include_seven=include_seven))
+            ):
+                shape = shapes[scale_to_mask(chord)]
+                chords.setdefault((interval.half_steps, shape), degree)
+    return chords
+
+
+@cache
+def _degree_roots(minor: bool) -> tuple[int, ...]:
+    return tuple(interval.half_steps for interval in _key_scales(minor)[0])
+
+
+# The 6th and 7th degrees raised by harmonic and melodic minor, by root
+_RAISED_MINOR_DEGREES = {9: 5, 11: 6}
+
+
+def _degree_numeral(root: int, minor: bool, diatonic: bool = False) -> str:
+    """Numeral of a root (half-steps above the tonic), with an accidental if
+    it is not in the key's scale. In a minor key, the raised 6th and 7th
+    degrees are sharpened numerals, without the ♯ for `diatonic` chords."""
+    roots = _degree_roots(minor)
+    if root in roots:
+        return _NUMERALS[roots.index(root)]
+    if minor and root in _RAISED_MINOR_DEGREES:
+        numeral = _NUMERALS[_RAISED_MINOR_DEGREES[root]]
+        return numeral if diatonic else f"♯{numeral}"
+    if (root + 1) % 12 in roots:
+        return f"♭{_NUMERALS[roots.index((root + 1) % 12)]}"
+    return f"♯{_NUMERALS[roots.index((root - 1) % 12)]}"
+
+
+_DIMINISHED_SUFFIXES = {
+    None: "°",
+    Extension.MinorSeven: "ø7",
+    Extension.DiminishedSeven: "°7",
+}
+_EXTENSION_SUFFIXES = {
+    None: "",
+    Extension.MinorSix: "♭6",
+    Extension.Six: "6",
+    Extension.MinorSeven: "7",
+    Extension.MajorSeven: "Δ7",
+}
+
+
+def _numeral(degree: str, shape: ChordShape) -> str:
+    triad, extension = shape
+    if triad in (ToneQuality.Minor, ToneQuality.Diminished):
+        degree = degree.replace("I", "i").replace("V", "v")
+    if triad is ToneQuality.Diminished:
+        suffix = _DIMINISHED_SUFFIXES.get(extension)
+        if suffix is not None:
+            return degree + suffix
+        degree += "°"
+    elif triad is ToneQuality.Augmented:
+        degree += "+"
+    return degree + _EXTENSION_SUFFIXES[extension]
+
+
+_DOMINANTS = {(ToneQuality.Major, None), (ToneQuality.Major, Extension.MinorSeven)}
+
+
+def label_chord(chord: Chord, key: Key) -> RomanNumeral:
+    """Label a chord as diatonic, else borrowed from the parallel key, else
+    as a secondary dominant of a major or minor degree other than the tonic"""
+    identified = identify_chord(chord)
+    if identified is None:
+        return RomanNumeral(chord, key, None, None, None)
+    root, shape = identified
+    spell = closest_flat if key.tonic.accidental is Accidental.Flat else closest_sharp
+    note = spell(root)
+    relative = (root.half_steps - key.tonic.to_octave_pitch().half_steps) % 12
+
+    diatonic = _diatonic_chords(key.minor)
+    is_diatonic = (relative, shape) in diatonic
+    numeral = _numeral(_degree_numeral(relative, key.minor, is_diatonic), shape)
+    if is_diatonic:
+        return RomanNumeral(chord, key, numeral, note, shape, diatonic=True)
+    if (relative, shape) in _diatonic_chords(not key.minor):
+        return RomanNumeral(chord, key, numeral, note, shape, borrowed=True)
+
+    if shape in _DOMINANTS:
+        target = (relative + 5) % 12
+        target_degrees = [
+            (degree, target_shape)
+            for (target_root, target_shape), degree in diatonic.items()
+            if target_root == target and target_shape[1] is None
+        ]
+        if target_degrees:
+            degree, target_shape = min(target_degrees, key=lambda d: d[0])
+            if degree != 0 and target_shape[0] in (
+                ToneQuality.Major,
+                ToneQuality.Minor,
+            ):
+                target_numeral = _numeral(
+                    _degree_numeral(target, key.minor, diatonic=True), target_shape
+                )
+                return RomanNumeral(
+                    chord,
+                    key,
+                    f"{_numeral('V', shape)}/{target_numeral}",
+                    note,
+                    shape,
+                    secondary_of=target_numeral,
+                )
+
+    return RomanNumeral(chord, key, numeral, note, shape)
+
+
+@cache
+def _key_catalogue() -> dict[str, Scale]:
+    from .scale import name_to_scale
+
+    return {"Major": name_to_scale["Major"], "Minor": name_to_scale["Minor"]}
+
+
+def _add(histogram: list[float], chord: Chord, weight: float) -> None:
+    for pitch in chord:
+        histogram[pitch.half_steps] += weight
+
+
+def analyze(
+    chords: Iterable[Chord], *, key: Key | None = None, lookahead: int = 8
+) -> Iterator[RomanNumeral]:
+    """Label every chord of a stream. Without a `key`, the key is detected
+    from the pitch classes of up to `lookahead` chords on either side of a
+    chord, whenever the chord is not diatonic in the previous key (as with
+    a pivot chord, a modulation is heard at its first chromatic chord). The
+    previous key is also kept while the window is ambiguous."""
+    if key is not None:
+        for chord in chords:
+            yield label_chord(chord, key)
+        return
+
+    histogram = [0.0] * 12
+    ahead: deque[Chord] = deque()
+    behind: deque[Chord] = deque()
+    current_key: Key | None = None
+
+    def label_next() -> RomanNumeral:
+        nonlocal current_key
+        chord = ahead.popleft()
+        label = None if current_key is None else label_chord(chord, current_key)
+        if label is None or not label.diatonic:
+            [estimate] = detect_keys([histogram], catalogue=_key_catalogue())
+            if estimate is not None:
+                current_key = Key(estimate.root, estimate.scale_name == "Minor")
+                label = label_chord(chord, current_key)
+        behind.append(chord)
+        if len(behind) > lookahead:
+            _add(histogram, behind.popleft(), -1)
+        return label or label_chord(chord, Key(closest_sharp(OctavePitch(0))))
+
+    for chord in chords:
+        ahead.append(chord)
+        _add(histogram, chord, 1)
+        if len(ahead) > lookahead:
+            yield label_next()
+    while ahead:
+        yield label_next()
+
+
+def chords_from_note_events(
+    events: Iterable[NoteEvent], *, min_notes: int = 3
+) -> Iterator[Chord]:
+    """Chords of notes starting at the same time, lowest note first, e.g.
+    from `midi.read_note_events`. Onsets of fewer than `min_notes` distinct
+    pitch classes are skipped."""
+    for _, onset in groupby((e for e in events if e.on), key=lambda e: e.time):
+        pitches = sorted(event.pitch.half_steps for event in onset)
+        pitch_classes = dict.fromkeys(OctavePitch(p) for p in pitches)
+        if len(pitch_classes) >= min_notes:
+            yield Chord(tuple(pitch_classes))
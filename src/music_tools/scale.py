@@ -1,10 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from functools import cache
 from itertools import chain
-from typing import Iterable, Mapping, NewType
+from typing import TYPE_CHECKING, Iterable, Mapping, NewType
 from typing_extensions import Self
 
-from .pitch import Interval
+from ._lazy import lazy_attributes
+from .pitch import Interval, OctavePitch
 from .note import (
     Note,
     closest_sharp,
@@ -46,22 +48,71 @@ def intervals_from_scale(scale: Scale) -> IntervalSequence:
     return IntervalSequence(intervals)
 
 
-name_to_scale: Mapping[str, Scale] = dict(
-    (kv[0], scale_from_intervals(interval_sequence(kv[1])))
-    for kv in [
-        ("Major", [2, 2, 1, 2, 2, 2, 1]),
-        # TODO: generate modes?
-        ("Minor", [2, 1, 2, 2, 1, 2, 2]),
-        ("Harmonic Minor", [2, 1, 2, 2, 1, 3, 1]),
-        ("Melodic Minor", [2, 1, 2, 2, 2, 2, 1]),
-        ("Harmonic Major", [2, 2, 1, 2, 1, 3, 1]),
-        ("Whole-Tone", [2, 2, 2, 2, 2, 2]),
-        ("Whole-Half Diminished", [2, 1, 2, 1, 2, 1, 2, 1]),
-        ("Augmented", [3, 1, 3, 1, 3, 1]),
-    ]
-)
-scale_to_name: Mapping[Scale, str] = dict(
-    (kv[1], kv[0]) for kv in name_to_scale.items()
+PitchClassMask = NewType("PitchClassMask", int)
+"""A set of pitch classes as a 12-bit mask, where bit i is set if the pitch
+class i half-steps above the root is present"""
+
+
+def scale_to_mask(scale: Iterable[Interval | OctavePitch]) -> PitchClassMask:
+    """Pitch class mask of a scale, or of any collection of pitch classes"""
+    mask = 0
+    for interval in scale:
+        mask |= 1 << (interval.half_steps % 12)
+    return PitchClassMask(mask)
+
+
+PitchClassSet = PitchClassMask | Iterable[Interval | OctavePitch]
+"""Either a pitch class mask, or a collection of intervals/pitch classes
+(e.g. a `Scale` or `Chord`)"""
+
+
+def as_mask(pcs: PitchClassSet) -> PitchClassMask:
+    if isinstance(pcs, int):
+        if not 0 <= pcs <= 0xFFF:
+            raise ValueError(f"Not a pitch class mask: {pcs}")
+        return pcs
+    return scale_to_mask(pcs)
+
+
+def mask_to_scale(mask: PitchClassMask) -> Scale:
+    return Scale(tuple(Interval(i) for i in range(12) if mask >> i & 1))
+
+
+def transpose_mask(mask: PitchClassMask, half_steps: int) -> PitchClassMask:
+    """Rotate a pitch class mask up by some number of half-steps"""
+    half_steps %= 12
+    return PitchClassMask(((mask << half_steps) | (mask >> (12 - half_steps))) & 0xFFF)
+
+
+@cache
+def _name_to_scale() -> Mapping[str, Scale]:
+    return dict(
+        (kv[0], scale_from_intervals(interval_sequence(kv[1])))
+        for kv in [
+            ("Major", [2, 2, 1, 2, 2, 2, 1]),
+            # TODO: generate modes?
+            ("Minor", [2, 1, 2, 2, 1, 2, 2]),
+            ("Harmonic Minor", [2, 1, 2, 2, 1, 3, 1]),
+            ("Melodic Minor", [2, 1, 2, 2, 2, 2, 1]),
+            ("Harmonic Major", [2, 2, 1, 2, 1, 3, 1]),
+            ("Whole-Tone", [2, 2, 2, 2, 2, 2]),
+            ("Whole-Half Diminished", [2, 1, 2, 1, 2, 1, 2, 1]),
+            ("Augmented", [3, 1, 3, 1, 3, 1]),
+        ]
+    )
+
+
+def _scale_to_name() -> Mapping[Scale, str]:
+    return dict((kv[1], kv[0]) for kv in _name_to_scale().items())
+
+
+if TYPE_CHECKING:
+    name_to_scale: Mapping[str, Scale]
+    scale_to_name: Mapping[Scale, str]
+
+__getattr__ = lazy_attributes(
+    globals(),
+    {"name_to_scale": _name_to_scale, "scale_to_name": _scale_to_name},
 )
 
 
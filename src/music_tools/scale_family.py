@@ -0,0 +1,130 @@
+"""Classify scales into rotation families: a parent scale and its modes.
+
+Two scales are modes of each other exactly when they have the same canonical
+rotation, the numerically smallest pitch class mask among the rotations of
+the scale onto each of its notes. Classifying a scale is therefore one
+(cached) canonicalization and a dict lookup, and memory is bounded by the
+number of distinct families, however many scales are streamed through."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from functools import cache
+
+from .scale import PitchClassMask, Scale, as_mask, mask_to_scale, transpose_mask
+
+
+@cache
+def canonical_rotation(mask: PitchClassMask) -> PitchClassMask:
+    """Smallest mask among the modes of a scale. Equal for all modes of the
+    same parent scale, and for no other scales"""
+    if not mask & 1:
+        raise ValueError(f"A scale must contain its root: {mask:#b}")
+    return min(
+        transpose_mask(mask, -degree) for degree in range(12) if mask >> degree & 1
+    )
+
+
+def _modes_by_mask(parent: PitchClassMask) -> dict[PitchClassMask, int]:
+    """1-based mode number of every rotation of the parent. Modes of
+    symmetric scales repeat, and get their lowest number"""
+    modes: dict[PitchClassMask, int] = {}
+    degrees = (degree for degree in range(12) if parent >> degree & 1)
+    for mode, degree in enumerate(degrees, 1):
+        modes.setdefault(transpose_mask(parent, -degree), mode)
+    return modes
+
+
+@dataclass(frozen=True)
+class ScaleFamily:
+    parent_name: str
+    parent: Scale
+    mode_names: Mapping[int, str] = field(compare=False, repr=False)
+    """Names of modes that have one of their own, e.g. "Dorian" """
+    _modes_by_mask: dict[PitchClassMask, int] = field(compare=False, repr=False)
+
+    @property
+    def num_modes(self) -> int:
+        return len(self._modes_by_mask)
+
+    def mode_name(self, mode: int) -> str:
+        if mode in self.mode_names:
+            return self.mode_names[mode]
+        return self.parent_name if mode == 1 else f"{self.parent_name} mode {mode}"
+
+
+@dataclass(frozen=True)
+class ClassifiedScale:
+    scale: Scale
+    family: ScaleFamily
+    mode: int
+    """Which mode of the parent scale this is, starting from 1 for the parent"""
+
+    @property
+    def name(self) -> str:
+        return self.family.mode_name(self.mode)
+
+
+def _default_named_families() -> list[tuple[str, Scale, Mapping[int, str]]]:
+    from .mode import major_scale_modes_by_name
+    from .scale import name_to_scale
+
+    major_modes = dict(enumerate(major_scale_modes_by_name, 1))
+    return [
+        (name, scale, major_modes if name == "Major" else {})
+        for name, scale in name_to_scale.items()
+    ]
+
+
+class ScaleFamilyClassifier:
+    """Assigns scales to families. Families with a named parent scale (by
+    default the scales in `name_to_scale`) use that name and that parent's
+    mode numbering. Any other family is named after its canonical rotation,
+    which is also its parent."""
+
+    def __init__(
+        self, named: Iterable[tuple[str, Scale, Mapping[int, str]]] | None = None
+    ) -> None:
+        self.families: dict[PitchClassMask, ScaleFamily] = {}
+        for name, scale, mode_names in (
+            _default_named_families() if named is None else named
+        ):
+            canonical = canonical_rotation(as_mask(scale))
+            if canonical not in self.families:
+                self.families[canonical] = ScaleFamily(
+                    name, scale, mode_names, _modes_by_mask(as_mask(scale))
+                )
+
+    def _family(self, canonical: PitchClassMask) -> ScaleFamily:
+        family = self.families.get(canonical)
+        if family is None:
+            parent = mask_to_scale(canonical)
+            family = self.families[canonical] = ScaleFamily(
+                repr(parent), parent, {}, _modes_by_mask(canonical)
+            )
+        return family
+
+    def classify(self, scale: Scale) -> ClassifiedScale:
+        mask = as_mask(scale)
+        family = self._family(canonical_rotation(mask))
+        return ClassifiedScale(scale, family, family._modes_by_mask[mask])
+
+    def classify_all(self, scales: Iterable[Scale]) -> Iterator[ClassifiedScale]:
+        return map(self.classify, scales)
+
+
+def classify_scales(scales: Iterable[Scale]) -> Iterator[ClassifiedScale]:
+    """Classify a stream of scales, yielding each as it is classified"""
+    return ScaleFamilyClassifier().classify_all(scales)
+
+
+def group_scale_families(
+    scales: Iterable[Scale],
+) -> dict[ScaleFamily, list[ClassifiedScale]]:
+    """Families of the given scales, in order of first appearance, each with
+    its members in order"""
+    groups: dict[ScaleFamily, list[ClassifiedScale]] = {}
+    for classified in classify_scales(scales):
+        groups.setdefault(classified.family, []).append(classified)
+    return groups
@@ -0,0 +1,217 @@
+"""Compact storage for large collections of scales.
+
+A `ScaleTable` keeps one column per attribute instead of one object per
+scale: a bitmask of the scale's intervals, its root (if any), and the id of
+its name (if any) in a shared table of names. That is 9 or 13 bytes per scale
+rather than a `Scale` tuple of `Interval` objects.
+
+Slicing a table returns a view over the same columns without copying. Filters
+scan a column in one pass and return a compact table of the matching rows.
+`Scale` objects are only created when an item is accessed."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import compress
+from typing import overload
+
+from .pitch import Interval, OctavePitch
+from .scale import Scale
+
+NO_ROOT = -1
+NO_NAME = -1
+
+
+def _mask_typecode(octave: int) -> str:
+    if not 0 < octave <= 64:
+        raise ValueError(f"Unsupported octave size: {octave}")
+    return "I" if octave <= 32 else "Q"
+
+
+class ScaleTableBuilder:
+    """Appends scales into the columns of a future `ScaleTable`. `build` hands
+    the columns over to the table, and the builder starts empty again."""
+
+    def __init__(self, *, octave: int = 12) -> None:
+        self.octave = octave
+        self._reset()
+
+    def _reset(self) -> None:
+        self._masks = array(_mask_typecode(self.octave))
+        self._roots = array("b")
+        self._name_ids = array("i")
+        self._names: list[str] = []
+        self._name_ids_by_name: dict[str, int] = {}
+
+    def append_mask(
+        self, mask: int, root: OctavePitch | None = None, name: str | None = None
+    ) -> None:
+        self._masks.append(mask)
+        self._roots.append(NO_ROOT if root is None else root.half_steps)
+        if name is None:
+            self._name_ids.append(NO_NAME)
+            return
+        name_id = self._name_ids_by_name.get(name)
+        if name_id is None:
+            name_id = self._name_ids_by_name[name] = len(self._names)
+            self._names.append(name)
+        self._name_ids.append(name_id)
+
+    def append(
+        self, scale: Scale, root: OctavePitch | None = None, name: str | None = None
+    ) -> None:
+        mask = 0
+        for interval in scale:
+            mask |= 1 << (interval.half_steps % self.octave)
+        self.append_mask(mask, root, name)
+
+    def build(self) -> ScaleTable:
+        table = ScaleTable(
+            memoryview(self._masks),
+            memoryview(self._roots),
+            memoryview(self._name_ids),
+            tuple(self._names),
+            octave=self.octave,
+        )
+        self._reset()
+        return table
+
+
+class ScaleTable(Sequence[Scale]):
+    __slots__ = ("_masks", "_name_ids", "_names", "_roots", "octave")
+
+    def __init__(
+        self,
+        masks: memoryview,
+        roots: memoryview,
+        name_ids: memoryview,
+        names: tuple[str, ...],
+        *,
+        octave: int = 12,
+    ) -> None:
+        if not len(masks) == len(roots) == len(name_ids):
+            raise ValueError("masks, roots and name_ids must have the same length")
+        self.octave = octave
+        self._masks = masks
+        self._roots = roots
+        self._name_ids = name_ids
+        self._names = names
+
+    @staticmethod
+    def from_scales(
+        scales: Iterable[Scale],
+        *,
+        roots: Iterable[OctavePitch | None] | None = None,
+        names: Iterable[str | None] | None = None,
+        octave: int = 12,
+    ) -> ScaleTable:
+        builder = ScaleTableBuilder(octave=octave)
+        if roots is None and names is None:
+            for scale in scales:
+                builder.append(scale)
+        else:
+            root_column = iter(roots) if roots is not None else None
+            name_column = iter(names) if names is not None else None
+            for scale in scales:
+                builder.append(
+                    scale,
+                    next(root_column) if root_column is not None else None,
+                    next(name_column) if name_column is not None else None,
+                )
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    @overload
+    def __getitem__(self, index: int) -> Scale: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> ScaleTable: ...
+
+    def __getitem__(self, index: int | slice) -> Scale | ScaleTable:
+        if isinstance(index, slice):
+            return ScaleTable(
+                self._masks[index],
+                self._roots[index],
+                self._name_ids[index],
+                self._names,
+                octave=self.octave,
+            )
+        return self._to_scale(self._masks[index])
+
+    def __iter__(self) -> Iterator[Scale]:
+        return map(self._to_scale, self._masks)
+
+    def _to_scale(self, mask: int) -> Scale:
+        return Scale(tuple(Interval(i) for i in range(self.octave) if mask >> i & 1))
+
+    def mask(self, index: int) -> int:
+        return int(self._masks[index])
+
+    def root(self, index: int) -> OctavePitch | None:
+        root = self._roots[index]
+        return None if root == NO_ROOT else OctavePitch(root)
+
+    def name(self, index: int) -> str | None:
+        name_id = self._name_ids[index]
+        return None if name_id == NO_NAME else self._names[name_id]
+
+    @property
+    def masks(self) -> memoryview:
+        """Read-only view of the interval bitmask column"""
+        return self._masks.toreadonly()
+
+    @property
+    def roots(self) -> memoryview:
+        """Read-only view of the root column, `NO_ROOT` where there is none"""
+        return self._roots.toreadonly()
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the columns viewed by this table"""
+        return self._masks.nbytes + self._roots.nbytes + self._name_ids.nbytes
+
+    def _select(self, selectors: Iterable[bool]) -> ScaleTable:
+        """Copy the rows where `selectors` is true into a new compact table"""
+        selected = list(compress(range(len(self)), selectors))
+        return ScaleTable(
+            memoryview(
+                array(self._masks.format, map(self._masks.__getitem__, selected))
+            ),
+            memoryview(array("b", map(self._roots.__getitem__, selected))),
+            memoryview(array("i", map(self._name_ids.__getitem__, selected))),
+            self._names,
+            octave=self.octave,
+        )
+
+    def with_note_count(self, count: int) -> ScaleTable:
+        return self._select(c == count for c in map(int.bit_count, self._masks))
+
+    def containing(self, intervals: Iterable[Interval]) -> ScaleTable:
+        """Scales containing all of the given intervals above their root"""
+        subset = 0
+        for interval in intervals:
+            subset |= 1 << (interval.half_steps % self.octave)
+        return self._select(mask & subset == subset for mask in self._masks)
+
+    def with_interval(self, interval: Interval) -> ScaleTable:
+        """Scales with at least one pair of notes `interval` apart"""
+        steps = interval.half_steps % self.octave
+        if steps == 0:
+            return self._select(mask != 0 for mask in self._masks)
+        full = (1 << self.octave) - 1
+        down = self.octave - steps
+        return self._select(
+            mask & ((mask << steps | mask >> down) & full) != 0 for mask in self._masks
+        )
+
+    def with_root(self, root: OctavePitch) -> ScaleTable:
+        return self._select(r == root.half_steps for r in self._roots)
+
+    def named(self, name: str) -> ScaleTable:
+        if name not in self._names:
+            return self._select(())
+        name_id = self._names.index(name)
+        return self._select(i == name_id for i in self._name_ids)
@@ -0,0 +1,437 @@
+"""Local HTTP service for `index.html` and the fretboard data it draws.
+
+    python -m music_tools.server [--port 8000] [--index index.html] [-j 4]
+
+serves the page at / and its data at
+
+    /api/fretboard?tuning=EADGBE&frets=12&root=A&scale=Dorian&chord=A,C,E
+
+as `{"totalFrets", "tuning", "annotations"}` (see example.json), with one
+annotation layer for the scale and one for the chord. Responses are built in
+an executor, so the event loop keeps accepting connections, and kept in an LRU
+cache keyed by the normalized query. Identical requests arriving while a
+response is being built wait for that build rather than starting another one.
+Every response carries an ETag, and a matching If-None-Match gets a 304."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from http import HTTPStatus
+from itertools import chain
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from .guitar import (
+    Fretboard,
+    FretboardAnnotation,
+    FretboardLocation,
+    FretIndex,
+    String,
+    StringIndex,
+    visit_frets,
+    visit_strings,
+)
+from .note import closest_sharp
+from .pitch import Pitch
+from .query import RequestError, fretboard_by_name, parse_note, parse_scale
+
+MAX_FRETS = 36
+MAX_REQUEST_BODY = 64 * 1024
+"""Request bodies are read and discarded, up to this many bytes"""
+
+logger = logging.getLogger(__name__)
+
+FretboardData = dict[str, Any]
+"""`{"totalFrets": int, "tuning": [note, ...], "annotations": [layer, ...]}`
+where tuning is lowest string first, and each layer is a list of
+`[string, fret, text]` with string 0 the lowest string, as index.html expects"""
+
+
+def fretboard_data(
+    fretboard: Fretboard,
+    frets: int,
+    annotation_layers: Sequence[FretboardAnnotation[str]] = (),
+) -> FretboardData:
+    num_strings = len(fretboard.strings)
+
+    def string_visitor(
+        _fretboard: Fretboard, string: String, string_index: StringIndex
+    ) -> list[FretboardLocation]:
+        def fret_visitor(
+            _string: String, pitch: Pitch, fret_index: FretIndex
+        ) -> FretboardLocation:
+            return (string_index, fret_index, pitch)
+
+        return list(visit_frets(string, frets, fret_visitor))
+
+    locations: list[FretboardLocation] = list(
+        chain.from_iterable(visit_strings(fretboard, string_visitor))
+    )
+    layers = [
+        sorted(
+            [num_strings - string_index, fret, text]
+            for string_index, fret, pitch in locations
+            if (text := annotation((string_index, fret, pitch))) is not None
+        )
+        for annotation in annotation_layers
+    ]
+    return {
+        "totalFrets": frets,
+        "tuning": [
+            str(closest_sharp(string.open_pitch.to_octave()[1]))
+            for string in reversed(fretboard.strings)
+        ],
+        "annotations": layers,
+    }
+
+
+def _note_names_layer(pitch_classes: dict[int, str]) -> FretboardAnnotation[str]:
+    def annotation(loc: FretboardLocation) -> str | None:
+        return pitch_classes.get(loc[2].half_steps % 12)
+
+    return annotation
+
+
+@dataclass(frozen=True)
+class FretboardQuery:
+    """Normalized parameters of a fretboard request, usable as a cache key"""
+
+    tuning: str = "EADGBE"
+    frets: int = 12
+    root: str | None = None
+    scale: str | None = None
+    chord: tuple[str, ...] = ()
+
+    @staticmethod
+    def from_query_string(query: str) -> FretboardQuery:
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        try:
+            frets = int(params.get("frets", 12))
+        except ValueError:
+            raise RequestError(f"not a fret count: {params['frets']!r}") from None
+        if not 0 < frets <= MAX_FRETS:
+            raise RequestError(f"frets must be between 1 and {MAX_FRETS}")
+        scale = params.get("scale")
+        if scale is not None and "root" not in params:
+            raise RequestError("a scale needs a root")
+        chord = tuple(note for note in params.get("chord", "").split(",") if note)
+        return FretboardQuery(
+            tuning=params.get("tuning", "EADGBE"),
+            frets=frets,
+            root=params.get("root"),
+            scale=scale,
+            chord=chord,
+        )
+
+    def build(self) -> FretboardData:
+        layers = []
+        if self.root is not None and self.scale is not None:
+            root = parse_note(self.root).to_octave_pitch()
+            layers.append(
+                _note_names_layer(
+                    {
+                        (root + interval).half_steps: str(
+                            closest_sharp(root + interval)
+                        )
+                        for interval in parse_scale(self.scale)
+                    }
+                )
+            )
+        if self.chord:
+            chord_tones = [parse_note(note) for note in self.chord]
+            layers.append(
+                _note_names_layer(
+                    {
+                        note.to_octave_pitch().half_steps: str(note)
+                        for note in chord_tones
+                    }
+                )
+            )
+        return fretboard_data(fretboard_by_name(self.tuning), self.frets, layers)
+
+
+@dataclass(frozen=True)
+class Response:
+    status: HTTPStatus
+    body: bytes
+    content_type: str = "application/json"
+    etag: str | None = None
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def _json_response(status: HTTPStatus, value: object) -> Response:
+    body = json.dumps(value, ensure_ascii=False).encode()
+    return Response(status, body, etag=_etag(body))
+
+
+def build_fretboard_response(query: FretboardQuery) -> Response:
+    """Build the response for a query. Runs in the executor, so it must be
+    picklable for a process pool"""
+    try:
+        return _json_response(HTTPStatus.OK, query.build())
+    except RequestError as e:
+        return _json_response(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+
+
+class ResponseCache:
+    """LRU cache of built responses, which also deduplicates builds in flight"""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[FretboardQuery, Response] = OrderedDict()
+        self._building: dict[FretboardQuery, asyncio.Future[Response]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, query: FretboardQuery, executor: Executor | None) -> Response:
+        response = self._entries.get(query)
+        if response is not None:
+            self.hits += 1
+            self._entries.move_to_end(query)
+            return response
+
+        building = self._building.get(query)
+        if building is not None:
+            self.hits += 1
+            return await asyncio.shield(building)
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        building = asyncio.ensure_future(
+            loop.run_in_executor(executor, build_fretboard_response, query)
+        )
+        self._building[query] = building
+        try:
+            response = await asyncio.shield(building)
+        finally:
+            del self._building[query]
+        self._entries[query] = response
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return response
+
+
+class FretboardServer:
+    def __init__(
+        self,
+        index_html: bytes,
+        *,
+        executor: Executor | None = None,
+        cache_size: int = 1024,
+    ) -> None:
+        self.index = Response(
+            HTTPStatus.OK, index_html, "text/html; charset=utf-8", _etag(index_html)
+        )
+        self.executor = executor
+        self.cache = ResponseCache(cache_size)
+
+    async def respond(self, method: str, target: str) -> Response:
+        if method != "GET":
+            return _json_response(
+                HTTPStatus.METHOD_NOT_ALLOWED, {"error": "only GET is supported"}
+            )
+        url = urlsplit(target)
+        if url.path in ("/", "/index.html"):
+            return self.index
+        if url.path == "/api/fretboard":
+            try:
+                query = FretboardQuery.from_query_string(url.query)
+            except RequestError as e:
+                return _json_response(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return await self.cache.get(query, self.executor)
+        return _json_response(
+            HTTPStatus.NOT_FOUND, {"error": f"no such path: {url.path}"}
+        )
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    headers = await _read_headers(reader)
+                except ValueError:
+                    # A line longer than the stream's limit
+                    writer.write(
+                        _serialize(
+                            _json_response(
+                                HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                {"error": "request line or header too long"},
+                            ),
+                            keep_alive=False,
+                        )
+                    )
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    writer.write(
+                        _serialize(
+                            _json_response(
+                                HTTPStatus.BAD_REQUEST,
+                                {"error": "malformed request line"},
+                            ),
+                            keep_alive=False,
+                        )
+                    )
+                    break
+
+                # Skip any body, so the next request starts where expected
+                body_error = await _discard_body(reader, headers)
+                if body_error is not None:
+                    writer.write(_serialize(body_error, keep_alive=False))
+                    break
+
+                try:
+                    response = await self.respond(method, target)
+                except Exception:
+                    # A bug, rather than a bad request
+                    logger.exception("error handling %s %s", method, target)
+                    response = _json_response(
+                        HTTPStatus.INTERNAL_SERVER_ERROR,
+                        {"error": "internal server error"},
+                    )
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                if (
+                    response.etag is not None
+                    and headers.get("if-none-match") == response.etag
+                ):
+                    response = Response(
+                        HTTPStatus.NOT_MODIFIED,
+                        b"",
+                        response.content_type,
+                        response.etag,
+                    )
+                writer.write(_serialize(response, keep_alive=keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (
+            ConnectionError,
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+        ):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> asyncio.Server:
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+async def _discard_body(
+    reader: asyncio.StreamReader, headers: dict[str, str]
+) -> Response | None:
+    """Read the request body, if any, or return the error response to close
+    the connection with if it cannot be skipped"""
+    if "transfer-encoding" in headers:
+        return _json_response(
+            HTTPStatus.LENGTH_REQUIRED, {"error": "a body needs a Content-Length"}
+        )
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        length = -1
+    if length < 0:
+        return _json_response(
+            HTTPStatus.BAD_REQUEST, {"error": "malformed Content-Length"}
+        )
+    if length > MAX_REQUEST_BODY:
+        return _json_response(
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "request body too large"}
+        )
+    await reader.readexactly(length)
+    return None
+
+
+def _serialize(response: Response, *, keep_alive: bool) -> bytes:
+    lines = [
+        f"HTTP/1.1 {response.status.value} {response.status.phrase}",
+        f"Content-Type: {response.content_type}",
+        f"Content-Length: {len(response.body)}",
+        "Cache-Control: no-cache",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    if response.etag is not None:
+        lines.append(f"ETag: {response.etag}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + response.body
+
+
+async def _serve_forever(args: argparse.Namespace) -> None:
+    executor: Executor | None = None
+    if args.workers:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=args.workers)
+
+    server = FretboardServer(
+        Path(args.index).read_bytes(), executor=executor, cache_size=args.cache_size
+    )
+    listener = await server.serve(args.host, args.port)
+    address = listener.sockets[0].getsockname()
+    print(f"Serving on http://{address[0]}:{address[1]}/", file=sys.stderr)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="music-tools-serve", description="Serve index.html and fretboard data"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--index", default="index.html", help="page served at /")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=0,
+        help="worker processes building responses, 0 for a thread pool (default)",
+    )
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
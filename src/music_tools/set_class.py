@@ -0,0 +1,236 @@
+"""Pitch class set theory: normal form, prime form, interval-class vectors,
+Z-relations and Forte names.
+
+There are only 4096 pitch class sets, so every answer is looked up in a table
+built once on first use, instead of searching rotations and inversions on each
+call. Prime and normal forms follow Rahn's convention (most packed to the
+right), which is the numerically smallest mask of all candidates."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cache
+
+from .pitch import Interval, OctavePitch
+from .scale import (
+    PitchClassMask,
+    PitchClassSet,
+    Scale,
+    as_mask,
+    scale_to_mask,
+    transpose_mask,
+)
+
+IntervalVector = tuple[int, int, int, int, int, int]
+"""Number of occurrences of each interval class 1 to 6"""
+
+# Representative of every set class of 3 to 6 pitch classes, in Forte's order.
+# "Z" marks sets sharing their interval vector with another set class.
+# Names of 7 to 9 pitch class sets follow from complements.
+_FORTE_ORDER: dict[int, str] = {
+    3: "012 013 014 015 016 024 025 026 027 036 037 048",
+    4: (
+        "0123 0124 0134 0125 0126 0127 0145 0156 0167 0235 0135 0236 0136 0237 "
+        "Z0146 0157 0347 0147 0148 0158 0246 0247 0257 0248 0268 0358 0258 0369 "
+        "Z0137"
+    ),
+    5: (
+        "01234 01235 01245 01236 01237 01256 01267 02346 01246 01346 02347 "
+        "Z01356 01248 01257 01268 01347 Z01348 Z01457 01367 01568 01458 01478 "
+        "02357 01357 02358 02458 01358 02368 01368 01468 01369 01469 02468 02469 "
+        "02479 Z01247 Z03458 Z01258"
+    ),
+    6: (
+        "012345 012346 Z012356 Z012456 012367 Z012567 012678 023457 012357 "
+        "Z013457 Z012457 Z012467 Z013467 013458 012458 014568 Z012478 012578 "
+        "Z013478 014589 023468 012468 Z023568 Z013468 Z013568 Z013578 013469 "
+        "Z013569 Z023679 013679 014579 024579 023579 013579 02468T Z012347 "
+        "Z012348 Z012378 Z023458 Z012358 Z012368 Z012369 Z012568 Z012569 "
+        "Z023469 Z012469 Z012479 Z012579 Z013479 Z014679"
+    ),
+}
+
+_ALL = PitchClassMask(0xFFF)
+
+
+@dataclass(frozen=True)
+class SetClass:
+    """A set class: all pitch class sets equivalent under transposition and
+    inversion"""
+
+    forte_name: str
+    prime_form: tuple[int, ...]
+    interval_vector: IntervalVector
+
+    @property
+    def cardinality(self) -> int:
+        return len(self.prime_form)
+
+    @property
+    def is_z(self) -> bool:
+        return "Z" in self.forte_name
+
+    def to_scale(self) -> Scale:
+        return Scale(tuple(map(Interval, self.prime_form)))
+
+    def __repr__(self) -> str:
+        pcs = "".join("TE"[pc - 10] if pc >= 10 else str(pc) for pc in self.prime_form)
+        return f"{self.forte_name} [{pcs}]"
+
+
+def _mask_from_text(text: str) -> PitchClassMask:
+    return scale_to_mask(Interval({"T": 10, "E": 11}.get(c) or int(c)) for c in text)
+
+
+def _invert_mask(mask: PitchClassMask) -> PitchClassMask:
+    return scale_to_mask(OctavePitch(-i) for i in range(12) if mask >> i & 1)
+
+
+def _pitch_classes(mask: PitchClassMask) -> tuple[int, ...]:
+    return tuple(i for i in range(12) if mask >> i & 1)
+
+
+def _most_packed_rotation(mask: PitchClassMask) -> tuple[PitchClassMask, int]:
+    """Transposition of the set down to 0 that is most packed to the right,
+    and the pitch class it starts from"""
+    return min(
+        ((transpose_mask(mask, -pc), pc) for pc in _pitch_classes(mask)),
+        default=(mask, 0),
+    )
+
+
+def _prime_mask(mask: PitchClassMask) -> PitchClassMask:
+    return min(
+        _most_packed_rotation(mask)[0], _most_packed_rotation(_invert_mask(mask))[0]
+    )
+
+
+def _interval_vector(mask: PitchClassMask) -> IntervalVector:
+    vector = [0] * 6
+    pcs = _pitch_classes(mask)
+    for i, low in enumerate(pcs):
+        for high in pcs[i + 1 :]:
+            interval_class = min(high - low, 12 - (high - low))
+            vector[interval_class - 1] += 1
+    return (vector[0], vector[1], vector[2], vector[3], vector[4], vector[5])
+
+
+def _forte_names() -> dict[PitchClassMask, str]:
+    """Forte name of every prime form"""
+    names: dict[PitchClassMask, str] = {}
+
+    def add(cardinality: int, index: int, z: bool, prime: PitchClassMask) -> None:
+        names[prime] = f"{cardinality}-{'Z' if z else ''}{index}"
+
+    for cardinality, order in _FORTE_ORDER.items():
+        for index, entry in enumerate(order.split(), 1):
+            prime = _prime_mask(_mask_from_text(entry.lstrip("Z")))
+            add(cardinality, index, entry.startswith("Z"), prime)
+            if cardinality < 6:
+                complement = _prime_mask(PitchClassMask(_ALL & ~prime))
+                add(12 - cardinality, index, entry.startswith("Z"), complement)
+
+    # Trivial sets: the empty set, single notes, dyads named by interval class
+    # and their complements
+    add(0, 1, False, PitchClassMask(0))
+    add(12, 1, False, _ALL)
+    add(1, 1, False, PitchClassMask(1))
+    add(11, 1, False, PitchClassMask(_ALL & ~(1 << 11)))
+    for interval_class in range(1, 7):
+        dyad = PitchClassMask(1 | 1 << interval_class)
+        add(2, interval_class, False, dyad)
+        add(10, interval_class, False, _prime_mask(PitchClassMask(_ALL & ~dyad)))
+
+    return names
+
+
+@dataclass(frozen=True)
+class _SetClassTable:
+    normal_form_start: tuple[int, ...]
+    """For each mask, the pitch class its normal form starts on"""
+    set_class_index: tuple[int, ...]
+    """For each mask, index into set_classes"""
+    set_classes: tuple[SetClass, ...]
+    z_partner: tuple[int, ...]
+    """For each set class, index of its Z-related set class, or -1"""
+
+
+@cache
+def _table() -> _SetClassTable:
+    forte_names = _forte_names()
+
+    primes: dict[PitchClassMask, int] = {}
+    set_classes: list[SetClass] = []
+    normal_form_start: list[int] = []
+    set_class_index: list[int] = []
+
+    for m in range(4096):
+        mask = PitchClassMask(m)
+        _, start = _most_packed_rotation(mask)
+        prime = _prime_mask(mask)
+        if prime not in primes:
+            primes[prime] = len(set_classes)
+            set_classes.append(
+                SetClass(
+                    forte_names[prime], _pitch_classes(prime), _interval_vector(prime)
+                )
+            )
+        normal_form_start.append(start)
+        set_class_index.append(primes[prime])
+
+    by_vector: dict[tuple[int, IntervalVector], list[int]] = {}
+    for i, cls in enumerate(set_classes):
+        key = (cls.cardinality, cls.interval_vector)
+        by_vector.setdefault(key, []).append(i)
+
+    z_partner = [-1] * len(set_classes)
+    for group in by_vector.values():
+        # The Z-relation pairs set classes; no interval vector is shared by
+        # more than two set classes
+        assert len(group) <= 2
+        if len(group) == 2:
+            z_partner[group[0]], z_partner[group[1]] = group[1], group[0]
+
+    return _SetClassTable(
+        tuple(normal_form_start),
+        tuple(set_class_index),
+        tuple(set_classes),
+        tuple(z_partner),
+    )
+
+
+def set_class(pcs: PitchClassSet) -> SetClass:
+    table = _table()
+    return table.set_classes[table.set_class_index[as_mask(pcs)]]
+
+
+def all_set_classes() -> tuple[SetClass, ...]:
+    """Every set class, ordered by the smallest pitch class set belonging to it"""
+    return _table().set_classes
+
+
+def normal_form(pcs: PitchClassSet) -> tuple[OctavePitch, ...]:
+    """The pitch classes of a set in their most compact ordering"""
+    mask = as_mask(pcs)
+    start = _table().normal_form_start[mask]
+    rotation = transpose_mask(mask, -start)
+    return tuple(OctavePitch(start + pc) for pc in _pitch_classes(rotation))
+
+
+def prime_form(pcs: PitchClassSet) -> Scale:
+    return set_class(pcs).to_scale()
+
+
+def interval_vector(pcs: PitchClassSet) -> IntervalVector:
+    return set_class(pcs).interval_vector
+
+
+def forte_name(pcs: PitchClassSet) -> str:
+    return set_class(pcs).forte_name
+
+
+def z_related(pcs: PitchClassSet) -> SetClass | None:
+    """The other set class with the same interval vector, if there is one"""
+    table = _table()
+    partner = table.z_partner[table.set_class_index[as_mask(pcs)]]
+    return table.set_classes[partner] if partner >= 0 else None
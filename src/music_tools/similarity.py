@@ -0,0 +1,218 @@
+"""Nearest-scale search: which known scales, in any transposition, are closest
+to a set of pitch classes.
+
+Catalogue entries are deduplicated by pitch class mask and bucketed by note
+count. The difference in note count is a lower bound on both distances, so a
+query visits buckets in order of that bound and stops as soon as no remaining
+bucket can beat its current top-k. Only 4096 queries are possible, so results
+are also memoized per index."""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from enum import Enum
+
+from .mode import scale_modes
+from .note import Note, closest_sharp
+from .pitch import OctavePitch
+from .scale import (
+    PitchClassMask,
+    PitchClassSet,
+    Scale,
+    as_mask,
+    gen_conventional_scales,
+    scale_to_mask,
+    transpose_mask,
+)
+
+
+class Metric(Enum):
+    Hamming = "hamming"
+    """Number of pitch classes in one set but not the other"""
+    VoiceLeading = "voice-leading"
+    """Total half-steps the notes of one set move to reach the other"""
+
+
+@dataclass(frozen=True)
+class ScaleMatch:
+    name: str
+    root: Note
+    scale: Scale
+    distance: int
+
+
+def _pitch_classes(mask: PitchClassMask) -> list[int]:
+    return [i for i in range(12) if mask >> i & 1]
+
+
+def _circular_distance(a: int, b: int) -> int:
+    d = abs(a - b) % 12
+    return min(d, 12 - d)
+
+
+def hamming_distance(a: PitchClassMask, b: PitchClassMask) -> int:
+    return (a ^ b).bit_count()
+
+
+def voice_leading_distance(a: PitchClassMask, b: PitchClassMask) -> int:
+    """Smallest total movement, in half-steps, taking one set to the other.
+
+    Sets of equal size are matched one to one, trying every cyclic alignment of
+    the sorted pitch classes. Sets of different sizes have to double some
+    voices, so every note instead moves to its nearest note in the other set,
+    in both directions."""
+    a_pcs = _pitch_classes(a)
+    b_pcs = _pitch_classes(b)
+    if not a_pcs or not b_pcs:
+        return 0 if a_pcs == b_pcs else 6 * max(len(a_pcs), len(b_pcs))
+
+    if len(a_pcs) == len(b_pcs):
+        size = len(a_pcs)
+        return min(
+            sum(
+                _circular_distance(a_pcs[i], b_pcs[(i + shift) % size])
+                for i in range(size)
+            )
+            for shift in range(size)
+        )
+
+    def nearest(src: list[int], dst: list[int]) -> int:
+        return sum(min(_circular_distance(x, y) for y in dst) for x in src)
+
+    return nearest(a_pcs, b_pcs) + nearest(b_pcs, a_pcs)
+
+
+def _voice_leading_lower_bound(a: PitchClassMask, b: PitchClassMask) -> int:
+    """Every note in only one of the sets moves at least a half-step. Sets of
+    equal size pair those notes up, so only half of them count"""
+    different = hamming_distance(a, b)
+    return different // 2 if a.bit_count() == b.bit_count() else different
+
+
+_Distance = Callable[[PitchClassMask, PitchClassMask], int]
+
+_DISTANCES: dict[Metric, tuple[_Distance, _Distance]] = {
+    Metric.Hamming: (hamming_distance, hamming_distance),
+    Metric.VoiceLeading: (voice_leading_distance, _voice_leading_lower_bound),
+}
+"""Distance function and a cheaper lower bound of it, for each metric"""
+
+
+def default_catalogue() -> Iterator[tuple[str, Scale]]:
+    """Named scales and all of their modes, then every conventional scale.
+    Modes without a name of their own are called e.g. "Harmonic Minor mode 5"
+    and generated scales are called by their scale degrees."""
+    from .mode import major_scale_modes_by_name
+    from .scale import name_to_scale
+
+    mode_names = {scale: name for name, scale in major_scale_modes_by_name.items()}
+    for name, scale in name_to_scale.items():
+        yield name, scale
+        for i, mode in enumerate(scale_modes(scale)):
+            yield mode_names.get(mode, f"{name} mode {i + 1}"), mode
+    for scale in gen_conventional_scales():
+        yield str(scale), scale
+
+
+@dataclass(frozen=True)
+class _Entry:
+    order: int
+    name: str
+    root: OctavePitch
+    scale: Scale
+
+
+@dataclass
+class ScaleIndex:
+    """Top-k nearest scale search over a catalogue in all 12 transpositions"""
+
+    entries_by_mask: dict[PitchClassMask, list[_Entry]]
+    """Catalogue entries sharing each mask, in catalogue order"""
+    buckets: dict[int, list[PitchClassMask]]
+    """Distinct masks, by number of pitch classes"""
+    _order: dict[PitchClassMask, int] = field(default_factory=dict)
+    _results: dict[tuple[PitchClassMask, int, Metric], list[ScaleMatch]] = field(
+        default_factory=dict
+    )
+
+    @staticmethod
+    def build(catalogue: Iterable[tuple[str, Scale]] | None = None) -> ScaleIndex:
+        entries_by_mask: dict[PitchClassMask, list[_Entry]] = {}
+        seen: set[tuple[Scale, OctavePitch]] = set()
+        for name, scale in default_catalogue() if catalogue is None else catalogue:
+            scale_mask = scale_to_mask(scale)
+            for root in map(OctavePitch, range(12)):
+                if (scale, root) in seen:
+                    continue
+                seen.add((scale, root))
+                mask = transpose_mask(scale_mask, root.half_steps)
+                entry = _Entry(len(seen), name, root, scale)
+                entries_by_mask.setdefault(mask, []).append(entry)
+
+        buckets: dict[int, list[PitchClassMask]] = {}
+        for mask in entries_by_mask:
+            buckets.setdefault(mask.bit_count(), []).append(mask)
+
+        index = ScaleIndex(entries_by_mask, buckets)
+        index._order = {mask: e[0].order for mask, e in entries_by_mask.items()}
+        return index
+
+    def __len__(self) -> int:
+        return sum(map(len, self.entries_by_mask.values()))
+
+    def nearest(
+        self,
+        pcs: PitchClassSet,
+        k: int = 5,
+        metric: Metric = Metric.Hamming,
+    ) -> list[ScaleMatch]:
+        """The k catalogue scales closest to a pitch class set. Ties are broken
+        by catalogue order, so results match an exhaustive search exactly."""
+        if k < 1:
+            raise ValueError(f"k must be at least 1, not {k}")
+        query = as_mask(pcs)
+        key = (query, k, metric)
+        if key not in self._results:
+            self._results[key] = self._search(query, k, metric)
+        return self._results[key]
+
+    def _search(
+        self, query: PitchClassMask, k: int, metric: Metric
+    ) -> list[ScaleMatch]:
+        distance, lower_bound = _DISTANCES[metric]
+        size = query.bit_count()
+
+        # Heap of the best k masks so far, worst on top, ranked by distance
+        # then by their first catalogue entry. Every entry of a mask outside
+        # the top k comes after the first entries of all k masks in it, so the
+        # top k entries are all found among those masks.
+        best: list[tuple[int, int, PitchClassMask]] = []
+
+        for bound in range(13):
+            if len(best) == k and -best[0][0] < bound:
+                break
+            for bucket_size in {size - bound, size + bound}:
+                for mask in self.buckets.get(bucket_size, ()):
+                    order = self._order[mask]
+                    if (
+                        len(best) == k
+                        and (-lower_bound(query, mask), -order) < best[0][:2]
+                    ):
+                        continue
+                    item = (-distance(query, mask), -order, mask)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+
+        ranked = sorted(
+            (-d, entry.order, entry)
+            for d, _, mask in best
+            for entry in self.entries_by_mask[mask]
+        )
+        return [
+            ScaleMatch(entry.name, closest_sharp(entry.root), entry.scale, d)
+            for d, _, entry in ranked[:k]
+        ]
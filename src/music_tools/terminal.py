@@ -0,0 +1,165 @@
+"""Incremental rendering of a fretboard to an ANSI terminal.
+
+`render_fretboard_ascii` builds the whole board as one string. When the
+annotations change many times a second (e.g. stepping through keys and
+modes), `IncrementalFretboardRenderer` instead keeps the previous frame and
+emits only cursor moves and the annotation cells that changed. The layout is
+the same as `render_fretboard_ascii`, and annotations are expected to be one
+visible character wide, optionally wrapped in `TermColor` escapes."""
+
+from __future__ import annotations
+
+from . import instrument
+from .guitar import (
+    Fretboard,
+    FretboardAnnotation,
+    FretboardLocation,
+    FretIndex,
+    StringIndex,
+    make_fret_footer,
+)
+from .note import closest_sharp
+
+
+class TermColor:
+    HEADER = "\033[95m"
+    RED = "\033[91m"
+    GREEN = "\033[92m"
+    YELLOW = "\033[93m"
+    ORANGE = "\033[38:5:214m"
+    BLUE = "\033[94m"
+    MAGENTA = "\033[95m"
+    CYAN = "\033[96m"
+    ENDC = "\033[0m"
+    BOLD = "\033[1m"
+    UNDERLINE = "\033[4m"
+
+
+COLOR_GRADIENT = [
+    TermColor.BOLD,
+    TermColor.GREEN,
+    TermColor.CYAN,
+    TermColor.BLUE,
+    TermColor.MAGENTA,
+    TermColor.RED,
+    TermColor.ORANGE,
+    TermColor.YELLOW,
+]
+
+
+def move_cursor(row: int, column: int) -> str:
+    """Escape sequence moving the cursor to a 1-based row and column"""
+    return f"\033[{row};{column}H"
+
+
+CLEAR_TO_END_OF_LINE = "\033[K"
+
+
+class IncrementalFretboardRenderer:
+    """Renders successive frames of annotations on one fretboard, each frame
+    as the escape sequence that updates the terminal from the previous one.
+    The board is drawn with its first line at row `top`, column `left`."""
+
+    def __init__(
+        self, fretboard: Fretboard, frets: int, *, top: int = 1, left: int = 1
+    ) -> None:
+        self.fretboard = fretboard
+        self.frets = frets
+        self.top = top
+        self.left = left
+        self._locations: list[tuple[FretboardLocation, str]] = [
+            (
+                (StringIndex(string_index), FretIndex(fret), string[fret]),
+                " " if fret == 0 else "-",
+            )
+            for string_index, string in enumerate(fretboard.strings, 1)
+            for fret in range(frets + 1)
+        ]
+        self._num_layers: int | None = None
+        self._cells: list[str] = []
+        self._positions: list[tuple[int, int]] = []
+
+    def invalidate(self) -> None:
+        """Redraw the whole board on the next frame, e.g. after the terminal
+        was cleared or resized"""
+        self._num_layers = None
+
+    def _layout(self, num_layers: int) -> list[tuple[int, int]]:
+        """Terminal (row, column) of every annotation cell, in the order of
+        `_cells`"""
+        left_padding = 1 if num_layers < 3 else 0
+        right_padding = 1 if num_layers < 2 else 0
+        fret_width = left_padding + num_layers + right_padding + 1
+        positions: list[tuple[int, int]] = []
+        for row in range(self.top, self.top + len(self.fretboard.strings)):
+            column = self.left + 3  # open string note label
+            for _fret in range(self.frets + 1):
+                first = column + left_padding
+                positions.extend((row, first + layer) for layer in range(num_layers))
+                column += fret_width
+        return positions
+
+    def _render_cells(
+        self, annotation_layers: list[FretboardAnnotation[str]]
+    ) -> list[str]:
+        if instrument.enabled():
+            annotation_layers = [
+                instrument.wrap("guitar.annotation", annotation)
+                for annotation in annotation_layers
+            ]
+        return [
+            annotation(loc) or padding
+            for loc, padding in self._locations
+            for annotation in annotation_layers
+        ]
+
+    def _full_frame(self, cells: list[str], num_layers: int) -> str:
+        left_padding = 1 if num_layers < 3 else 0
+        right_padding = 1 if num_layers < 2 else 0
+        per_string = (self.frets + 1) * num_layers
+        lines = []
+        for string_index, string in enumerate(self.fretboard.strings):
+            label = str(closest_sharp(string.open_pitch.to_octave()[1])).ljust(2)
+            segments = [f"{label} "]
+            string_cells = cells[string_index * per_string :][:per_string]
+            for fret in range(self.frets + 1):
+                padding = " " if fret == 0 else "-"
+                fret_cells = string_cells[fret * num_layers : (fret + 1) * num_layers]
+                segments.append(
+                    f"{padding * left_padding}{''.join(fret_cells)}"
+                    f"{padding * right_padding}|"
+                )
+            lines.append("".join(segments))
+        lines.append(make_fret_footer(self.frets, num_layers))
+        return "".join(
+            f"{move_cursor(self.top + row, self.left)}{line}{CLEAR_TO_END_OF_LINE}"
+            for row, line in enumerate(lines)
+        )
+
+    def render(self, annotation_layers: list[FretboardAnnotation[str]]) -> str:
+        """Escape sequence drawing this frame over the previous one. Empty if
+        nothing changed. The cursor is left on the line below the board."""
+        cells = self._render_cells(annotation_layers)
+        num_layers = len(annotation_layers)
+        below_board = move_cursor(self.top + len(self.fretboard.strings) + 1, 1)
+
+        if num_layers != self._num_layers:
+            self._num_layers = num_layers
+            self._positions = self._layout(num_layers)
+            self._cells = cells
+            return self._full_frame(cells, num_layers) + below_board
+
+        updates = []
+        cursor = None
+        for position, previous, cell in zip(self._positions, self._cells, cells):
+            if previous == cell:
+                continue
+            if position != cursor:
+                updates.append(move_cursor(*position))
+            updates.append(cell)
+            cursor = (position[0], position[1] + 1)
+        self._cells = cells
+        if not updates:
+            return ""
+        updates.append(below_board)
+        return "".join(updates)
@@ -0,0 +1,297 @@
+"""Equal divisions of the octave (EDO), e.g. 19-, 24- or 31-EDO.
+
+The rest of music_tools is specialized to 12-EDO: `OctavePitch`, note names,
+`PitchClassMask` and the scale catalogues assume 12 half-steps per octave,
+and stay that way so the common case stays fast. A `TuningSystem` provides
+the same operations for any number of divisions, where an `Interval` or a
+`Pitch` counts steps of the system instead of half-steps. `visit_frets`
+steps one fret at a time, so a `Fretboard` with a fret per step lays out as
+usual, but the 12-EDO note names used elsewhere do not apply: label
+fretboards with `TuningSystem.render_fretboard_ascii` and
+`TuningSystem.compile_pitch_classes` instead.
+
+Tables (pitch class names, scale catalogues, fretboard grids) are built on
+first use and cached per system. `edo(n)` always returns the same system
+for the same n, so every user of a system shares them."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from functools import cache, cached_property, lru_cache
+from math import log2
+
+from .guitar import CompiledAnnotation, Fretboard, FretboardAnnotation
+from .pitch import Interval, Octave, Pitch
+from .scale import PitchClassMask, Scale
+
+_LETTERS_BY_FIFTHS = "FCGDAEB"
+
+
+@cache
+def edo(divisions: int) -> TuningSystem:
+    """The tuning system dividing the octave into `divisions` equal steps"""
+    return TuningSystem(divisions)
+
+
+@dataclass(frozen=True)
+class TuningSystem:
+    divisions: int
+
+    def __post_init__(self) -> None:
+        if self.divisions < 5:
+            raise ValueError(
+                f"Too few divisions to approximate a fifth: {self.divisions}"
+            )
+
+    def steps(self, ratio: float) -> int:
+        """Steps closest to a frequency ratio, e.g. 3/2 for a fifth"""
+        return round(self.divisions * log2(ratio))
+
+    @property
+    def octave(self) -> Interval:
+        return Interval(self.divisions)
+
+    @cached_property
+    def fifth(self) -> Interval:
+        return Interval(self.steps(3 / 2))
+
+    @cached_property
+    def minor_third(self) -> Interval:
+        return Interval(self.steps(6 / 5))
+
+    @cached_property
+    def major_third(self) -> Interval:
+        return Interval(self.steps(5 / 4))
+
+    # Pitches and intervals
+
+    def pitch_class(self, steps: int) -> int:
+        return steps % self.divisions
+
+    def inside_octave(self, interval: Interval) -> Interval:
+        return Interval(interval.half_steps % self.divisions)
+
+    def to_octave(self, pitch: Pitch) -> tuple[Octave, int]:
+        """Octave and pitch class of a pitch"""
+        octave, pitch_class = divmod(pitch.half_steps, self.divisions)
+        return Octave(octave), pitch_class
+
+    def from_octave(self, octave: Octave, pitch_class: int) -> Pitch:
+        return Pitch(octave * self.divisions + pitch_class)
+
+    def from_twelve(self, half_steps: int) -> int:
+        """Pitch class of a 12-EDO pitch class, as the same position on the
+        circle of fifths, spelled from D♭ to F♯. Exact in systems whose fifth
+        is a multiple of the 12-EDO one, such as 24-EDO."""
+        fifths = (7 * half_steps + 5) % 12 - 5
+        return self.pitch_class(fifths * self.fifth.half_steps)
+
+    @cached_property
+    def _pitch_class_names(self) -> tuple[str, ...]:
+        """Names from the chain of fifths, with the fewest accidentals and
+        sharps before flats. Pitch classes off the chain (e.g. quarter tones
+        in 24-EDO) are named by raising the closest one below with ↑."""
+        spellings: dict[int, tuple[tuple[int, bool], str]] = {}
+        for fifths in range(-15, 20):
+            sharps = (fifths + 1) // 7
+            name = _LETTERS_BY_FIFTHS[(fifths + 1) % 7] + (
+                "♯" * sharps if sharps >= 0 else "♭" * -sharps
+            )
+            pitch_class = self.pitch_class(fifths * self.fifth.half_steps)
+            rank = (abs(sharps), sharps < 0)
+            if pitch_class not in spellings or rank < spellings[pitch_class][0]:
+                spellings[pitch_class] = rank, name
+
+        names = []
+        for pitch_class in range(self.divisions):
+            below = pitch_class
+            while below not in spellings:
+                below -= 1
+            names.append(spellings[below][1] + "↑" * (pitch_class - below))
+        return tuple(names)
+
+    def pitch_class_name(self, pitch_class: int) -> str:
+        return self._pitch_class_names[self.pitch_class(pitch_class)]
+
+    def pitch_name(self, pitch: Pitch) -> str:
+        octave, pitch_class = self.to_octave(pitch)
+        return f"{self.pitch_class_name(pitch_class)}{octave}"
+
+    def note_name(self, pitch: Pitch) -> str:
+        """Name of the pitch class of a pitch, without its octave"""
+        return self.pitch_class_name(pitch.half_steps)
+
+    def scale_name(self, scale: Scale) -> str:
+        """Notes of a scale from C, e.g. "C D E♭ F G A♭ B♭" """
+        return " ".join(self.pitch_class_name(i.half_steps) for i in scale)
+
+    # Scales and pitch class masks
+
+    def scale_from_intervals(self, intervals: Iterable[Interval]) -> Scale:
+        """Scale from the gaps between successive notes, see
+        `scale.scale_from_intervals`"""
+        scale_intervals: set[Interval] = {Interval(0)}
+        last_interval = Interval(0)
+        for interval in intervals:
+            last_interval = self.inside_octave(last_interval + interval)
+            scale_intervals.add(last_interval)
+        return Scale(tuple(sorted(scale_intervals)))
+
+    @cached_property
+    def full_mask(self) -> PitchClassMask:
+        return PitchClassMask((1 << self.divisions) - 1)
+
+    def scale_to_mask(self, scale: Iterable[Interval]) -> PitchClassMask:
+        """Mask with bit i set if the pitch class i steps above the root is
+        present, `divisions` bits wide"""
+        mask = 0
+        for interval in scale:
+            mask |= 1 << (interval.half_steps % self.divisions)
+        return PitchClassMask(mask)
+
+    def mask_to_scale(self, mask: PitchClassMask) -> Scale:
+        return Scale(tuple(Interval(i) for i in range(self.divisions) if mask >> i & 1))
+
+    def transpose_mask(self, mask: PitchClassMask, steps: int) -> PitchClassMask:
+        steps %= self.divisions
+        return PitchClassMask(
+            ((mask << steps) | (mask >> (self.divisions - steps))) & self.full_mask
+        )
+
+    def modes(self, scale: Scale) -> Iterator[Scale]:
+        """Every distinct mode of a scale, starting with the scale itself"""
+        mask = self.scale_to_mask(scale)
+        seen = set()
+        for interval in scale:
+            mode = self.transpose_mask(mask, -interval.half_steps)
+            if mode not in seen:
+                seen.add(mode)
+                yield self.mask_to_scale(mode)
+
+    @cached_property
+    def named_scales(self) -> Mapping[str, Scale]:
+        """The scales of `name_to_scale`, mapped with `from_twelve`"""
+        from .scale import name_to_scale
+
+        return {
+            name: Scale(
+                tuple(sorted(Interval(self.from_twelve(i.half_steps)) for i in scale))
+            )
+            for name, scale in name_to_scale.items()
+        }
+
+    @cached_property
+    def conventional_scales(self) -> tuple[Scale, ...]:
+        """Scales whose adjacent steps, including the step back up to the
+        octave, add up to the system's minor or major third, by number of
+        notes. 12-EDO keeps the catalogue of `gen_conventional_scales`, which
+        pairs the last step with the first one slightly differently."""
+        if self.divisions == 12:
+            from .scale import gen_conventional_scales
+
+            return tuple(gen_conventional_scales())
+        return self._scales_by_thirds()
+
+    def _scales_by_thirds(self) -> tuple[Scale, ...]:
+        thirds = {self.minor_third.half_steps, self.major_third.half_steps}
+        largest_step = max(thirds) - 1
+        scales: dict[Scale, None] = {}
+        fragments: list[tuple[int, ...]] = [
+            (step,) for step in range(1, largest_step + 1)
+        ]
+        while fragments:
+            extended: list[tuple[int, ...]] = []
+            for fragment in fragments:
+                total = sum(fragment)
+                if total == self.divisions:
+                    if fragment[-1] + fragment[0] in thirds and len(fragment) > 1:
+                        scale = self.scale_from_intervals(map(Interval, fragment))
+                        scales.setdefault(scale)
+                    continue
+                extended.extend(
+                    (*fragment, third - fragment[-1])
+                    for third in sorted(thirds)
+                    if 0
+                    < third - fragment[-1]
+                    <= min(largest_step, self.divisions - total)
+                )
+            fragments = extended
+        return tuple(scales)
+
+    @cached_property
+    def scale_catalogue(self) -> tuple[tuple[str, Scale], ...]:
+        """Named scales and their modes, then the conventional scales named
+        by their notes from C, as in `similarity.default_catalogue`"""
+        catalogue: list[tuple[str, Scale]] = []
+        for name, scale in self.named_scales.items():
+            for i, mode in enumerate(self.modes(scale)):
+                catalogue.append((name if i == 0 else f"{name} mode {i + 1}", mode))
+        catalogue.extend(
+            (self.scale_name(scale), scale) for scale in self.conventional_scales
+        )
+        return tuple(catalogue)
+
+    # Fretboards
+
+    def fretboard(self, tuning: Iterable[tuple[int, str]]) -> Fretboard:
+        """Fretboard with a fret per step, from (octave, 12-EDO note) pairs,
+        lowest string first, e.g. [(4, "E"), (4, "A"), ...]"""
+        from .note import n
+
+        return Fretboard.from_pitches(
+            self.from_octave(
+                Octave(octave), self.from_twelve(n(note).to_octave_pitch().half_steps)
+            )
+            for octave, note in tuning
+        )
+
+    @cached_property
+    def guitar(self) -> Fretboard:
+        """A guitar in standard tuning, with a fret per step"""
+        return self.fretboard(
+            [(4, "E"), (4, "A"), (5, "D"), (5, "G"), (5, "B"), (6, "E")]
+        )
+
+    def compile_pitch_classes(
+        self, fretboard: Fretboard, frets: int, labels: Mapping[int, str]
+    ) -> CompiledAnnotation:
+        """Label every occurrence of some pitch classes of the system, see
+        `guitar.compile_pitch_classes`"""
+        grid = self.fretboard_grid(fretboard, frets)
+        return CompiledAnnotation(
+            tuple(string.open_pitch.half_steps for string in fretboard.strings),
+            frets,
+            tuple(labels.get(pitch_class) for row in grid for pitch_class in row),
+        )
+
+    def render_fretboard_ascii(
+        self,
+        fretboard: Fretboard,
+        frets: int,
+        annotation_layers: Sequence[FretboardAnnotation[str]] = (),
+    ) -> str:
+        """`guitar.render_fretboard_ascii`, with open strings named in this
+        system"""
+        from .guitar import render_fretboard_ascii
+
+        return render_fretboard_ascii(
+            fretboard, frets, list(annotation_layers), note_name=self.note_name
+        )
+
+    def fretboard_grid(
+        self, fretboard: Fretboard, frets: int
+    ) -> tuple[tuple[int, ...], ...]:
+        """Pitch class at every fret of every string, first string first"""
+        tuning = tuple(string.open_pitch.half_steps for string in fretboard.strings)
+        return _fretboard_grid(self, tuning, frets)
+
+
+@lru_cache(maxsize=64)
+def _fretboard_grid(
+    system: TuningSystem, tuning: tuple[int, ...], frets: int
+) -> tuple[tuple[int, ...], ...]:
+    return tuple(
+        tuple(system.pitch_class(open_pitch + fret) for fret in range(frets + 1))
+        for open_pitch in tuning
+    )
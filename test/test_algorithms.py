@@ -1,4 +1,9 @@
-from music_tools.algorithms import SubsequenceSearcher
+import random
+from typing import Any
+
+import pytest
+
+from music_tools.algorithms import IntArraySubsequenceSearcher, SubsequenceSearcher
 
 
 def test_minor_pentatonic_in_major() -> None:
@@ -13,3 +18,63 @@ def test_minor_pentatonic_in_major() -> None:
     indices = list(searcher.find_subsequence_indices(subseq))
     # dorian, phrygian, aeolian - the minor modes
     assert indices == [1, 2, 5]
+
+
+def _random_steps(rng: random.Random, length: int, largest: int) -> list[int]:
+    return [rng.randint(1, largest) for _ in range(length)]
+
+
+def test_int_array_searcher_matches_generic() -> None:
+    pytest.importorskip("numpy")
+    rng = random.Random(0)
+    # Small steps are looked up in a table, large ones by binary search
+    for largest in (3, 100):
+        for length in range(1, 16):
+            sequence = _random_steps(rng, length, largest)
+            generic = SubsequenceSearcher(sequence)
+            searcher = IntArraySubsequenceSearcher(sequence)
+            patterns = [
+                _random_steps(rng, rng.randrange(0, 4), 2 * largest) for _ in range(20)
+            ]
+            # Also patterns that do occur, possibly wrapping around
+            for _ in range(5):
+                start = rng.randrange(length)
+                rotated = sequence[start:] + sequence[:start]
+                cuts = sorted(rng.sample(range(1, length + 1), min(length, 3)))
+                patterns.append([sum(rotated[a:b]) for a, b in zip([0, *cuts], cuts)])
+            expected = [list(generic.find_subsequence_indices(p)) for p in patterns]
+            assert [
+                list(found) for found in searcher.find_all_subsequence_indices(patterns)
+            ] == expected
+            assert list(searcher.find_subsequence_indices(patterns[0])) == expected[0]
+
+
+def test_int_array_searcher_large_sequence() -> None:
+    np = pytest.importorskip("numpy")
+    sequence = np.random.default_rng(0).integers(1, 4, size=200_000)
+    searcher = IntArraySubsequenceSearcher(sequence)
+
+    # Jumps over 2, 1 and 3 elements from known starting indices
+    starts = [0, 12_345, 199_998]
+    patterns = []
+    for start in starts:
+        rotated = np.roll(sequence, -start)
+        patterns.append([rotated[:2].sum(), rotated[2:3].sum(), rotated[3:6].sum()])
+    patterns.append([0])  # no jump is empty
+
+    results = searcher.find_all_subsequence_indices(patterns)
+    # Positions of the elements, going around twice
+    positions = set(np.cumsum(np.concatenate(([0], sequence, sequence))).tolist())
+    for start, pattern, found in zip(starts, patterns, results):
+        assert start in found
+        for index in found[:: max(1, len(found) // 50)]:
+            offset = int(sequence[:index].sum())
+            assert all(offset + jump in positions for jump in np.cumsum(pattern))
+    assert len(results[-1]) == 0
+
+
+@pytest.mark.parametrize("sequence", [[[1, 2], [3, 4]], [1.5, 2.0], [2, 0, 1], [1, -2]])
+def test_int_array_searcher_rejects_invalid_sequences(sequence: list[Any]) -> None:
+    pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        IntArraySubsequenceSearcher(sequence)
@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from music_tools.catalogue import CatalogueSpec, build_catalogue, shards
+
+_SPEC = CatalogueSpec(tunings=("EADGBE",), frets=5, families=("Major", "Whole-Tone"))
+
+
+def test_shards() -> None:
+    assert len(shards(_SPEC)) == 2 * 12
+    assert len(shards(CatalogueSpec())) == 2 * 10 * 12
+
+
+def test_catalogue_contents(tmp_path: Path) -> None:
+    output = tmp_path / "catalogue.jsonl"
+    assert build_catalogue(_SPEC, tmp_path / "shards", output) == 24
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(r["family"], r["root"]) for r in records[:2]] == [
+        ("Major", "C"),
+        ("Major", "C♯"),
+    ]
+
+    ionian, dorian = records[0]["scales"][:2]
+    assert (ionian["name"], dorian["name"]) == ("Ionian", "Dorian")
+    assert ionian["notes"] == ["C", "D", "E", "F", "G", "A", "B"]
+    assert ionian["chords"][0] == "C E G" and ionian["chords"][7] == "C E G B"
+    # Open C, first (thinnest) string first
+    assert [0, 1, 0, 2, 3, None] in records[0]["voicings"]["C E G"]
+
+    # Chords are only stacked in thirds on seven note scales
+    whole_tone = records[12]
+    assert whole_tone["family"] == "Whole-Tone"
+    assert whole_tone["scales"][0]["chords"] == []
+
+
+def test_output_independent_of_workers(tmp_path: Path) -> None:
+    build_catalogue(_SPEC, tmp_path / "inline", tmp_path / "inline.jsonl")
+    build_catalogue(_SPEC, tmp_path / "pool", tmp_path / "pool.jsonl", workers=2)
+    inline = (tmp_path / "inline.jsonl").read_bytes()
+    assert inline == (tmp_path / "pool.jsonl").read_bytes()
+
+
+def test_resume_after_interruption(tmp_path: Path) -> None:
+    build_catalogue(_SPEC, tmp_path / "fresh", tmp_path / "fresh.jsonl")
+
+    def interrupt(done: int, total: int) -> None:
+        if done == 5:
+            raise KeyboardInterrupt
+
+    output = tmp_path / "resumed.jsonl"
+    with pytest.raises(KeyboardInterrupt):
+        build_catalogue(_SPEC, tmp_path / "resumed", output, progress=interrupt)
+    assert not output.exists()
+
+    assert build_catalogue(_SPEC, tmp_path / "resumed", output) == 24 - 5
+    assert output.read_bytes() == (tmp_path / "fresh.jsonl").read_bytes()
+
+    with pytest.raises(ValueError, match="different build"):
+        build_catalogue(CatalogueSpec(frets=6), tmp_path / "resumed", output)
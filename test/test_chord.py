@@ -1,4 +1,12 @@
-from music_tools.chord import ChordScale, chords_in_scale
+from music_tools.chord import (
+    ChordDescription,
+    ChordScale,
+    Extension,
+    Tension,
+    ToneQuality,
+    chords_in_scale,
+    description_to_chord_scale,
+)
 from music_tools.scale import name_to_scale
 
 
@@ -9,3 +17,24 @@ from music_tools.scale import name_to_scale
 #     assert chords == [
 #         ChordScale
 #     ]
+
+
+def test_description_to_chord_scale() -> None:
+    half_diminished = ChordDescription(ToneQuality.Diminished, Extension.MinorSeven)
+    assert [i.half_steps for i in description_to_chord_scale(half_diminished)] == [
+        0,
+        3,
+        6,
+        10,
+    ]
+    dominant_sharp_nine = ChordDescription(
+        ToneQuality.Major, Extension.MinorSeven, [Tension.SharpNine]
+    )
+    assert [i.half_steps for i in description_to_chord_scale(dominant_sharp_nine)] == [
+        0,
+        3,
+        4,
+        7,
+        10,
+    ]
+    assert len(description_to_chord_scale(ChordDescription(ToneQuality.Minor))) == 3
@@ -0,0 +1,82 @@
+from music_tools.chord import (
+    ChordDescription,
+    Extension,
+    Tension,
+    ToneQuality,
+    description_to_chord_scale,
+)
+from music_tools.chord_scale_matrix import (
+    CHORD_SHAPES,
+    ChordScaleMatrix,
+    avoid_tensions,
+)
+from music_tools.note import n
+from music_tools.pitch import Interval
+from music_tools.scale import name_to_scale
+
+_HALF_DIMINISHED = ChordDescription(ToneQuality.Diminished, Extension.MinorSeven)
+
+
+def test_chord_shapes() -> None:
+    # Extension.DiminishedSeven is an alias of Extension.Six
+    assert len(CHORD_SHAPES) == 4 * 5
+
+
+def test_matches_brute_force() -> None:
+    matrix = ChordScaleMatrix.build(name_to_scale.items())
+    for shape in CHORD_SHAPES:
+        chord = ChordDescription(*shape)
+        chord_scale = description_to_chord_scale(chord)
+        for root in (n("C"), n("F#")):
+            expected = {
+                (name, root_pc)
+                for name, scale in name_to_scale.items()
+                for root_pc in range(12)
+                if {(i.half_steps + root_pc) % 12 for i in scale}
+                >= {
+                    (i.half_steps + root.to_octave_pitch().half_steps) % 12
+                    for i in chord_scale
+                }
+            }
+            found = {
+                (m.name, m.root.to_octave_pitch().half_steps)
+                for m in matrix.scales_over(root, chord)
+            }
+            assert found == expected, chord
+
+
+def test_scales_over_half_diminished_with_nine() -> None:
+    matches = ChordScaleMatrix.build().scales_over(
+        n("C"), _HALF_DIMINISHED, with_tensions=[Tension.Nine]
+    )
+    names = {(m.name, str(m.root)) for m in matches}
+    # Locrian ♮2
+    assert ("Melodic Minor mode 6", "C") in names
+    # Locrian itself has a ♭9
+    assert ("Locrian", "C") not in names
+    assert all(Tension.Nine in m.available_tensions for m in matches)
+
+
+def test_without_tensions() -> None:
+    matrix = ChordScaleMatrix.build()
+    dominant = ChordDescription(ToneQuality.Major, Extension.MinorSeven)
+    no_eleven = matrix.scales_over(n("G"), dominant, without_tensions=[Tension.Eleven])
+    assert ("Lydian", "C") not in {(m.name, str(m.root)) for m in no_eleven}
+    assert all(Tension.Eleven not in m.available_tensions for m in no_eleven)
+    assert "Melodic Minor mode 4" in {m.name for m in no_eleven}
+
+
+def test_avoid_tensions() -> None:
+    major_seven = ChordDescription(ToneQuality.Major, Extension.MajorSeven)
+    assert avoid_tensions(major_seven) == (
+        Tension.FlatNine,
+        Tension.Eleven,
+        Tension.FlatThirteen,
+    )
+    [ionian] = [
+        m
+        for m in ChordScaleMatrix.build().scales_over(n("C"), major_seven)
+        if m.name == "Major" and m.scale[1] == Interval(2) and str(m.root) == "C"
+    ]
+    assert ionian.available_tensions == (Tension.Nine, Tension.Eleven, Tension.Thirteen)
+    assert ionian.avoid_tensions == (Tension.Eleven,)
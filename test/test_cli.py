@@ -0,0 +1,105 @@
+import io
+import json
+
+import pytest
+
+from music_tools.cli import MAX_VOICINGS, process_line, process_stream
+
+
+def _process(request: dict[str, object]) -> dict[str, object]:
+    return json.loads(process_line(json.dumps(request)))  # type: ignore
+
+
+def test_render() -> None:
+    response = _process(
+        {"id": 7, "op": "render", "frets": 4, "root": "E", "scale": "Minor"}
+    )
+    assert response["id"] == 7
+    board = response["result"]["board"]  # type: ignore
+    assert board.splitlines()[0] == "E   1 |---|-2-|-3-|---|"
+
+
+def test_identify() -> None:
+    response = _process({"op": "identify", "notes": ["C", "E", "G", "B"], "k": 2})
+    result = response["result"]
+    assert result["set_class"] == "4-20"  # type: ignore
+    # C E G B plus D# and G#
+    assert result["matches"][0] == {  # type: ignore
+        "name": "Augmented",
+        "root": "C",
+        "distance": 2,
+    }
+
+
+def test_harmonize() -> None:
+    response = _process(
+        {"op": "harmonize", "root": "C", "scale": "Major", "sevenths": True}
+    )
+    chords = response["result"]["chords"]  # type: ignore
+    assert chords[0] == ["C", "E", "G", "B"]
+    assert chords[4] == ["G", "B", "D", "F"]
+
+
+def test_voicings() -> None:
+    response = _process(
+        {"op": "voicings", "notes": ["C", "E", "G"], "root_in_bass": True, "limit": 3}
+    )
+    assert len(response["result"]["voicings"]) == 3  # type: ignore
+
+
+def test_voicings_are_limited_by_default() -> None:
+    # Too many to list them all on a fretboard with 12 strings
+    response = _process(
+        {"op": "voicings", "tuning": "MEGA", "notes": ["C", "E", "G"], "frets": 24}
+    )
+    assert len(response["result"]["voicings"]) == MAX_VOICINGS  # type: ignore
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "not json",
+        "[1, 2]",
+        '{"op": "nope"}',
+        '{"op": "harmonize", "root": "C"}',
+        '{"op": "harmonize", "root": "X", "scale": "Major"}',
+        '{"op": "voicings", "notes": []}',
+        '{"op": "voicings", "notes": "C E G"}',
+        '{"op": "voicings", "notes": ["C", "E", "G"], "limit": 0}',
+        '{"op": "voicings", "notes": ["C", "E", "G"], "limit": 1001}',
+        '{"op": "identify", "notes": [1, 2]}',
+        '{"op": "identify", "notes": ["C", "E"], "k": 0}',
+    ],
+)
+def test_errors(line: str) -> None:
+    assert "error" in json.loads(process_line(line))
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_stream_keeps_input_order(workers: int) -> None:
+    notes = ["C", "D", "E", "F", "G", "A", "B"]
+    lines = [
+        json.dumps({"id": i, "op": "harmonize", "root": notes[i % 7], "scale": "Major"})
+        for i in range(50)
+    ]
+    out = io.StringIO()
+
+    process_stream(
+        lines + ["", "bad"], out, workers=workers, chunk_size=3, max_in_flight=2
+    )
+
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["id"] for r in responses] == list(range(50)) + [None]
+    assert responses[1]["result"]["chords"][0] == ["D", "F♯", "A"]
+    assert "error" in responses[-1]
+
+
+def test_unexpected_errors_are_not_hidden(monkeypatch: pytest.MonkeyPatch) -> None:
+    from music_tools import cli
+
+    def broken(request: dict[str, object]) -> dict[str, object]:
+        raise IndexError("bug")
+
+    monkeypatch.setitem(cli.HANDLERS, "broken", broken)
+    with pytest.raises(IndexError):
+        process_stream(['{"id": 1, "op": "broken"}'], io.StringIO(), workers=0)
@@ -0,0 +1,115 @@
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from music_tools.diagram import (
+    FRETBOARD_CSS,
+    render_fretboard_html,
+    render_fretboard_svg,
+    render_html_page,
+)
+from music_tools.guitar import DROP_A, EADGBE, FretboardAnnotation, FretboardLocation
+
+_SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _pitch_classes(names: dict[int, str]) -> FretboardAnnotation[str]:
+    def annotation(loc: FretboardLocation) -> str | None:
+        return names.get(loc[2].half_steps % 12)
+
+    return annotation
+
+
+_C_MAJOR_TRIAD = _pitch_classes({0: "R", 4: "3", 7: "5"})
+
+
+def test_html_annotations() -> None:
+    html = render_fretboard_html(EADGBE, 3, [_C_MAJOR_TRIAD])
+    strings = re.findall(r'<string data-string-index="(\d)">(.*?)</string>', html)
+    assert [index for index, _ in strings] == ["5", "4", "3", "2", "1", "0"]
+
+    # The open C chord, and G on the open G string
+    cells = {
+        (int(index), int(fret)): re.findall(r"<annot[^>]*>(.*?)</annot>", cell)
+        for index, string in strings
+        for fret, cell in re.findall(
+            r'<(?:nut|fret) data-fret-index="(\d+)">(.*?)</(?:nut|fret)>', string
+        )
+    }
+    assert len(cells) == 6 * 4
+    assert cells[5, 0] == cells[0, 0] == ["3"]
+    assert cells[4, 1] == cells[1, 3] == ["R"]
+    assert cells[3, 0] == ["5"]
+    assert cells[3, 1] == []
+
+
+def test_html_layers_and_escaping() -> None:
+    html = render_fretboard_html(
+        DROP_A, 5, [_pitch_classes({9: "<A>"}), _pitch_classes({9: "&"})]
+    )
+    assert html.count("<string ") == 7
+    assert '<annot data-annot-layer="0">&lt;A&gt;</annot>' in html
+    assert '<annot data-annot-layer="1">&amp;</annot>' in html
+
+
+def test_svg() -> None:
+    svg = ET.fromstring(render_fretboard_svg(EADGBE, 12, [_C_MAJOR_TRIAD]))
+    assert svg.tag == f"{_SVG}svg"
+    # Nut, frets and strings
+    assert len(svg.findall(f"{_SVG}line")) == 1 + 12 + 6
+    texts = [text.text for text in svg.iter(f"{_SVG}text")]
+    # Fret markers, open string names, then annotations
+    assert texts[:8] == ["1", "3", "5", "7", "9", "12", "E", "B"]
+    assert len(svg.findall(f"{_SVG}g")) == len(texts) - 12
+    assert set(texts[12:]) == {"R", "3", "5"}
+
+
+def test_svg_size_depends_on_frets() -> None:
+    small = ET.fromstring(render_fretboard_svg(EADGBE, 5))
+    large = ET.fromstring(render_fretboard_svg(EADGBE, 24))
+    assert int(large.attrib["width"]) - int(small.attrib["width"]) == 19 * 40
+    assert large.attrib["height"] == small.attrib["height"]
+
+
+def test_rendering_is_repeatable() -> None:
+    layers = [_C_MAJOR_TRIAD, _pitch_classes({2: "9"})]
+    first = render_fretboard_svg(EADGBE, 12, layers)
+    assert render_fretboard_svg(EADGBE, 12, layers) == first
+    assert render_fretboard_svg(EADGBE, 12, layers[:1]) != first
+
+
+def test_html_page() -> None:
+    diagrams = [render_fretboard_html(EADGBE, 5), render_fretboard_svg(EADGBE, 5)]
+    page = render_html_page(diagrams, title="C & G")
+    assert "<title>C &amp; G</title>" in page
+    assert FRETBOARD_CSS in page
+    assert page.index(diagrams[0]) < page.index(diagrams[1])
+
+
+@pytest.mark.parametrize("num_layers", range(1, 9))
+def test_svg_layers_fit_in_their_fret(num_layers: int) -> None:
+    def everywhere(loc: FretboardLocation) -> str | None:
+        return "x"
+
+    svg = ET.fromstring(render_fretboard_svg(EADGBE, 3, [everywhere] * num_layers))
+    lines = svg.findall(f"{_SVG}line")
+    # Nut and frets are the vertical lines, strings the horizontal ones
+    dividers = sorted(
+        float(line.attrib["x1"])
+        for line in lines
+        if line.attrib["x1"] == line.attrib["x2"]
+    )
+    # Open string names are the leftmost text
+    labels_right = min(float(t.attrib["x"]) for t in svg.findall(f"{_SVG}text")) + 8
+    circles = list(svg.iter(f"{_SVG}circle"))
+    assert len(circles) == 6 * 4 * num_layers
+    for circle in circles:
+        cx, r = float(circle.attrib["cx"]), float(circle.attrib["r"])
+        left, right = cx - r, cx + r
+        assert left > labels_right
+        assert not any(left < divider < right for divider in dividers)
+        # Within the open string column or one fret
+        column = sum(divider <= cx for divider in dividers)
+        assert column == 0 or left >= dividers[column - 1]
+        assert column == len(dividers) or right <= dividers[column]
@@ -1,13 +1,29 @@
+import itertools
+import pickle
+
+import pytest
+
 from music_tools.guitar import (
+    DROP_A,
     EADGBE,
+    MEGA_FRETBOARD,
     FretIndex,
+    Fretboard,
+    FretboardAnnotation,
     FretboardLocation,
     String,
     StringIndex,
+    compile_annotation,
+    compile_pitch_classes,
+    compile_predicate,
+    compile_scale_degrees,
+    find_voicings,
     render_fretboard_ascii,
     _null_annotation,
 )
-from music_tools.note import p
+from music_tools.note import n, p
+from music_tools.pitch import OctavePitch
+from music_tools.scale import name_to_scale, scale_with_root
 
 
 def test_ascii_example1() -> None:
@@ -58,3 +74,129 @@ def test_standard_tuning() -> None:
     assert d[5] == g.open_pitch
     assert g[4] == b.open_pitch
     assert b[5] == high_e.open_pitch
+
+
+def _triad(*names: str) -> list[OctavePitch]:
+    return [n(name).to_octave_pitch() for name in names]
+
+
+def test_voicings_up_to_the_last_fret() -> None:
+    voicings = list(find_voicings(EADGBE, _triad("E", "G#", "B"), 12))
+    assert (None, 0, None, None, 11, 0) in voicings
+    assert all(max(fret or 0 for fret in voicing) <= 12 for voicing in voicings)
+
+
+def test_voicings_root_in_bass_is_the_lowest_pitch() -> None:
+    # Re-entrant ukulele tuning, where the lowest string is not the lowest pitch
+    ukulele = Fretboard.from_tuning("G4 C4 E4 A4")
+    c_major = _triad("C", "E", "G")
+    voicings = list(find_voicings(ukulele, c_major, 5, root_in_bass=True))
+    # C on the open C string is lowest, under G on the open G string
+    assert (3, 0, 0, 0) in voicings
+    assert (None, 0, 0, 0) in voicings
+
+
+def test_voicings_of_no_notes() -> None:
+    with pytest.raises(ValueError):
+        list(find_voicings(EADGBE, [], 12))
+
+
+def test_voicings_match_exhaustive_search() -> None:
+    ukulele = Fretboard.from_tuning("G4 C4 E4 A4")
+    chord = _triad("A", "C", "E", "G")
+    wanted = set(chord)
+    max_span = 3
+    expected = set()
+    for voicing in itertools.product([None, *range(8)], repeat=4):
+        fretted = [fret for fret in voicing if fret]
+        played = {
+            string[fret].to_octave()[1]
+            for string, fret in zip(ukulele.strings, voicing)
+            if fret is not None
+        }
+        span = max(fretted, default=0) - min(fretted, default=0)
+        if played == wanted and span < max_span:
+            expected.add(voicing)
+    voicings = list(find_voicings(ukulele, chord, 7, max_span=max_span))
+    assert len(voicings) == len(expected) and set(voicings) == expected
+
+
+def test_voicings_search_is_pruned() -> None:
+    # A full search of 12 strings would not finish
+    voicings = itertools.islice(
+        find_voicings(MEGA_FRETBOARD, _triad("C", "E", "G"), 24), 100
+    )
+    assert len(list(voicings)) == 100
+    every_note = [OctavePitch(i) for i in range(12)]
+    assert list(find_voicings(EADGBE, every_note, 24)) == []
+
+
+_C_MAJOR_TRIAD = {OctavePitch(0): "R", OctavePitch(4): "3", OctavePitch(7): "5"}
+
+
+def _c_major_triad(loc: FretboardLocation) -> str | None:
+    return _C_MAJOR_TRIAD.get(loc[2].to_octave()[1])
+
+
+def _on_fifth_fret(loc: FretboardLocation) -> bool:
+    return loc[1] == 5
+
+
+@pytest.mark.parametrize("fretboard", [EADGBE, MEGA_FRETBOARD])
+@pytest.mark.parametrize("frets", [4, 24])
+def test_compiled_layers_render_the_same(fretboard: Fretboard, frets: int) -> None:
+    c_major = scale_with_root(n("C"), name_to_scale["Major"])
+
+    def degrees(loc: FretboardLocation) -> str | None:
+        pitch_class = loc[2].to_octave()[1]
+        for degree, note in enumerate(c_major):
+            if note.to_octave_pitch() == pitch_class:
+                return str(degree + 1)
+        return None
+
+    plain = [_c_major_triad, degrees, lambda loc: "x" if loc[1] == 5 else None]
+    compiled: list[FretboardAnnotation[str]] = [
+        compile_pitch_classes(fretboard, 24, _C_MAJOR_TRIAD),
+        compile_scale_degrees(fretboard, frets, c_major),
+        compile_predicate(fretboard, frets, _on_fifth_fret, "x"),
+    ]
+    for layers in range(1, 4):
+        assert render_fretboard_ascii(
+            fretboard, frets, compiled[:layers]
+        ) == render_fretboard_ascii(fretboard, frets, plain[:layers])
+
+
+def test_compiled_layer_is_an_annotation() -> None:
+    compiled = compile_annotation(EADGBE, 12, _c_major_triad)
+    high_e = EADGBE.strings[0]
+    for fret in range(13):
+        loc = (StringIndex(1), FretIndex(fret), high_e[fret])
+        assert compiled(loc) == _c_major_triad(loc)
+
+    # Nothing beyond the compiled frets
+    assert compiled((StringIndex(1), FretIndex(13), high_e[13])) is None
+    # On another fretboard
+    with pytest.raises(ValueError):
+        compiled((StringIndex(1), FretIndex(0), DROP_A.strings[6].open_pitch))
+
+
+def test_compiled_layers_render_more_frets() -> None:
+    from music_tools.diagram import render_fretboard_html, render_fretboard_svg
+    from music_tools.terminal import IncrementalFretboardRenderer
+
+    compiled = compile_annotation(EADGBE, 5, _c_major_triad)
+
+    def up_to_fifth_fret(loc: FretboardLocation) -> str | None:
+        return _c_major_triad(loc) if loc[1] <= 5 else None
+
+    for render in (render_fretboard_ascii, render_fretboard_svg, render_fretboard_html):
+        assert render(EADGBE, 12, [compiled]) == render(EADGBE, 12, [up_to_fifth_fret])
+    renderer = IncrementalFretboardRenderer(EADGBE, 12)
+    assert renderer.render([compiled]) == IncrementalFretboardRenderer(
+        EADGBE, 12
+    ).render([up_to_fifth_fret])
+
+
+def test_compiled_layer_pickles() -> None:
+    compiled = compile_predicate(EADGBE, 12, _on_fifth_fret, "x")
+    assert pickle.loads(pickle.dumps(compiled)) == compiled
@@ -0,0 +1,48 @@
+import pkgutil
+import subprocess
+import sys
+
+import music_tools
+
+_MODULES = [
+    f"music_tools.{module.name}"
+    for module in pkgutil.iter_modules(music_tools.__path__)
+]
+
+_LAZY_ATTRIBUTES = {
+    "music_tools.guitar": ["EADGBE", "DROP_A", "MEGA_FRETBOARD"],
+    "music_tools.mode": ["major_scale_modes_by_name"],
+    "music_tools.note": ["sharp_notes", "flat_notes", "musical_pitch_parser"],
+    "music_tools.scale": ["name_to_scale", "scale_to_name"],
+}
+
+
+def _run(code: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_is_lazy() -> None:
+    checks = "\n".join(
+        f"assert {name!r} not in vars(sys.modules[{module!r}]), {name!r}"
+        for module, names in _LAZY_ATTRIBUTES.items()
+        for name in names
+    )
+    _run(
+        f"import sys\nimport {', '.join(_MODULES)}\n"
+        f"assert 'parsy' not in sys.modules\n{checks}"
+    )
+
+
+def test_lazy_attributes_computed_on_access() -> None:
+    _run(
+        "import sys\n"
+        "from music_tools.guitar import EADGBE\n"
+        "import music_tools.guitar\n"
+        "assert 'parsy' in sys.modules\n"
+        "assert vars(music_tools.guitar)['EADGBE'] is EADGBE\n"
+    )
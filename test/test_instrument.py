@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from music_tools import instrument
+from music_tools.algorithms import SubsequenceSearcher
+from music_tools.guitar import EADGBE, FretboardLocation, render_fretboard_ascii
+from music_tools.instrument import instrumenting, summary_json, summary_table
+from music_tools.mode import scale_modes
+from music_tools.note import n
+from music_tools.scale import name_to_scale
+
+
+def _annotation(loc: FretboardLocation) -> str | None:
+    return None
+
+
+def test_disabled_by_default() -> None:
+    assert not instrument.enabled()
+    with instrumenting() as stats:
+        assert instrument.enabled()
+    assert not instrument.enabled()
+
+    n("C")
+    assert stats == {}
+
+
+def test_counts_hot_paths() -> None:
+    with instrumenting() as stats:
+        n("C#")
+        render_fretboard_ascii(EADGBE, 4, [_annotation, _annotation])
+        list(scale_modes(name_to_scale["Major"]))
+        searcher = SubsequenceSearcher((2, 2, 1, 2, 2, 2, 1))
+        list(searcher.find_subsequence_indices((3, 2, 2, 3, 2)))
+
+    assert stats["note.n"].calls == 1
+    assert stats["guitar.string_visitor"].calls == 6
+    assert stats["guitar.fret_visitor"].calls == 6 * 5
+    assert stats["guitar.annotation"].calls == 2 * 6 * 5
+    assert (stats["mode.scale_modes"].calls, stats["mode.scale_modes"].items) == (1, 7)
+    assert stats["algorithms.find_subsequence_indices"].items == 3
+    assert all(s.seconds > 0 for s in stats.values())
+
+
+def test_allocations() -> None:
+    with instrumenting(track_allocations=True) as stats:
+        render_fretboard_ascii(EADGBE, 24, [_annotation])
+    assert stats["guitar.string_visitor"].allocated_bytes > 0
+    assert "alloc KiB" in summary_table(stats)
+
+
+def test_summary() -> None:
+    with instrumenting() as stats:
+        n("C")
+    assert "note.n" in summary_table(stats)
+    assert json.loads(summary_json(stats))["note.n"]["calls"] == 1
+
+
+def test_environment_variable(tmp_path: Path) -> None:
+    out = tmp_path / "stats.json"
+    subprocess.run(
+        [sys.executable, "-c", "from music_tools.note import p; p('Bb4')"],
+        env={
+            **os.environ,
+            "MUSIC_TOOLS_INSTRUMENT": "json",
+            "MUSIC_TOOLS_INSTRUMENT_OUT": str(out),
+        },
+        check=True,
+    )
+    assert json.loads(out.read_text())["note.p"]["calls"] == 1
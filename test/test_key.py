@@ -0,0 +1,75 @@
+import pytest
+
+from music_tools.key import detect_key, detect_keys, pitch_class_histogram, track_keys
+from music_tools.mode import major_scale_modes_by_name
+from music_tools.note import n, p
+from music_tools.pitch import Pitch
+from music_tools.scale import name_to_scale
+
+
+def _pitches(text: str) -> list[Pitch]:
+    return [p(x).to_pitch() for x in text.split()]
+
+
+_C_MAJOR_MELODY = _pitches("C4 D4 E4 F4 G4 A4 B4 C5 G4 E4 C4 G3 C4")
+_E_HARMONIC_MINOR_MELODY = _pitches("E4 F#4 G4 A4 B4 C5 D#5 E5 B4 G4 E4 D#4 E4")
+
+
+def test_major() -> None:
+    estimate = detect_key(_C_MAJOR_MELODY)
+    assert estimate is not None
+    assert estimate.root == n("C")
+    assert estimate.scale == name_to_scale["Major"]
+
+
+def test_harmonic_minor() -> None:
+    estimate = detect_key(_E_HARMONIC_MINOR_MELODY)
+    assert estimate is not None
+    assert (estimate.root, estimate.scale_name) == (n("E"), "Harmonic Minor")
+
+
+def test_mode_catalogue() -> None:
+    estimate = detect_key(
+        _pitches("D4 E4 F4 G4 A4 B4 C5 D5 A4 D4 F4 D4"),
+        catalogue=dict(major_scale_modes_by_name),
+    )
+    assert estimate is not None
+    assert (estimate.root, estimate.scale_name) == (n("D"), "Dorian")
+
+
+def test_no_notes() -> None:
+    assert detect_key([]) is None
+
+
+def test_batch_matches_single() -> None:
+    histograms = [
+        pitch_class_histogram(_C_MAJOR_MELODY),
+        pitch_class_histogram(_E_HARMONIC_MINOR_MELODY),
+    ]
+    assert list(detect_keys(histograms)) == [
+        detect_key(_C_MAJOR_MELODY),
+        detect_key(_E_HARMONIC_MINOR_MELODY),
+    ]
+
+
+def test_track_modulation() -> None:
+    melody = _C_MAJOR_MELODY + _E_HARMONIC_MINOR_MELODY
+    window = len(_C_MAJOR_MELODY)
+
+    estimates = list(track_keys(melody, window))
+
+    assert len(estimates) == len(melody) - window + 1
+    first, last = estimates[0], estimates[-1]
+    assert first[0] == 0 and first[1] == detect_key(_C_MAJOR_MELODY)
+    assert last[0] == window and last[1] == detect_key(_E_HARMONIC_MINOR_MELODY)
+
+
+def test_track_hop() -> None:
+    starts = [start for start, _ in track_keys(_C_MAJOR_MELODY, 4, hop=3)]
+    assert starts == [0, 3, 6, 9]
+
+
+@pytest.mark.parametrize("window, hop", [(0, 1), (4, 0), (-1, -1)])
+def test_track_keys_rejects_empty_steps(window: int, hop: int) -> None:
+    with pytest.raises(ValueError):
+        list(track_keys(_C_MAJOR_MELODY, window, hop=hop))
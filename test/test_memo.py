@@ -0,0 +1,113 @@
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import make_dataclass
+from pathlib import Path
+
+import pytest
+
+from music_tools.cli import process_stream
+from music_tools.memo import MemoStore, stable_key
+from music_tools.note import n
+from music_tools.pitch import Interval
+
+
+def test_stable_key() -> None:
+    key = stable_key("chords", (n("C"), {Interval(4), Interval(7)}))
+    assert key == stable_key("chords", (n("C"), {Interval(7), Interval(4)}))
+    assert key != stable_key("scales", (n("C"), {Interval(4), Interval(7)}))
+    assert key != stable_key("chords", (n("D"), {Interval(4), Interval(7)}))
+    with pytest.raises(TypeError):
+        stable_key("chords", object())
+
+
+def test_stable_key_distinguishes_types() -> None:
+    assert stable_key("notes", [1, 2]) != stable_key("notes", (1, 2))
+    assert stable_key("notes", ("set", ("1", "2"))) != stable_key("notes", {1, 2})
+    # Dataclasses of the same name in different modules
+    same_name = make_dataclass("Interval", [("half_steps", int)])
+    assert same_name.__qualname__ == Interval.__qualname__
+    assert stable_key("intervals", same_name(4)) != stable_key("intervals", Interval(4))
+
+
+def test_get_or_compute_persists(tmp_path: Path) -> None:
+    path = tmp_path / "memo.sqlite3"
+    calls = []
+
+    def compute() -> list[int]:
+        calls.append(1)
+        return [1, 2, 3]
+
+    store = MemoStore(path)
+    assert store.get_or_compute("ns", ("a", 1), compute) == [1, 2, 3]
+    assert store.get_or_compute("ns", ("a", 1), compute) == [1, 2, 3]
+    store.close()
+
+    reopened = MemoStore(path)
+    assert reopened.get_or_compute("ns", ("a", 1), compute) == [1, 2, 3]
+    assert len(calls) == 1
+    assert reopened.stats()["ns"].hits == 2
+    assert reopened.stats()["ns"].misses == 1
+    assert "66.7% hit rate" in reopened.report()
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    store = MemoStore(tmp_path / "memo.sqlite3", max_entries=2)
+    double = store.memoize("double")(lambda x: 2 * x)
+    double(1)
+    double(2)
+    time.sleep(0.01)
+    double(1)  # now 2 is the least recently used
+    double(3)
+    assert len(store) == 2
+    assert store.stats()["double"].misses == 3
+    double(1)
+    double(2)
+    assert store.stats()["double"].misses == 4
+
+
+def test_failed_compute_releases_claim(tmp_path: Path) -> None:
+    store = MemoStore(tmp_path / "memo.sqlite3")
+
+    def fail() -> int:
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        store.get_or_compute("ns", 1, fail)
+    assert store.get_or_compute("ns", 1, lambda: 5) == 5
+
+
+def _slow_compute(store: MemoStore, log: str) -> int:
+    def compute() -> int:
+        with open(log, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.2)
+        return 42
+
+    return store.get_or_compute("slow", "key", compute)
+
+
+def test_no_duplicate_computation_across_processes(tmp_path: Path) -> None:
+    store = MemoStore(tmp_path / "memo.sqlite3")
+    log = str(tmp_path / "log")
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(_slow_compute, [store] * 4, [log] * 4))
+    assert results == [42] * 4
+    assert len(Path(log).read_text().splitlines()) == 1
+    assert store.stats()["slow"].hits == 3
+
+
+def test_cli_memo(tmp_path: Path) -> None:
+    store = MemoStore(tmp_path / "memo.sqlite3")
+    lines = [
+        json.dumps({"id": i, "op": "harmonize", "root": "G", "scale": "Major"})
+        for i in range(3)
+    ]
+    out = io.StringIO()
+    process_stream(lines, out, workers=0, memo=store)
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["id"] for r in responses] == [0, 1, 2]
+    assert responses[0]["result"] == responses[2]["result"]
+    assert store.stats()["cli.harmonize"].hits == 2
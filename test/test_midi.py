@@ -0,0 +1,129 @@
+from pathlib import Path
+
+import pytest
+
+from music_tools.midi import (
+    MidiFormatError,
+    NoteEvent,
+    Tick,
+    iter_note_events,
+    read_header,
+    read_note_events,
+    read_pitches,
+    scan_corpus,
+)
+from music_tools.note import p
+
+
+def _chunk(kind: bytes, body: bytes) -> bytes:
+    return kind + len(body).to_bytes(4, "big") + body
+
+
+def _smf(*tracks: bytes) -> bytes:
+    header = _chunk(b"MThd", bytes([0, 1, 0, len(tracks), 0, 96]))
+    return header + b"".join(_chunk(b"MTrk", track) for track in tracks)
+
+
+_END_OF_TRACK = bytes([0x00, 0xFF, 0x2F, 0x00])
+
+# C4 then E4 using running status, released with a zero velocity note-on
+_MELODY = (
+    bytes([0x00, 0xFF, 0x51, 0x03, 0x07, 0xA1, 0x20])  # tempo meta event
+    + bytes([0x00, 0x90, 60, 100])
+    + bytes([0x60, 60, 0])  # running status note-on, velocity 0
+    + bytes([0x00, 64, 90])
+    + bytes([0x81, 0x40, 0x80, 64, 0])  # delta 192 as a two byte quantity
+    + _END_OF_TRACK
+)
+
+# A bass note on channel 2, with a program change in between
+_BASS = (
+    bytes([0x00, 0xC1, 5])
+    + bytes([0x30, 0x91, 36, 80])
+    + bytes([0x60, 0x81, 36, 0])
+    + _END_OF_TRACK
+)
+
+
+@pytest.fixture
+def midi_file(tmp_path: Path) -> Path:
+    path = tmp_path / "song.mid"
+    path.write_bytes(_smf(_MELODY, _BASS))
+    return path
+
+
+def test_header(midi_file: Path) -> None:
+    header = read_header(midi_file.read_bytes())
+    assert (header.format, header.num_tracks, header.division) == (1, 2, 96)
+
+
+def test_note_events_merged_in_time_order(midi_file: Path) -> None:
+    c4 = p("C4").to_pitch()
+    e4 = p("E4").to_pitch()
+    c2 = p("C2").to_pitch()
+
+    assert list(read_note_events(midi_file)) == [
+        NoteEvent(Tick(0), 0, 0, c4, 100, True),
+        NoteEvent(Tick(48), 1, 1, c2, 80, True),
+        NoteEvent(Tick(96), 0, 0, c4, 0, False),
+        NoteEvent(Tick(96), 0, 0, e4, 90, True),
+        NoteEvent(Tick(144), 1, 1, c2, 0, False),
+        NoteEvent(Tick(288), 0, 0, e4, 0, False),
+    ]
+
+
+def test_read_pitches(midi_file: Path) -> None:
+    assert list(read_pitches(midi_file)) == [
+        p("C4").to_pitch(),
+        p("C2").to_pitch(),
+        p("E4").to_pitch(),
+    ]
+
+
+def test_not_midi(tmp_path: Path) -> None:
+    path = tmp_path / "bad.mid"
+    path.write_bytes(b"RIFF0000")
+    with pytest.raises(MidiFormatError):
+        list(read_note_events(path))
+
+
+@pytest.mark.parametrize(
+    "track",
+    [
+        bytes([0x81]),  # delta time cut short
+        bytes([0x00]),  # delta time without an event
+        bytes([0x00, 0x90, 60]),  # note-on missing its velocity
+        bytes([0x00, 0xFF]),  # meta event missing its type
+        bytes([0x00, 0xFF, 0x51, 0x03, 0x07]),  # meta event cut short
+        bytes([0x00, 0xF0, 0x05, 0x01]),  # SysEx event cut short
+    ],
+)
+def test_truncated_track(track: bytes) -> None:
+    # Reads must stop at the end of the chunk, not run into the next one
+    for data in (_smf(track), _smf(track, _BASS)):
+        with pytest.raises(MidiFormatError):
+            list(iter_note_events(data))
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        bytes([0x00, 0xFF, 0x01, 0x01, 0x41]),  # text meta event
+        bytes([0x00, 0xF0, 0x01, 0xF7]),  # SysEx event
+    ],
+)
+def test_running_status_cancelled(event: bytes) -> None:
+    track = bytes([0x00, 0x90, 60, 100]) + event + bytes([0x00, 60, 0])
+    with pytest.raises(MidiFormatError):
+        list(iter_note_events(_smf(track + _END_OF_TRACK)))
+
+
+def test_scan_corpus(midi_file: Path, tmp_path: Path) -> None:
+    bad = tmp_path / "bad.mid"
+    bad.write_bytes(b"")
+
+    report = scan_corpus([midi_file, midi_file, bad], max_workers=2)
+
+    assert report.files == 2
+    assert report.events == 12
+    assert report.failed == [str(bad)]
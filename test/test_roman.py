@@ -0,0 +1,157 @@
+import itertools
+import tracemalloc
+
+from music_tools.chord import Chord, Extension, ToneQuality
+from music_tools.midi import NoteEvent, Tick
+from music_tools.note import n
+from music_tools.pitch import Pitch
+from music_tools.roman import (
+    Key,
+    analyze,
+    chords_from_note_events,
+    identify_chord,
+    label_chord,
+)
+
+
+def _chord(*names: str) -> Chord:
+    return Chord(tuple(n(name).to_octave_pitch() for name in names))
+
+
+_C_MAJOR = Key(n("C"))
+
+
+def test_identify_chord() -> None:
+    assert identify_chord(_chord("E", "G", "C")) == (
+        n("C").to_octave_pitch(),
+        (ToneQuality.Major, None),
+    )
+    # C6 and Am7 have the same notes, the bass decides
+    assert identify_chord(_chord("C", "E", "G", "A")) == (
+        n("C").to_octave_pitch(),
+        (ToneQuality.Major, Extension.Six),
+    )
+    assert identify_chord(_chord("A", "C", "E", "G")) == (
+        n("A").to_octave_pitch(),
+        (ToneQuality.Minor, Extension.MinorSeven),
+    )
+    assert identify_chord(_chord("C", "D", "E")) is None
+
+
+def test_diatonic_numerals() -> None:
+    labels = [
+        str(label_chord(chord, _C_MAJOR))
+        for chord in [
+            _chord("C", "E", "G"),
+            _chord("D", "F", "A", "C"),
+            _chord("G", "B", "D", "F"),
+            _chord("C", "E", "G", "B"),
+            _chord("B", "D", "F", "A"),
+            _chord("B", "D", "F"),
+        ]
+    ]
+    assert labels == ["I", "ii7", "V7", "IΔ7", "viiø7", "vii°"]
+
+
+def test_minor_leading_tone_chords() -> None:
+    c_minor = Key(n("C"), minor=True)
+    b_dim = label_chord(_chord("B", "D", "F"), c_minor)
+    assert str(b_dim) == "vii°" and b_dim.diatonic
+    b_dim7 = label_chord(_chord("B", "D", "F", "Ab"), c_minor)
+    assert str(b_dim7) == "vii°7" and b_dim7.diatonic
+    assert str(label_chord(_chord("Bb", "D", "F"), c_minor)) == "VII"
+    assert str(label_chord(_chord("B", "D#", "F#"), c_minor)) == "♯VII"
+    assert str(label_chord(_chord("A", "C", "E"), c_minor)) == "♯vi"
+    assert str(label_chord(_chord("Ab", "C", "Eb"), c_minor)) == "VI"
+
+
+def test_secondary_dominants() -> None:
+    v_of_ii = label_chord(_chord("A", "C#", "E", "G"), _C_MAJOR)
+    assert str(v_of_ii) == "V7/ii" and v_of_ii.secondary_of == "ii"
+    assert str(label_chord(_chord("D", "F#", "A"), _C_MAJOR)) == "V/V"
+    assert str(label_chord(_chord("C", "E", "G", "Bb"), _C_MAJOR)) == "V7/IV"
+    # Not a secondary dominant of the diminished vii°
+    f_sharp = label_chord(_chord("F#", "A#", "C#"), _C_MAJOR)
+    assert f_sharp.secondary_of is None and str(f_sharp) == "♭V"
+
+
+def test_borrowed_chords() -> None:
+    flat_six = label_chord(_chord("Ab", "C", "Eb"), _C_MAJOR)
+    assert str(flat_six) == "♭VI" and flat_six.borrowed
+    minor_four = label_chord(_chord("F", "Ab", "C"), _C_MAJOR)
+    assert str(minor_four) == "iv" and minor_four.borrowed
+
+    a_minor = Key(n("A"), minor=True)
+    assert str(label_chord(_chord("E", "G#", "B"), a_minor)) == "V"
+    picardy = label_chord(_chord("A", "C#", "E"), a_minor)
+    assert str(picardy) == "I" and picardy.borrowed
+
+
+def test_detected_key() -> None:
+    progression = [
+        _chord("A", "C", "E"),
+        _chord("D", "F", "A"),
+        _chord("E", "G#", "B", "D"),
+        _chord("A", "C", "E"),
+    ]
+    labels = list(analyze(progression * 3, lookahead=4))
+    assert {str(label.key) for label in labels} == {"A minor"}
+    assert [str(label) for label in labels[:4]] == ["i", "iv", "V7", "i"]
+
+
+def test_analysis_streams_in_bounded_memory() -> None:
+    progression = itertools.cycle(
+        [_chord("C", "E", "G"), _chord("F", "A", "C"), _chord("G", "B", "D", "F")]
+    )
+    labels = analyze(itertools.islice(progression, 20_000), lookahead=4)
+    for _ in itertools.islice(labels, 1000):
+        pass
+    tracemalloc.start()
+    try:
+        for label in itertools.islice(labels, 5000):
+            pass
+        assert tracemalloc.get_traced_memory()[0] < 100_000
+    finally:
+        tracemalloc.stop()
+    assert str(label.key) == "C major"
+
+
+def test_chords_from_note_events() -> None:
+    def on(time: int, note: str) -> NoteEvent:
+        return NoteEvent(
+            Tick(time), 0, 0, Pitch(n(note).to_octave_pitch().half_steps + 36), 90, True
+        )
+
+    events = [
+        on(0, "E"),
+        on(0, "C"),
+        on(0, "G"),
+        on(10, "D"),
+        on(20, "G"),
+        on(20, "B"),
+        on(20, "D"),
+        on(20, "F"),
+    ]
+    chords = list(chords_from_note_events(events))
+    assert [str(label_chord(chord, _C_MAJOR)) for chord in chords] == ["I", "V7"]
+
+
+def test_modulation_at_first_chromatic_chord() -> None:
+    c_major = [
+        _chord("C", "E", "G"),
+        _chord("A", "C", "E"),
+        _chord("D", "F", "A", "C"),
+        _chord("G", "B", "D", "F"),
+    ]
+    g_major = [
+        _chord("G", "B", "D"),
+        _chord("E", "G", "B"),
+        _chord("A", "C", "E", "G"),
+        _chord("D", "F#", "A", "C"),
+    ]
+    labels = list(analyze(c_major * 3 + g_major * 3, lookahead=4))
+    # The first three G major chords are diatonic in C major too
+    assert [str(label.key) for label in labels].index("G major") == 15
+    assert [str(label) for label in labels[15:]] == ["V7", "I", "vi", "ii7"] * 2 + [
+        "V7"
+    ]
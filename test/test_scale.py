@@ -1,3 +1,5 @@
+import pytest
+
 from music_tools.pitch import (
     DIMINISHED_FIFTH,
     DIMINISHED_SEVENTH,
@@ -11,7 +13,9 @@ from music_tools.pitch import (
     UNISON,
 )
 from music_tools.scale import (
+    PitchClassMask,
     Scale,
+    as_mask,
     gen_conventional_scales,
     interval_sequence,
     intervals_from_scale,
@@ -37,6 +41,13 @@ _major_scale = Scale(
 )
 
 
+def test_as_mask() -> None:
+    assert as_mask(_major_scale) == as_mask(PitchClassMask(0b101010110101))
+    for mask in (-1, 0x1000):
+        with pytest.raises(ValueError):
+            as_mask(PitchClassMask(mask))
+
+
 def test_scale_repr() -> None:
     assert str(_major_scale) == "(1 2 3 4 5 6 7)"
 
@@ -0,0 +1,75 @@
+from itertools import count, islice
+
+import pytest
+
+from music_tools.mode import major_scale_modes_by_name, scale_modes
+from music_tools.scale import (
+    PitchClassMask,
+    as_mask,
+    gen_conventional_scales,
+    mask_to_scale,
+    name_to_scale,
+)
+from music_tools.scale_family import (
+    canonical_rotation,
+    classify_scales,
+    group_scale_families,
+)
+
+
+def test_canonical_rotation_is_shared_by_modes() -> None:
+    for scale in name_to_scale.values():
+        canonicals = {canonical_rotation(as_mask(mode)) for mode in scale_modes(scale)}
+        assert len(canonicals) == 1
+    assert canonical_rotation(as_mask(name_to_scale["Major"])) != canonical_rotation(
+        as_mask(name_to_scale["Harmonic Minor"])
+    )
+
+
+def test_canonical_rotation_needs_a_root() -> None:
+    with pytest.raises(ValueError):
+        canonical_rotation(PitchClassMask(0b10))
+
+
+def test_named_families() -> None:
+    classified = list(classify_scales(major_scale_modes_by_name.values()))
+    assert {c.family.parent_name for c in classified} == {"Major"}
+    assert [c.mode for c in classified] == list(range(1, 8))
+    assert [c.name for c in classified] == list(major_scale_modes_by_name)
+
+    [minor] = classify_scales([name_to_scale["Minor"]])
+    assert minor.name == "Aeolian"
+
+    harmonic_minor_modes = list(scale_modes(name_to_scale["Harmonic Minor"]))
+    [fifth] = classify_scales([harmonic_minor_modes[4]])
+    assert fifth.name == "Harmonic Minor mode 5"
+
+
+def test_symmetric_scales_use_lowest_mode() -> None:
+    diminished = list(scale_modes(name_to_scale["Whole-Half Diminished"]))
+    assert [c.mode for c in classify_scales(diminished)] == [1, 2]
+    [whole_tone] = classify_scales([name_to_scale["Whole-Tone"]])
+    assert whole_tone.family.num_modes == 1
+
+
+def test_group_conventional_scales() -> None:
+    groups = group_scale_families(gen_conventional_scales())
+    assert sum(len(members) for members in groups.values()) == 33
+    assert len(groups) == 10
+    [major] = [f for f in groups if f.parent_name == "Major"]
+    assert len(groups[major]) == 7
+
+    # Families without a named parent are named after their canonical rotation
+    unnamed = [f for f in groups if f.parent_name.startswith("(")]
+    for family in unnamed:
+        assert family.parent == mask_to_scale(
+            canonical_rotation(as_mask(family.parent))
+        )
+        assert family.mode_name(1) == family.parent_name
+
+
+def test_classification_streams() -> None:
+    every_mask = (mask_to_scale(PitchClassMask((i % 2048) << 1 | 1)) for i in count())
+    classified = list(islice(classify_scales(every_mask), 5000))
+    assert len(classified) == 5000
+    assert classified[0].family.num_modes == 1
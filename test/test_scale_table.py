@@ -0,0 +1,91 @@
+from array import array
+
+import pytest
+
+from music_tools.pitch import (
+    DIMINISHED_FIFTH,
+    MAJOR_THIRD,
+    MINOR_THIRD,
+    Interval,
+    OctavePitch,
+)
+from music_tools.scale import gen_conventional_scales, name_to_scale
+from music_tools.scale_table import ScaleTable, ScaleTableBuilder
+
+
+def _named_table() -> ScaleTable:
+    names = list(name_to_scale)
+    return ScaleTable.from_scales(
+        (name_to_scale[name] for name in names for _ in range(12)),
+        roots=(OctavePitch(root) for _ in names for root in range(12)),
+        names=(name for name in names for _ in range(12)),
+    )
+
+
+def test_round_trip() -> None:
+    scales = list(gen_conventional_scales())
+    table = ScaleTable.from_scales(scales)
+    assert len(table) == len(scales)
+    assert list(table) == scales
+    assert table[5] == scales[5]
+    assert table.root(5) is None and table.name(5) is None
+
+
+def test_roots_and_names() -> None:
+    table = _named_table()
+    assert table.name(0) == "Major" and table.root(0) == OctavePitch(0)
+    assert table.name(13) == "Minor" and table.root(13) == OctavePitch(1)
+    # Names are interned, not stored per row
+    assert table.nbytes == len(table) * (4 + 1 + 4)
+
+
+def test_slices_are_views() -> None:
+    table = _named_table()
+    view = table[12:24:2]
+    assert len(view) == 6
+    assert view.masks.obj is table.masks.obj
+    assert view.name(1) == "Minor" and view.root(1) == OctavePitch(2)
+    assert view[1] == name_to_scale["Minor"]
+
+
+def test_filters() -> None:
+    table = _named_table()
+    assert set(table.with_note_count(6).named("Whole-Tone")) == {
+        name_to_scale["Whole-Tone"]
+    }
+    assert len(table.with_note_count(6)) == 24  # Whole-Tone and Augmented
+
+    # Scales with a minor and major third above the root
+    both_thirds = table.containing([MINOR_THIRD, MAJOR_THIRD])
+    assert {both_thirds.name(i) for i in range(len(both_thirds))} == {"Augmented"}
+
+    # Every scale but the augmented scale has a tritone
+    no_tritone = set(table.named("Augmented").with_interval(DIMINISHED_FIFTH))
+    assert no_tritone == set()
+    assert len(table.with_interval(DIMINISHED_FIFTH)) == len(table) - 12
+
+    in_d = table.with_root(OctavePitch(2)).named("Major")
+    assert len(in_d) == 1 and in_d.root(0) == OctavePitch(2)
+    assert len(table.named("Nonexistent")) == 0
+
+
+def test_larger_octave() -> None:
+    builder = ScaleTableBuilder(octave=19)
+    builder.append_mask(0b1000100010001, name="stacked fourths")
+    builder.append_mask((1 << 19) - 1)
+    table = builder.build()
+    assert table[0] == (Interval(0), Interval(4), Interval(8), Interval(12))
+    assert len(table[1]) == 19
+    assert len(table.with_interval(Interval(15))) == 2
+    assert len(table.with_interval(Interval(3))) == 1
+    assert len(builder.build()) == 0
+
+
+def test_invalid_tables() -> None:
+    for octave in (0, 65):
+        with pytest.raises(ValueError):
+            ScaleTableBuilder(octave=octave)
+    masks = memoryview(array("I", [1, 3]))
+    roots = memoryview(array("b", [0]))
+    with pytest.raises(ValueError):
+        ScaleTable(masks, roots, roots, ())
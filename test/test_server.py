@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+
+import pytest
+
+from music_tools.guitar import EADGBE
+from music_tools.query import RequestError
+from music_tools.server import (
+    MAX_REQUEST_BODY,
+    FretboardQuery,
+    FretboardServer,
+    fretboard_data,
+)
+
+Fetch = Callable[..., Awaitable[tuple[int, dict[str, str], bytes]]]
+
+
+def test_fretboard_data_matches_page_format() -> None:
+    data = FretboardQuery(frets=5, chord=("A", "Db")).build()
+    assert data["totalFrets"] == 5
+    assert data["tuning"] == ["E", "A", "D", "G", "B", "E"]
+    [chord_layer] = data["annotations"]
+    # Strings are numbered from the lowest, as in example.json
+    assert [0, 5, "A"] in chord_layer
+    assert [1, 4, "D♭"] in chord_layer
+    assert [1, 0, "A"] in chord_layer
+
+
+def test_fretboard_data_no_layers() -> None:
+    assert fretboard_data(EADGBE, 3)["annotations"] == []
+
+
+def test_query_normalization() -> None:
+    assert FretboardQuery.from_query_string("chord=A,,C&frets=7") == FretboardQuery(
+        frets=7, chord=("A", "C")
+    )
+    with pytest.raises(RequestError):
+        FretboardQuery.from_query_string("frets=100")
+    with pytest.raises(RequestError):
+        FretboardQuery.from_query_string("scale=Major")
+
+
+def _with_server(test: Callable[[FretboardServer, Fetch], Awaitable[None]]) -> None:
+    async def run() -> None:
+        server = FretboardServer(b"<html></html>", cache_size=2)
+        listener = await server.serve("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        async def fetch(
+            target: str, method: str = "GET", body: bytes = b"", **headers: str
+        ) -> tuple[int, dict[str, str], bytes]:
+            lines = [f"{method} {target} HTTP/1.1", "Host: localhost"]
+            lines += [f"{name.replace('_', '-')}: {v}" for name, v in headers.items()]
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+            status = int((await reader.readline()).split()[1])
+            response_headers = {}
+            while (line := await reader.readline()) != b"\r\n":
+                name, _, value = line.decode().partition(":")
+                response_headers[name.lower()] = value.strip()
+            body = await reader.readexactly(int(response_headers["content-length"]))
+            return status, response_headers, body
+
+        try:
+            await test(server, fetch)
+        finally:
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_serves_page_and_data() -> None:
+    async def test(server: FretboardServer, fetch: Fetch) -> None:
+        status, headers, body = await fetch("/")
+        assert status == 200 and body == b"<html></html>"
+        assert headers["content-type"].startswith("text/html")
+
+        status, _, body = await fetch("/api/fretboard?frets=3&root=E&scale=Minor")
+        assert status == 200
+        assert json.loads(body)["annotations"][0][0] == [0, 0, "E"]
+
+        status, _, body = await fetch("/api/fretboard?root=H&scale=Minor")
+        assert status == 400
+        assert "not a note" in json.loads(body)["error"]
+
+        status, _, _ = await fetch("/nowhere")
+        assert status == 404
+
+    _with_server(test)
+
+
+def test_etag_and_lru_cache() -> None:
+    async def test(server: FretboardServer, fetch: Fetch) -> None:
+        status, headers, _ = await fetch("/api/fretboard?frets=3")
+        assert status == 200
+        etag = headers["etag"]
+
+        status, _, body = await fetch("/api/fretboard?frets=3", If_None_Match=etag)
+        assert status == 304 and body == b""
+        assert (server.cache.hits, server.cache.misses) == (1, 1)
+
+        await fetch("/api/fretboard?frets=4")
+        await fetch("/api/fretboard?frets=5")
+        assert len(server.cache) == 2
+        # frets=3 was evicted, so it is built again, with the same ETag
+        status, headers, _ = await fetch("/api/fretboard?frets=3")
+        assert headers["etag"] == etag
+        assert server.cache.misses == 4
+
+    _with_server(test)
+
+
+def test_concurrent_identical_requests_build_once() -> None:
+    async def run() -> None:
+        server = FretboardServer(b"")
+        query = FretboardQuery(frets=24, root="A", scale="Dorian")
+        responses = await asyncio.gather(
+            *(server.cache.get(query, None) for _ in range(8))
+        )
+        assert len({response.body for response in responses}) == 1
+        assert server.cache.misses == 1
+
+    asyncio.run(run())
+
+
+def test_request_bodies_are_skipped() -> None:
+    async def test(server: FretboardServer, fetch: Fetch) -> None:
+        # The body must not be mistaken for the next request on the connection
+        body = b"GET /nowhere HTTP/1.1\r\n\r\n"
+        status, _, _ = await fetch("/", "POST", body, content_length=str(len(body)))
+        assert status == 405
+        status, _, page = await fetch("/")
+        assert status == 200 and page == b"<html></html>"
+
+    _with_server(test)
+
+
+@pytest.mark.parametrize(
+    "headers, status",
+    [
+        ({"content_length": str(MAX_REQUEST_BODY + 1)}, 413),
+        ({"content_length": "-1"}, 400),
+        ({"content_length": "ten"}, 400),
+        ({"transfer_encoding": "chunked"}, 411),
+    ],
+)
+def test_unreadable_bodies_close_the_connection(
+    headers: dict[str, str], status: int
+) -> None:
+    async def test(server: FretboardServer, fetch: Fetch) -> None:
+        response_status, response_headers, _ = await fetch("/", "POST", **headers)
+        assert response_status == status
+        assert response_headers["connection"] == "close"
+
+    _with_server(test)
+
+
+def test_unexpected_errors_are_logged(caplog: pytest.LogCaptureFixture) -> None:
+    async def test(server: FretboardServer, fetch: Fetch) -> None:
+        async def respond(method: str, target: str) -> None:
+            raise ZeroDivisionError("secret")
+
+        server.respond = respond  # type: ignore[assignment, method-assign]
+        status, _, body = await fetch("/")
+        assert status == 500
+        assert b"secret" not in body
+        # The connection stays usable
+        status, _, _ = await fetch("/")
+        assert status == 500
+
+    with caplog.at_level(logging.ERROR, logger="music_tools.server"):
+        _with_server(test)
+    assert len(caplog.records) == 2
+    record = caplog.records[0]
+    assert record.exc_info is not None and record.exc_info[0] is ZeroDivisionError
+    assert "GET /" in record.getMessage()
+
+
+@pytest.mark.parametrize("long_line", ["target", "header"])
+def test_long_lines_close_the_connection(long_line: str) -> None:
+    async def test(server: FretboardServer, fetch: Fetch) -> None:
+        # Longer than the default limit of asyncio streams, 64 KiB
+        long = "a" * 100_000
+        if long_line == "target":
+            response = await fetch(f"/?{long}")
+        else:
+            response = await fetch("/", x_long=long)
+        status, headers, _ = response
+        assert status == 431
+        assert headers["connection"] == "close"
+
+    _with_server(test)
@@ -0,0 +1,73 @@
+from collections import Counter
+
+from music_tools.chord import instantiate_chord
+from music_tools.note import n
+from music_tools.pitch import OctavePitch
+from music_tools.scale import (
+    PitchClassMask,
+    interval_sequence,
+    name_to_scale,
+    scale_from_intervals,
+    scale_to_mask,
+)
+from music_tools.set_class import (
+    all_set_classes,
+    forte_name,
+    interval_vector,
+    normal_form,
+    prime_form,
+    set_class,
+    z_related,
+)
+
+
+def test_number_of_set_classes() -> None:
+    by_cardinality = Counter(c.cardinality for c in all_set_classes())
+    assert [by_cardinality[i] for i in range(13)] == [
+        1, 1, 6, 12, 29, 38, 50, 38, 29, 12, 6, 1, 1
+    ]  # fmt: skip
+    assert len({c.forte_name for c in all_set_classes()}) == 224
+
+
+def test_major_scale() -> None:
+    major = name_to_scale["Major"]
+    assert forte_name(major) == "7-35"
+    assert interval_vector(major) == (2, 5, 4, 3, 6, 1)
+    assert str(set_class(major)) == "7-35 [013568T]"
+
+
+def test_triads() -> None:
+    major_triad = scale_from_intervals(interval_sequence([4, 3]))
+    minor_triad = scale_from_intervals(interval_sequence([3, 4]))
+
+    assert forte_name(major_triad) == forte_name(minor_triad) == "3-11"
+    assert prime_form(major_triad) == minor_triad
+
+
+def test_chord_transposition_invariant() -> None:
+    augmented = scale_from_intervals(interval_sequence([4, 4]))
+    chord = instantiate_chord(augmented, n("F#"))
+    assert set_class(chord) == set_class(augmented)
+    assert forte_name(chord) == "3-12"
+
+
+def test_normal_form() -> None:
+    # B D F G, normal form starts on the B
+    pcs = scale_to_mask(map(OctavePitch, [2, 5, 7, 11]))
+    assert normal_form(pcs) == tuple(map(OctavePitch, [11, 2, 5, 7]))
+
+
+def test_z_related() -> None:
+    all_interval_tetrachord = scale_to_mask(map(OctavePitch, [0, 1, 4, 6]))
+    partner = z_related(all_interval_tetrachord)
+
+    assert forte_name(all_interval_tetrachord) == "4-Z15"
+    assert partner is not None and partner.forte_name == "4-Z29"
+    assert partner.interval_vector == interval_vector(all_interval_tetrachord)
+    assert z_related(name_to_scale["Major"]) is None
+
+
+def test_complement_names() -> None:
+    # The chromatic complement of the diatonic set is the pentatonic
+    pentatonic = PitchClassMask(~scale_to_mask(name_to_scale["Major"]) & 0xFFF)
+    assert forte_name(pentatonic) == "5-35"
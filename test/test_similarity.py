@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from music_tools.note import n
+from music_tools.pitch import OctavePitch
+from music_tools.scale import (
+    PitchClassMask,
+    name_to_scale,
+    scale_to_mask,
+    transpose_mask,
+)
+from music_tools.similarity import (
+    Metric,
+    ScaleIndex,
+    ScaleMatch,
+    default_catalogue,
+    hamming_distance,
+    voice_leading_distance,
+)
+
+
+@pytest.fixture(scope="module")
+def index() -> ScaleIndex:
+    return ScaleIndex.build()
+
+
+def _exhaustive(
+    index: ScaleIndex, query: PitchClassMask, k: int, metric: Metric
+) -> list[tuple[str, int, int]]:
+    distance = hamming_distance if metric == Metric.Hamming else voice_leading_distance
+    entries = sorted(
+        (distance(query, mask), entry.order, entry.name, entry.root.half_steps)
+        for mask, entries in index.entries_by_mask.items()
+        for entry in entries
+    )
+    return [(name, root, d) for d, _, name, root in entries[:k]]
+
+
+def _summary(matches: list[ScaleMatch]) -> list[tuple[str, int, int]]:
+    return [(m.name, m.root.to_octave_pitch().half_steps, m.distance) for m in matches]
+
+
+def test_exact_match(index: ScaleIndex) -> None:
+    d_major = transpose_mask(scale_to_mask(name_to_scale["Major"]), 2)
+    best = index.nearest(d_major, k=1)[0]
+    assert (best.name, best.root, best.distance) == ("Major", n("D"), 0)
+
+
+def test_pentatonic(index: ScaleIndex) -> None:
+    c_pentatonic = scale_to_mask(map(OctavePitch, [0, 2, 4, 7, 9]))
+    matches = index.nearest(c_pentatonic, k=3)
+    assert all(m.distance == 2 for m in matches)
+    # The three major scales containing it, in catalogue order
+    assert [(m.name, m.root) for m in matches] == [
+        ("Major", n("C")),
+        ("Major", n("F")),
+        ("Major", n("G")),
+    ]
+
+
+def test_voice_leading_distance() -> None:
+    c_major = scale_to_mask(map(OctavePitch, [0, 4, 7]))
+    c_minor = scale_to_mask(map(OctavePitch, [0, 3, 7]))
+    a_minor = scale_to_mask(map(OctavePitch, [9, 0, 4]))
+    c_sus = scale_to_mask(map(OctavePitch, [0, 7]))
+
+    assert voice_leading_distance(c_major, c_minor) == 1
+    assert voice_leading_distance(c_major, a_minor) == 2
+    assert voice_leading_distance(c_major, c_sus) == 3
+
+
+@pytest.mark.parametrize("metric", list(Metric))
+def test_matches_exhaustive_search(index: ScaleIndex, metric: Metric) -> None:
+    rng = random.Random(0)
+    for _ in range(50):
+        query = PitchClassMask(rng.randrange(4096))
+        k = rng.randrange(1, 20)
+        assert _summary(index.nearest(query, k, metric)) == _exhaustive(
+            index, query, k, metric
+        )
+
+
+def test_catalogue_size(index: ScaleIndex) -> None:
+    distinct = {scale for _, scale in default_catalogue()}
+    assert len(index) == 12 * len(distinct)
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_k_must_be_positive(index: ScaleIndex, k: int) -> None:
+    with pytest.raises(ValueError):
+        index.nearest([OctavePitch(0)], k)
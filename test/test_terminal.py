@@ -0,0 +1,93 @@
+import re
+
+from music_tools.guitar import (
+    EADGBE,
+    FretboardAnnotation,
+    FretboardLocation,
+    render_fretboard_ascii,
+)
+from music_tools.terminal import IncrementalFretboardRenderer, TermColor
+
+_ESCAPE = re.compile(r"\033\[(?:(\d+);(\d+)H|K|[\d:;]*m)")
+
+
+class _Screen:
+    """Just enough of a terminal to apply the renderer's output, dropping
+    colors"""
+
+    def __init__(self) -> None:
+        self.lines: dict[int, list[str]] = {}
+        self.row = self.column = 1
+
+    def write(self, output: str) -> None:
+        position = 0
+        for match in _ESCAPE.finditer(output):
+            self._text(output[position : match.start()])
+            position = match.end()
+            if match.group(1):
+                self.row, self.column = int(match.group(1)), int(match.group(2))
+            elif match.group(0).endswith("K"):
+                line = self.lines.setdefault(self.row, [])
+                del line[self.column - 1 :]
+        self._text(output[position:])
+
+    def _text(self, text: str) -> None:
+        if not text:
+            return
+        line = self.lines.setdefault(self.row, [])
+        for char in text:
+            line.extend(" " * (self.column - len(line)))
+            line[self.column - 1] = char
+            self.column += 1
+
+    def text(self) -> str:
+        return "\n".join("".join(self.lines[row]) for row in sorted(self.lines))
+
+
+def _pitch_classes(*half_steps: int, text: str = "o") -> FretboardAnnotation[str]:
+    def annotation(loc: FretboardLocation) -> str | None:
+        if loc[2].half_steps % 12 in half_steps:
+            return f"{TermColor.GREEN}{text}{TermColor.ENDC}"
+        return None
+
+    return annotation
+
+
+def _plain(board: str) -> str:
+    return _ESCAPE.sub("", board)
+
+
+def test_frames_match_full_render() -> None:
+    renderer = IncrementalFretboardRenderer(EADGBE, 12)
+    screen = _Screen()
+    frames = [
+        [_pitch_classes(0, 4, 7)],
+        [_pitch_classes(2, 5, 9)],
+        [_pitch_classes(2, 5, 9), _pitch_classes(0, text="x")],
+        [_pitch_classes(7), _pitch_classes(1, text="x")],
+    ]
+    for layers in frames:
+        screen.write(renderer.render(layers))
+        assert screen.text() == _plain(render_fretboard_ascii(EADGBE, 12, layers))
+
+
+def test_only_changed_cells_are_written() -> None:
+    renderer = IncrementalFretboardRenderer(EADGBE, 24, top=3)
+    full = renderer.render([_pitch_classes(0, 2, 4, 5, 7, 9, 11)])
+    assert full.startswith("\033[3;1H")
+
+    assert renderer.render([_pitch_classes(0, 2, 4, 5, 7, 9, 11)]) == ""
+
+    # C major to G major only moves F to F#
+    update = renderer.render([_pitch_classes(0, 2, 4, 6, 7, 9, 11)])
+    assert len(update) < len(full) / 4
+    cells_written = _plain(update).replace("-", "")
+    assert cells_written.count("o") == len(cells_written) == 2 * 6
+
+
+def test_invalidate_redraws() -> None:
+    renderer = IncrementalFretboardRenderer(EADGBE, 5)
+    layers = [_pitch_classes(4)]
+    full = renderer.render(layers)
+    renderer.invalidate()
+    assert renderer.render(layers) == full
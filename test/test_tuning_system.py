@@ -0,0 +1,165 @@
+import pytest
+
+from music_tools.guitar import EADGBE, FretIndex, StringIndex
+from music_tools.mode import scale_modes
+from music_tools.pitch import Interval, Octave, Pitch
+from music_tools.scale import (
+    PitchClassMask,
+    gen_conventional_scales,
+    interval_sequence,
+    mask_to_scale,
+    name_to_scale,
+    scale_from_intervals,
+    scale_to_mask,
+    transpose_mask,
+)
+from music_tools.tuning_system import TuningSystem, edo
+
+
+def test_edo_is_shared() -> None:
+    assert edo(19) is edo(19)
+    assert edo(19) == TuningSystem(19)
+    assert edo(19) != edo(31)
+
+
+def test_too_few_divisions() -> None:
+    with pytest.raises(ValueError):
+        edo(4)
+
+
+@pytest.mark.parametrize(
+    "divisions, fifth, minor_third, major_third",
+    [(12, 7, 3, 4), (19, 11, 5, 6), (24, 14, 6, 8), (31, 18, 8, 10)],
+)
+def test_intervals(
+    divisions: int, fifth: int, minor_third: int, major_third: int
+) -> None:
+    system = edo(divisions)
+    assert system.octave == Interval(divisions)
+    assert system.fifth == Interval(fifth)
+    assert system.minor_third == Interval(minor_third)
+    assert system.major_third == Interval(major_third)
+
+
+def test_twelve_matches_the_rest_of_the_library() -> None:
+    twelve = edo(12)
+    assert dict(twelve.named_scales) == dict(name_to_scale)
+    assert twelve.conventional_scales == tuple(gen_conventional_scales())
+    for scale in name_to_scale.values():
+        mask = scale_to_mask(scale)
+        assert twelve.scale_to_mask(scale) == mask
+        assert twelve.mask_to_scale(mask) == mask_to_scale(mask)
+        for root in range(-12, 13):
+            assert twelve.transpose_mask(mask, root) == transpose_mask(mask, root)
+        assert list(twelve.modes(scale)) == list(dict.fromkeys(scale_modes(scale)))
+    steps = interval_sequence([2, 2, 1, 2, 2, 2, 1])
+    assert twelve.scale_from_intervals(steps) == scale_from_intervals(steps)
+
+    for pitch in (Pitch(0), Pitch(13), Pitch(59)):
+        octave, pitch_class = pitch.to_octave()
+        assert twelve.to_octave(pitch) == (octave, pitch_class.half_steps)
+        assert twelve.from_octave(octave, pitch_class.half_steps) == pitch
+    assert twelve.pitch_class_name(1) == "C♯"
+    assert [s.open_pitch for s in twelve.guitar.strings] == [
+        s.open_pitch for s in EADGBE.strings
+    ]
+
+
+def test_nineteen() -> None:
+    system = edo(19)
+    assert system.pitch_class_name(1) == "C♯"
+    assert system.pitch_class_name(2) == "D♭"
+    assert system.pitch_class_name(7) == "E♯"
+    major = system.named_scales["Major"]
+    assert [i.half_steps for i in major] == [0, 3, 6, 8, 11, 14, 17]
+    assert (
+        system.scale_from_intervals(Interval(i) for i in (3, 3, 2, 3, 3, 3, 2)) == major
+    )
+    assert major in system.conventional_scales
+    assert len(list(system.modes(major))) == 7
+    assert system.pitch_name(system.from_octave(Octave(4), 0)) == "C4"
+
+
+def test_quarter_tones() -> None:
+    system = edo(24)
+    assert system.pitch_class_name(2) == "C♯"
+    assert system.pitch_class_name(3) == "C♯↑"
+    # 24-EDO contains 12-EDO, every other step
+    major = [i.half_steps for i in system.named_scales["Major"]]
+    assert major == [0, 4, 8, 10, 14, 18, 22]
+
+
+@pytest.mark.parametrize("divisions", [19, 24, 31])
+def test_masks(divisions: int) -> None:
+    system = edo(divisions)
+    for scale in system.named_scales.values():
+        mask = system.scale_to_mask(scale)
+        assert system.mask_to_scale(mask) == scale
+        assert system.transpose_mask(mask, divisions) == mask
+        assert system.transpose_mask(system.transpose_mask(mask, 5), -5) == mask
+        assert system.transpose_mask(mask, 1) & ~system.full_mask == 0
+
+    thirds = {system.minor_third.half_steps, system.major_third.half_steps}
+    for scale in system.conventional_scales:
+        steps = [
+            (b.half_steps - a.half_steps) % divisions
+            for a, b in zip(scale, (*scale[1:], scale[0]))
+        ]
+        assert all(a + b in thirds for a, b in zip(steps, steps[1:] + steps[:1]))
+
+
+def test_scales_by_thirds_are_complete() -> None:
+    # The rule that 12-EDO bypasses, against every scale in 12-EDO
+    divisions = 12
+    system = edo(divisions)
+    thirds = {system.minor_third.half_steps, system.major_third.half_steps}
+    expected = set()
+    # Every set of pitch classes containing the root
+    for mask in range(1, 1 << divisions, 2):
+        scale = system.mask_to_scale(PitchClassMask(mask))
+        steps = [
+            (b.half_steps - a.half_steps) % divisions
+            for a, b in zip(scale, (*scale[1:], scale[0]))
+        ]
+        if len(steps) > 1 and all(
+            a + b in thirds for a, b in zip(steps, steps[1:] + steps[:1])
+        ):
+            expected.add(scale)
+
+    scales = system._scales_by_thirds()
+    assert len(scales) == len(expected)
+    assert set(scales) == expected
+
+
+def test_fretboard_grid() -> None:
+    system = edo(31)
+    grid = system.fretboard_grid(system.guitar, 31)
+    assert grid is system.fretboard_grid(system.guitar, 31)
+    assert len(grid) == 6
+    # The first string is the high E, an octave above the open string at 31
+    e = system.from_twelve(4)
+    assert grid[0][0] == grid[0][31] == grid[5][0] == e
+    assert grid[1][0] == system.from_twelve(11)
+
+
+def test_fretboard_labels() -> None:
+    system = edo(19)
+    frets = 19
+    layer = system.compile_pitch_classes(system.guitar, frets, {0: "C", 3: "D"})
+    lines = system.render_fretboard_ascii(system.guitar, frets, [layer]).splitlines()
+    # Open strings are named in 19-EDO, not as 12-EDO pitch classes
+    assert [line.split()[0] for line in lines[:6]] == ["E", "B", "G", "D", "A", "E"]
+    # B to C, a diatonic semitone, is two steps, A to D eight
+    assert lines[1].split("|")[2] == "-C-"
+    assert lines[4].split("|")[8] == "-D-"
+    b_string = system.guitar.strings[1]
+    assert layer((StringIndex(2), FretIndex(2), b_string[2])) == "C"
+
+
+def test_scale_catalogue_names() -> None:
+    system = edo(19)
+    names = dict(system.scale_catalogue)
+    assert names["Major"] == system.named_scales["Major"]
+    *_, (name, scale) = system.scale_catalogue
+    assert name.split() == [system.pitch_class_name(i.half_steps) for i in scale]
+    assert system.scale_name(system.named_scales["Major"]) == "C D E F G A B"